@@ -0,0 +1,6 @@
+"""
+Komponen bersama untuk aplikasi pencatatan aset (main4, main_ocr, main_ocr2).
+
+Modul-modul di paket ini sengaja tidak diimpor di sini agar dependensi berat
+(easyocr, cv2, google-generativeai) hanya dimuat saat benar-benar dipakai.
+"""
@@ -0,0 +1,250 @@
+"""
+Parser hasil analisis Gemini (CSV berkutip tunggal atau JSON) menjadi DataFrame.
+
+Baris CSV dipecah pada pemisah `','` sehingga nama item yang mengandung
+apostrof atau koma tetap utuh; baris yang kolomnya berlebih digabung kembali
+pada kolom nama. Angka dibaca sekaligus per kolom dengan format Indonesia
+("76.000" -> 76000, "1,5" -> 1.5) dan pecahan ("1 1/2" -> 1.5).
+
+`parse_many` memproses banyak struk dalam satu kali jalan; gunakan itu untuk
+batch alih-alih memanggil `parse_analysis_text` per struk lalu `pd.concat`.
+
+Baris tanpa nama item selalu dibuang. Baris dengan angka yang tidak terbaca
+juga dibuang kecuali `require_numbers=False`; angkanya lalu menjadi NaN dan
+ditandai oleh validasi (`asset_ocr.validation`).
+"""
+import csv
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+from asset_ocr.schema import NAME_COLUMN, NUMERIC_COLUMNS
+
+MISSING_VALUES = ('', 'N/A', 'NA', 'n/a', '-', 'None', 'null')
+
+_FENCE_RE = re.compile(r'^\s*```[A-Za-z]*\s*|\s*```\s*$')
+_QUOTED_SEPARATOR = r"'\s*,\s*'"
+_CURRENCY_RE = r'(?i)^(?:rp\.?|idr)\s*|\s+'
+_THOUSANDS_DOT = r'-?[1-9]\d{0,2}(?:\.\d{3})+'
+_THOUSANDS_COMMA = r'-?[1-9]\d{0,2}(?:,\d{3})+'
+_DECIMAL_COMMA = r'-?\d{1,3}(?:\.\d{3})+,\d+'
+_DECIMAL_DOT = r'-?\d{1,3}(?:,\d{3})+\.\d+'
+_FRACTION_RE = r'^(?:(-?\d+)\s+)?(-?\d+)/(\d+)$'
+
+
+def strip_fences(text):
+    """
+    Hapus pagar kode markdown (```csv / ```json) di awal dan akhir teks
+    """
+    return _FENCE_RE.sub('', text.strip())
+
+
+def is_json(text):
+    stripped = strip_fences(text)
+    return stripped.startswith('[') or stripped.startswith('{')
+
+
+def split_line(line, n_columns, name_index=1):
+    """
+    Pecah satu baris CSV menjadi tepat n_columns bagian, atau None jika tidak bisa
+    """
+    line = line.strip()
+    if not line or line.startswith('```'):
+        return None
+
+    if line[0] == "'":
+        inner = line[1:-1] if len(line) > 1 and line[-1] == "'" else line[1:]
+        parts = re.split(_QUOTED_SEPARATOR, inner)
+    else:
+        parts = next(csv.reader([line], skipinitialspace=True))
+    parts = [part.strip() for part in parts]
+
+    if len(parts) > n_columns:
+        # Koma tanpa kutip di nama item: gabungkan kelebihan kolom ke kolom nama
+        extra = len(parts) - n_columns
+        parts = (
+            parts[:name_index]
+            + [', '.join(parts[name_index:name_index + extra + 1])]
+            + parts[name_index + extra + 1:]
+        )
+    return parts if len(parts) == n_columns else None
+
+
+def json_rows(text, field_columns):
+    """
+    Ubah keluaran JSON (array objek atau satu objek) menjadi list baris
+    """
+    data = json.loads(strip_fences(text))
+    if isinstance(data, dict):
+        data = [data]
+    return [
+        [item.get(field, 'N/A') for field in field_columns]
+        for item in data
+        if isinstance(item, dict)
+    ]
+
+
+def csv_rows(lines, n_columns, name_index=1):
+    """
+    Pecah banyak baris CSV sekaligus; hanya baris bermasalah yang lewat `split_line`
+    """
+    lines = pd.Series(lines, dtype=object).str.strip()
+    lines = lines[(lines.str.len() > 0) & ~lines.str.startswith('```', na=False)]
+    if lines.empty:
+        return pd.DataFrame(columns=range(n_columns))
+
+    # Jalur cepat: baris berkutip tunggal dengan tepat n_columns bagian
+    quoted = lines.str.startswith("'") & lines.str.endswith("'") & (lines.str.len() > 1)
+    parts = lines[quoted].str.slice(1, -1).str.split(_QUOTED_SEPARATOR, regex=True)
+    fast = parts[parts.str.len() == n_columns]
+    rows = pd.DataFrame(fast.tolist(), index=fast.index, columns=range(n_columns))
+
+    slow = lines.drop(fast.index)
+    if not slow.empty:
+        split = slow.map(lambda line: split_line(line, n_columns, name_index)).dropna()
+        if not split.empty:
+            rows = pd.concat([
+                rows,
+                pd.DataFrame(split.tolist(), index=split.index, columns=range(n_columns))
+            ]).sort_index()
+    return rows
+
+
+def _normalize_numbers(raw):
+    """
+    Baca angka bertitik/berkoma (ribuan vs desimal), bersimbol mata uang, dan pecahan
+    """
+    text = raw.str.replace(_CURRENCY_RE, '', regex=True)
+    no_dots = text.str.replace('.', '', regex=False)
+    no_commas = text.str.replace(',', '', regex=False)
+    normalized = np.select(
+        [
+            text.str.fullmatch(_THOUSANDS_DOT),
+            text.str.fullmatch(_THOUSANDS_COMMA),
+            text.str.fullmatch(_DECIMAL_COMMA),
+            text.str.fullmatch(_DECIMAL_DOT),
+        ],
+        [no_dots, no_commas, no_dots.str.replace(',', '.', regex=False), no_commas],
+        default=text.str.replace(',', '.', regex=False)
+    )
+    numbers = pd.to_numeric(pd.Series(normalized, index=text.index), errors='coerce')
+
+    # Pecahan: "3/4", "1 1/2"
+    fraction = raw.str.strip().str.extract(_FRACTION_RE)
+    has_fraction = fraction[2].notna()
+    if has_fraction.any():
+        whole = pd.to_numeric(fraction[0], errors='coerce').fillna(0)
+        numerator = pd.to_numeric(fraction[1], errors='coerce')
+        denominator = pd.to_numeric(fraction[2], errors='coerce').replace(0, np.nan)
+        value = whole.abs() + numerator / denominator
+        value = value.where(whole >= 0, -value)
+        numbers = numbers.where(~has_fraction, value)
+    return numbers
+
+
+def factorized(values, parse):
+    """
+    Jalankan `parse` pada nilai unik saja lalu sebarkan hasilnya ke semua baris
+
+    Kolom hasil struk banyak berulang (quantity, satuan, harga umum), sehingga
+    operasi string per elemen cukup dilakukan sekali per nilai unik.
+    """
+    values = pd.Series(values, dtype=object)
+    codes, uniques = pd.factorize(values)
+    parsed = np.asarray(parse(pd.Series(uniques, dtype=object)))
+    # Kode -1 (nilai kosong) mengambil elemen terakhir: NaN
+    filler = np.array([np.nan], dtype=parsed.dtype if parsed.dtype.kind in 'fc' else object)
+    return pd.Series(np.concatenate([parsed, filler])[codes], index=values.index)
+
+
+def parse_numbers(values):
+    """
+    Ubah kolom campuran (str/angka) menjadi float64; nilai yang tidak terbaca menjadi NaN
+    """
+    return factorized(values, _parse_unique_numbers).astype('float64')
+
+
+def _parse_unique_numbers(values):
+    text_mask = values.map(type).eq(str).to_numpy()
+    result = pd.to_numeric(values.where(~text_mask), errors='coerce').astype('float64')
+    if not text_mask.any():
+        return result
+
+    raw = values[text_mask].astype(str)
+    numbers = pd.to_numeric(raw, errors='coerce').astype('float64')
+
+    # Titik/koma bisa berarti pemisah ribuan, jadi hanya nilai seperti itu
+    # (dan yang gagal dibaca) yang lewat normalisasi penuh
+    slow = (numbers.isna() | raw.str.contains(r'[.,]', regex=True)).to_numpy()
+    if slow.any():
+        numbers[slow] = _normalize_numbers(raw[slow]).to_numpy(dtype='float64')
+
+    result[text_mask] = numbers.to_numpy()
+    return result
+
+
+def to_dataframe(rows, columns, numeric_columns=NUMERIC_COLUMNS, require_numbers=True):
+    """
+    Bangun DataFrame, konversi kolom angka, dan buang baris tanpa nama (serta
+    tanpa angka yang valid jika `require_numbers`)
+    """
+    df = pd.DataFrame(rows, columns=columns) if not isinstance(rows, pd.DataFrame) else rows
+    df.columns = columns
+    df = df.reset_index(drop=True)
+
+    numeric_columns = [column for column in numeric_columns if column in df.columns]
+    for column in numeric_columns:
+        df[column] = parse_numbers(df[column])
+
+    if require_numbers:
+        valid = df[numeric_columns].notna().all(axis=1)
+    else:
+        valid = pd.Series(True, index=df.index)
+    if NAME_COLUMN in df.columns:
+        valid &= ~df[NAME_COLUMN].astype(str).str.strip().isin(MISSING_VALUES)
+    return df[valid].reset_index(drop=True)
+
+
+def parse_many(texts, columns, field_columns=None, numeric_columns=NUMERIC_COLUMNS, require_numbers=True):
+    """
+    Parse banyak keluaran analisis (CSV atau JSON) menjadi satu DataFrame
+    """
+    columns = list(columns)
+    name_index = columns.index(NAME_COLUMN) if NAME_COLUMN in columns else 0
+    lines = []
+    json_data = {}
+
+    for text in texts:
+        if not text:
+            continue
+        if field_columns and is_json(text):
+            try:
+                for row in json_rows(text, field_columns):
+                    # Tempati satu posisi baris agar urutan antar struk tetap terjaga
+                    json_data[len(lines)] = row
+                    lines.append(None)
+                continue
+            except ValueError:
+                pass
+        lines.extend(strip_fences(text).splitlines())
+
+    rows = csv_rows(lines, len(columns), name_index)
+    if json_data:
+        rows = pd.concat([
+            rows,
+            pd.DataFrame(
+                list(json_data.values()), index=list(json_data),
+                columns=range(len(columns)), dtype=object
+            )
+        ]).sort_index()
+    return to_dataframe(rows, columns, numeric_columns, require_numbers)
+
+
+def parse_analysis_text(text, columns, field_columns=None, numeric_columns=NUMERIC_COLUMNS,
+                        require_numbers=True):
+    """
+    Parse satu keluaran analisis menjadi DataFrame
+    """
+    return parse_many([text], columns, field_columns, numeric_columns, require_numbers)
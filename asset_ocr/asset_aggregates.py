@@ -0,0 +1,236 @@
+"""
+Agregat berjalan tabel aset: total, per vendor, per satuan, dan per bulan.
+
+Agregat disimpan di tabel `<table>_aggregates` (satu baris per grup) dan
+diperbarui oleh trigger SQLite pada setiap INSERT/UPDATE/DELETE, sehingga
+simpan, edit, hapus, maupun undo ikut memperbarui agregat dalam transaksi
+yang sama tanpa membaca ulang seluruh tabel. Laporan cukup membaca tabel
+agregat (O(jumlah grup), bukan O(jumlah baris)).
+
+Simpan batch (`AssetStore.append`) tidak lewat trigger per baris: trigger
+INSERT dilepas sementara di dalam transaksi, lalu agregat batch dihitung
+dengan pandas dan ditambahkan sekaligus (`add_frame`).
+
+`summarize_frame` menghitung ringkasan yang sama dari DataFrame utuh, untuk
+membandingkan hasil agregat berjalan dengan perhitungan penuh.
+"""
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Dimensi agregat -> kolom sumber kunci grupnya (None = satu grup untuk seluruh tabel)
+AGGREGATE_DIMENSIONS = {
+    'total': None,
+    'vendor': 'Vendor',
+    'unit': 'Jenis Satuan',
+    'month': 'Tanggal Beli',
+}
+QUANTITY_COLUMN = 'Quantity'
+TOTAL_COLUMN = 'Total Harga'
+
+
+def _dimensions(columns, identifiers):
+    """
+    Dimensi yang kolomnya ada di tabel -> ekspresi SQL kunci (berisi `{row}`)
+    """
+    identifier = dict(zip(columns, identifiers))
+    dimensions = {}
+    for dimension, column in AGGREGATE_DIMENSIONS.items():
+        if column is None:
+            dimensions[dimension] = "''"
+        elif column in identifier and dimension == 'month':
+            # Tanggal disimpan sebagai teks YYYY-MM-DD
+            dimensions[dimension] = f"substr({{row}}.{identifier[column]}, 1, 7)"
+        elif column in identifier:
+            dimensions[dimension] = f"{{row}}.{identifier[column]}"
+    return dimensions
+
+
+def _measure(columns, identifiers, column):
+    identifier = dict(zip(columns, identifiers))
+    return f"COALESCE({{row}}.{identifier[column]}, 0)" if column in identifier else "0"
+
+
+def _apply_sql(table, dimensions, quantity, total, row, sign):
+    statements = []
+    for dimension, key in dimensions.items():
+        key = key.format(row=row)
+        statements.append(
+            f"INSERT INTO {table}_aggregates (dimension, key, rows, quantity, total) "
+            f"SELECT '{dimension}', {key}, {sign}1, {sign}{quantity.format(row=row)}, {sign}{total.format(row=row)} "
+            f"WHERE {key} IS NOT NULL {_UPSERT};"
+        )
+    if sign == '-':
+        # Grup yang sudah kosong dibuang agar sisa pembulatan float tidak menumpuk
+        statements.append(f"DELETE FROM {table}_aggregates WHERE rows <= 0;")
+    return '\n'.join(statements)
+
+
+def create_aggregates(conn, table, columns, identifiers):
+    """
+    Buat tabel agregat dan trigger-nya; isi dari data lama jika baru dibuat
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (f"{table}_aggregates",)
+    ).fetchone()
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table}_aggregates (
+            dimension TEXT NOT NULL,
+            key TEXT NOT NULL,
+            rows INTEGER NOT NULL,
+            quantity REAL NOT NULL,
+            total REAL NOT NULL,
+            PRIMARY KEY (dimension, key)
+        )
+    """)
+
+    dimensions = _dimensions(columns, identifiers)
+    quantity = _measure(columns, identifiers, QUANTITY_COLUMN)
+    total = _measure(columns, identifiers, TOTAL_COLUMN)
+    triggers = {
+        'insert': _apply_sql(table, dimensions, quantity, total, 'NEW', '+'),
+        'delete': _apply_sql(table, dimensions, quantity, total, 'OLD', '-'),
+        'update': (
+            _apply_sql(table, dimensions, quantity, total, 'OLD', '-') + '\n'
+            + _apply_sql(table, dimensions, quantity, total, 'NEW', '+')
+        ),
+    }
+    for event, body in triggers.items():
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_aggregates_{event}
+            AFTER {event.upper()} ON {table}
+            BEGIN
+            {body}
+            END
+        """)
+
+    if not exists:
+        rebuild_aggregates(conn, table, columns, identifiers)
+
+
+_UPSERT = (
+    "ON CONFLICT (dimension, key) DO UPDATE SET "
+    "rows = rows + excluded.rows, quantity = quantity + excluded.quantity, total = total + excluded.total"
+)
+
+
+def rebuild_aggregates(conn, table, columns, identifiers):
+    """
+    Hitung ulang seluruh agregat dari tabel (sekali, untuk data lama)
+    """
+    conn.execute(f"DELETE FROM {table}_aggregates")
+    quantity = _measure(columns, identifiers, QUANTITY_COLUMN).format(row=table)
+    total = _measure(columns, identifiers, TOTAL_COLUMN).format(row=table)
+    for dimension, key in _dimensions(columns, identifiers).items():
+        key = key.format(row=table)
+        conn.execute(
+            f"INSERT INTO {table}_aggregates (dimension, key, rows, quantity, total) "
+            f"SELECT '{dimension}', {key}, COUNT(*), SUM({quantity}), SUM({total}) "
+            f"FROM {table} WHERE {key} IS NOT NULL GROUP BY {key}"
+        )
+
+
+@contextmanager
+def bulk_insert(conn, table):
+    """
+    Lepas trigger INSERT selama blok ini lalu pasang kembali; panggil `add_frame`
+    untuk baris yang disisipkan. Harus di dalam satu transaksi agar penulis
+    lain tidak pernah melihat tabel tanpa trigger.
+    """
+    name = f"{table}_aggregates_insert"
+    sql, = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,)
+    ).fetchone()
+    conn.execute(f"DROP TRIGGER {name}")
+    try:
+        yield
+    finally:
+        conn.execute(sql)
+
+
+def add_frame(conn, table, df):
+    """
+    Tambahkan agregat sebuah batch (sudah berdtype skema) ke tabel agregat
+    """
+    rows = aggregate_rows(df)
+    conn.executemany(
+        f"INSERT INTO {table}_aggregates (dimension, key, rows, quantity, total) "
+        f"VALUES (?, ?, ?, ?, ?) {_UPSERT}",
+        [
+            (dimension, key, int(count), float(quantity), float(total))
+            for dimension, key, count, quantity, total in rows.itertuples(index=False, name=None)
+        ]
+    )
+
+
+def read_aggregates(conn, table):
+    """
+    Agregat tersimpan sebagai dict berisi Series kecil per dimensi
+    """
+    frame = pd.read_sql_query(
+        f"SELECT dimension, key, rows, quantity, total FROM {table}_aggregates ORDER BY dimension, key",
+        conn
+    )
+    return _to_summary(frame)
+
+
+def _to_summary(frame):
+    def series(dimension, measure):
+        group = frame[frame['dimension'] == dimension]
+        return pd.Series(group[measure].to_numpy(), index=pd.Index(group['key'].to_numpy(), name=None), name=measure)
+
+    totals = frame[frame['dimension'] == 'total']
+    return {
+        'rows': int(totals['rows'].sum()),
+        'total': float(totals['total'].sum()),
+        'vendor': series('vendor', 'total'),
+        'unit': series('unit', 'quantity'),
+        'month': series('month', 'total'),
+    }
+
+
+def _month_keys(values):
+    # strftime hanya untuk bulan unik; kode -1 (NaT) mengambil elemen terakhir: None
+    months = pd.to_datetime(values, errors='coerce').to_numpy().astype('datetime64[M]')
+    codes, uniques = pd.factorize(months)
+    labels = np.append(pd.DatetimeIndex(uniques).strftime('%Y-%m').to_numpy(dtype=object), None)
+    return pd.Series(labels[codes], index=values.index, dtype=object)
+
+
+def aggregate_rows(df):
+    """
+    Baris agregat (dimension, key, rows, quantity, total) dari sebuah DataFrame,
+    dengan kunci yang sama seperti di SQLite (bulan = 'YYYY-MM')
+    """
+    def measure(column):
+        if column not in df.columns:
+            return pd.Series(0.0, index=df.index)
+        return pd.to_numeric(df[column], errors='coerce').astype('float64').fillna(0)
+
+    measures = pd.DataFrame({'quantity': measure(QUANTITY_COLUMN), 'total': measure(TOTAL_COLUMN)})
+    parts = []
+    for dimension, column in AGGREGATE_DIMENSIONS.items():
+        if column is None:
+            keys = pd.Series('', index=df.index, dtype=object)
+        elif column in df.columns:
+            keys = _month_keys(df[column]) if dimension == 'month' else df[column]
+            keys = keys.astype(object).where(keys.notna(), None)
+        else:
+            continue
+        grouped = measures.groupby(keys.to_numpy(), dropna=True).agg(
+            rows=('total', 'size'), quantity=('quantity', 'sum'), total=('total', 'sum')
+        )
+        parts.append(grouped.rename_axis('key').reset_index().assign(dimension=dimension))
+
+    columns = ['dimension', 'key', 'rows', 'quantity', 'total']
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(parts, ignore_index=True)[columns]
+
+
+def summarize_frame(df):
+    """
+    Ringkasan yang sama dengan `read_aggregates`, dihitung penuh dari DataFrame
+    """
+    return _to_summary(aggregate_rows(df).sort_values(['dimension', 'key']))
@@ -0,0 +1,587 @@
+"""
+Penyimpanan permanen tabel aset di SQLite, append-only per batch.
+
+Setiap "Simpan ke Tabel Permanen" menjadi satu transaksi `executemany` berisi
+baris batch itu saja (O(batch), bukan menyalin seluruh tabel), dan data tetap
+ada setelah aplikasi dimulai ulang. Tabel tidak dimuat saat aplikasi dibuka;
+pembacaan dilakukan sesuai kebutuhan (`tail`, `count`, `frame`) lewat koneksi
+ber-mmap, dan `frame()` di-cache per versi data sehingga rerun tanpa
+perubahan tidak membaca ulang tabel. Versi data (`version`) mencakup tulisan
+lewat instance ini maupun koneksi lain (instance/proses lain, mis. ingest
+batch) lewat `PRAGMA data_version`. Hasil baca dipaksa ke dtype skema
+(`asset_ocr.schema`) sehingga tidak ada kolom object.
+
+Untuk tabel besar UI memakai `page`: filter, pencarian, urutan, dan LIMIT/OFFSET
+dijalankan di SQLite sehingga yang dikirim ke browser hanya satu halaman.
+
+Edit dari UI masuk lewat `apply_edits` (update/insert/delete per baris dalam
+satu transaksi) dan dicatat di tabel `<table>_edits` beserta nilai sebelum
+dan sesudahnya, sehingga bisa diaudit (`edit_log`) dan dibatalkan (`undo`).
+Store dipakai bersama oleh semua sesi, jadi pemanggil membatalkan edit_id
+miliknya sendiri dan `undo` menolak edit yang barisnya sudah diubah lagi oleh
+edit berikutnya (`EditConflictError`). `clear` tidak menghapus log edit:
+edit_id dan id baris terus naik, dan edit sebelum pengosongan tidak bisa lagi
+dibatalkan.
+Agregat laporan (`aggregates`) dipelihara trigger di `asset_ocr.asset_aggregates`.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from asset_ocr.asset_aggregates import add_frame, bulk_insert, create_aggregates, read_aggregates
+from asset_ocr.errors import EditConflictError
+from asset_ocr.schema import CATEGORY_COLUMNS, DATE_COLUMN, NUMERIC_COLUMNS, coerce_frame
+
+DEFAULT_STORE_PATH = os.getenv('ASSET_STORE_PATH', os.path.join('data', 'assets.sqlite'))
+DEFAULT_MMAP_BYTES = int(os.getenv('ASSET_STORE_MMAP_BYTES', str(256 * 1024 * 1024)))
+
+# Kolom yang sering difilter/diurutkan di tampilan halaman diberi index
+INDEXED_COLUMNS = (DATE_COLUMN,) + CATEGORY_COLUMNS
+
+
+def column_identifier(column):
+    """
+    Nama kolom tampilan -> nama kolom SQL ('Total Harga' -> total_harga)
+    """
+    return re.sub(r'\W+', '_', column.strip().lower()).strip('_')
+
+
+class AssetStore:
+    def __init__(self, table, columns, path=DEFAULT_STORE_PATH, mmap_bytes=DEFAULT_MMAP_BYTES):
+        self.table = column_identifier(table)
+        self.columns = list(columns)
+        self.path = path
+        self._identifiers = [column_identifier(column) for column in self.columns]
+        self._lock = threading.Lock()
+        self._version = 0
+        self._frame = None
+        self._frame_version = None
+        self._aggregates = None
+        self._aggregates_version = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA mmap_size={int(mmap_bytes)}")
+        self._create_tables()
+        self._conn.commit()
+
+    def _create_tables(self):
+        definitions = ', '.join(
+            f"{identifier} {'REAL' if column in NUMERIC_COLUMNS else 'TEXT'}"
+            for column, identifier in zip(self.columns, self._identifiers)
+        )
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                batch_id INTEGER NOT NULL,
+                {definitions}
+            )
+        """)
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table}_batches (
+                batch_id INTEGER PRIMARY KEY,
+                rows INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table}_edits (
+                seq INTEGER PRIMARY KEY,
+                edit_id INTEGER NOT NULL,
+                row_id INTEGER NOT NULL,
+                action TEXT NOT NULL,
+                before TEXT,
+                after TEXT,
+                source TEXT,
+                created_at REAL NOT NULL,
+                undone_at REAL
+            )
+        """)
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{self.table}_edits_edit_id ON {self.table}_edits (edit_id)"
+        )
+        for column, identifier in zip(self.columns, self._identifiers):
+            if column in INDEXED_COLUMNS:
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS ix_{self.table}_{identifier} ON {self.table} ({identifier})"
+                )
+        create_aggregates(self._conn, self.table, self.columns, self._identifiers)
+
+    @property
+    def version(self):
+        """
+        Versi isi tabel: naik saat instance ini menulis (`_version`) atau saat
+        koneksi lain meng-commit ke file yang sama (`PRAGMA data_version`)
+        """
+        with self._lock:
+            data_version, = self._conn.execute("PRAGMA data_version").fetchone()
+        return self._version, data_version
+
+    def _to_records(self, dataframe):
+        # Samakan dtype dulu agar tanggal selalu ditulis sebagai YYYY-MM-DD
+        frame = coerce_frame(dataframe, self.columns)
+        for column in self.columns:
+            values = frame[column]
+            if column in NUMERIC_COLUMNS:
+                # sqlite3 hanya menerima float Python (float64)
+                frame[column] = pd.to_numeric(values, errors='coerce').astype('float64')
+            elif pd.api.types.is_datetime64_any_dtype(values):
+                frame[column] = values.dt.strftime('%Y-%m-%d')
+        # NaN/NaT -> NULL, nilai non-teks pada kolom teks (mis. date) -> str
+        frame = frame.astype(object).where(frame.notna(), None)
+        for column in self.columns:
+            if column not in NUMERIC_COLUMNS:
+                frame[column] = frame[column].map(
+                    lambda value: value if value is None or isinstance(value, str) else str(value)
+                )
+        return frame.itertuples(index=False, name=None)
+
+    def append(self, dataframe, before_commit=None):
+        """
+        Tambahkan satu batch baris dalam satu transaksi; kembalikan batch_id.
+        `before_commit(conn, batch_id)` dijalankan di transaksi yang sama (mis.
+        mencatat checkpoint ingest), sehingga keduanya tersimpan atau batal bersama.
+        """
+        if dataframe.empty:
+            return None
+
+        placeholders = ', '.join('?' for _ in range(len(self.columns) + 1))
+        insert = f"INSERT INTO {self.table} (batch_id, {', '.join(self._identifiers)}) VALUES ({placeholders})"
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"INSERT INTO {self.table}_batches (rows, created_at) VALUES (?, ?)",
+                (len(dataframe), time.time())
+            )
+            batch_id = cursor.lastrowid
+            # Agregat batch ditambahkan sekaligus, bukan lewat trigger per baris
+            frame = coerce_frame(dataframe, self.columns)
+            with bulk_insert(self._conn, self.table):
+                self._conn.executemany(
+                    insert, ((batch_id,) + record for record in self._to_records(frame))
+                )
+            add_frame(self._conn, self.table, frame)
+            if before_commit is not None:
+                before_commit(self._conn, batch_id)
+            self._version += 1
+        return batch_id
+
+    def _query(self, where='', params=(), order='id', limit=None, offset=0):
+        select = ', '.join(
+            f'{identifier} AS "{column}"'
+            for column, identifier in zip(self.columns, self._identifiers)
+        )
+        sql = f"SELECT id, {select} FROM {self.table} {where} ORDER BY {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)} OFFSET {int(offset)}"
+        with self._lock:
+            frame = pd.read_sql_query(sql, self._conn, params=params, index_col='id')
+        frame.index.name = None
+        return coerce_frame(frame, self.columns)
+
+    def _identifier(self, column):
+        # Nama kolom dari UI tidak pernah disisipkan langsung ke SQL
+        if column not in self.columns:
+            raise KeyError(f"Kolom tidak dikenal: {column}")
+        return self._identifiers[self.columns.index(column)]
+
+    def _where(self, search=None, filters=None):
+        """
+        Klausa WHERE dan parameternya untuk pencarian teks dan filter kolom
+
+        `filters` berisi {kolom: nilai} untuk kesamaan, atau {kolom: (awal, akhir)}
+        untuk rentang inklusif (salah satu ujung boleh None).
+        """
+        clauses, params = [], []
+        if search and search.strip():
+            pattern = '%' + re.sub(r'([\\%_])', r'\\\1', search.strip()) + '%'
+            text_identifiers = [
+                identifier for column, identifier in zip(self.columns, self._identifiers)
+                if column not in NUMERIC_COLUMNS
+            ]
+            clauses.append('(' + ' OR '.join(
+                f"{identifier} LIKE ? ESCAPE '\\'" for identifier in text_identifiers
+            ) + ')')
+            params.extend([pattern] * len(text_identifiers))
+
+        for column, value in (filters or {}).items():
+            identifier = self._identifier(column)
+            if isinstance(value, tuple):
+                for operator, bound in zip(('>=', '<='), value):
+                    if bound is not None:
+                        clauses.append(f"{identifier} {operator} ?")
+                        params.append(self._sql_value(column, bound))
+            elif value is not None:
+                clauses.append(f"{identifier} = ?")
+                params.append(self._sql_value(column, value))
+
+        where = 'WHERE ' + ' AND '.join(clauses) if clauses else ''
+        return where, tuple(params)
+
+    @staticmethod
+    def _sql_value(column, value):
+        if column in NUMERIC_COLUMNS:
+            return float(value)
+        if hasattr(value, 'strftime'):
+            # Tanggal disimpan sebagai teks ISO sehingga perbandingan teks = kronologis
+            return value.strftime('%Y-%m-%d')
+        return str(value)
+
+    def count(self, search=None, filters=None):
+        where, params = self._where(search, filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table} {where}", params).fetchone()[0]
+
+    def page(self, offset=0, limit=100, search=None, filters=None, sort=None, descending=False):
+        """
+        Satu halaman baris hasil filter/pencarian, diurutkan di SQLite
+
+        Tanpa `sort` baris diurutkan menurut id (urutan simpan); id juga menjadi
+        pengurut kedua agar halaman stabil untuk nilai yang sama.
+        """
+        where, params = self._where(search, filters)
+        direction = 'DESC' if descending else 'ASC'
+        order = f"id {direction}"
+        if sort is not None:
+            order = f"{self._identifier(sort)} {direction}, {order}"
+        return self._query(where, params, order=order, limit=limit, offset=offset)
+
+    def iter_chunks(self, chunk_rows=50_000):
+        """
+        Seluruh tabel per potongan (keyset pada id), tanpa memuat semuanya sekaligus
+        """
+        last_id = 0
+        while True:
+            chunk = self._query('WHERE id > ?', (last_id,), limit=chunk_rows)
+            if chunk.empty:
+                return
+            yield chunk
+            last_id = int(chunk.index[-1])
+
+    def distinct(self, column, limit=1000):
+        """
+        Nilai unik sebuah kolom (untuk pilihan filter), terurut
+        """
+        identifier = self._identifier(column)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT {identifier} FROM {self.table} "
+                f"WHERE {identifier} IS NOT NULL ORDER BY {identifier} LIMIT {int(limit)}"
+            ).fetchall()
+        return [value for value, in rows]
+
+    def tail(self, rows=100):
+        """
+        Baris terbaru (untuk pratinjau) tanpa membaca seluruh tabel
+        """
+        frame = self._query(order='id DESC', limit=rows)
+        return frame.iloc[::-1]
+
+    def frame(self):
+        """
+        Seluruh tabel sebagai DataFrame, dibaca ulang hanya jika data berubah
+        """
+        version = self.version
+        if self._frame is None or self._frame_version != version:
+            self._frame = self._query()
+            self._frame_version = version
+        return self._frame
+
+    def aggregates(self):
+        """
+        Ringkasan berjalan (total, per vendor/satuan/bulan), O(jumlah grup)
+        """
+        version = self.version
+        if self._aggregates is None or self._aggregates_version != version:
+            with self._lock:
+                self._aggregates = read_aggregates(self._conn, self.table)
+            self._aggregates_version = version
+        return self._aggregates
+
+    def update_rows(self, dataframe):
+        """
+        Perbarui baris yang sudah ada berdasarkan id (index DataFrame)
+        """
+        return self.apply_edits(updated=dataframe)
+
+    def _fetch_records(self, row_ids):
+        # Nilai baris saat ini (untuk log "before"), dipecah agar tidak melewati batas parameter SQLite
+        records = {}
+        row_ids = [int(row_id) for row_id in row_ids]
+        for start in range(0, len(row_ids), 500):
+            chunk = row_ids[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT id, batch_id, {', '.join(self._identifiers)} FROM {self.table} "
+                f"WHERE id IN ({', '.join('?' for _ in chunk)})", chunk
+            ).fetchall()
+            for row_id, batch_id, *values in rows:
+                records[row_id] = (batch_id, tuple(values))
+        return records
+
+    def _log_value(self, record, batch_id=None):
+        if record is None:
+            return None
+        value = dict(zip(self.columns, record))
+        if batch_id is not None:
+            value['batch_id'] = batch_id
+        return json.dumps(value)
+
+    def _record_from_log(self, value):
+        value = json.loads(value)
+        return value.get('batch_id'), tuple(value.get(column) for column in self.columns)
+
+    def apply_edits(self, updated=None, added=None, deleted=(), source='editor'):
+        """
+        Terapkan satu kelompok edit dalam satu transaksi; kembalikan edit_id
+
+        `updated` berisi baris baru dengan index = id, `added` baris tambahan
+        (menjadi satu batch baru), `deleted` daftar id yang dihapus. Setiap
+        baris dicatat ke log edit sehingga bisa dibatalkan dengan `undo`.
+        """
+        updated = updated if updated is not None and not updated.empty else None
+        added = added if added is not None and not added.empty else None
+        deleted = [int(row_id) for row_id in deleted]
+        if updated is None and added is None and not deleted:
+            return None
+
+        now = time.time()
+        log = []
+        assignments = ', '.join(f"{identifier} = ?" for identifier in self._identifiers)
+        with self._lock, self._conn:
+            edit_id, = self._conn.execute(
+                f"SELECT COALESCE(MAX(edit_id), 0) + 1 FROM {self.table}_edits"
+            ).fetchone()
+
+            if updated is not None:
+                row_ids = [int(row_id) for row_id in updated.index]
+                before = self._fetch_records(row_ids)
+                records = list(self._to_records(updated))
+                self._conn.executemany(
+                    f"UPDATE {self.table} SET {assignments} WHERE id = ?",
+                    [record + (row_id,) for row_id, record in zip(row_ids, records)]
+                )
+                log.extend(
+                    (row_id, 'update', self._log_value(before[row_id][1]), self._log_value(record))
+                    for row_id, record in zip(row_ids, records) if row_id in before
+                )
+
+            # Sisipkan sebelum menghapus agar id baru tidak memakai ulang id yang dihapus
+            if added is not None:
+                batch_id = self._conn.execute(
+                    f"INSERT INTO {self.table}_batches (rows, created_at) VALUES (?, ?)",
+                    (len(added), now)
+                ).lastrowid
+                insert = (
+                    f"INSERT INTO {self.table} (batch_id, {', '.join(self._identifiers)}) "
+                    f"VALUES ({', '.join('?' for _ in range(len(self.columns) + 1))})"
+                )
+                for record in self._to_records(added):
+                    row_id = self._conn.execute(insert, (batch_id,) + record).lastrowid
+                    log.append((row_id, 'insert', None, self._log_value(record)))
+
+            if deleted:
+                before = self._fetch_records(deleted)
+                self._conn.executemany(
+                    f"DELETE FROM {self.table} WHERE id = ?", [(row_id,) for row_id in before]
+                )
+                log.extend(
+                    (row_id, 'delete', self._log_value(record, batch_id), None)
+                    for row_id, (batch_id, record) in before.items()
+                )
+
+            self._conn.executemany(
+                f"INSERT INTO {self.table}_edits (edit_id, row_id, action, before, after, source, created_at) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(edit_id, row_id, action, before, after, source, now) for row_id, action, before, after in log]
+            )
+            self._version += 1
+        return edit_id
+
+    def _later_edits(self, edit_id, row_ids):
+        # Jumlah entri edit berikutnya (belum dibatalkan) yang menyentuh baris yang sama
+        count = 0
+        row_ids = sorted(set(row_ids))
+        for start in range(0, len(row_ids), 500):
+            chunk = row_ids[start:start + 500]
+            count += self._conn.execute(
+                f"SELECT COUNT(*) FROM {self.table}_edits WHERE edit_id > ? AND undone_at IS NULL "
+                f"AND row_id IN ({', '.join('?' for _ in chunk)})", [edit_id] + chunk
+            ).fetchone()[0]
+        return count
+
+    def _last_clear(self):
+        # edit_id pencatatan `clear` terakhir; edit sebelumnya merujuk baris yang sudah hilang
+        last_clear, = self._conn.execute(
+            f"SELECT COALESCE(MAX(edit_id), 0) FROM {self.table}_edits WHERE action = 'clear'"
+        ).fetchone()
+        return last_clear
+
+    def undoable(self, edit_ids):
+        """
+        edit_id dari `edit_ids` yang masih bisa dibatalkan (belum dibatalkan dan
+        tidak mendahului `clear`), dengan urutan tetap
+        """
+        edit_ids = [int(edit_id) for edit_id in edit_ids]
+        if not edit_ids:
+            return []
+        pending = set()
+        with self._lock:
+            last_clear = self._last_clear()
+            for start in range(0, len(edit_ids), 500):
+                chunk = edit_ids[start:start + 500]
+                pending.update(edit_id for edit_id, in self._conn.execute(
+                    f"SELECT DISTINCT edit_id FROM {self.table}_edits WHERE undone_at IS NULL "
+                    f"AND edit_id > ? AND edit_id IN ({', '.join('?' for _ in chunk)})", [last_clear] + chunk
+                ))
+        return [edit_id for edit_id in edit_ids if edit_id in pending]
+
+    def undo(self, edit_id=None):
+        """
+        Batalkan satu kelompok edit (default: yang terakhir dan belum dibatalkan)
+
+        Melempar `EditConflictError` jika baris yang sama sudah diubah oleh edit
+        lain sesudahnya (edit itu harus dibatalkan lebih dulu) atau jika tabel
+        sudah dikosongkan sesudah edit itu.
+        """
+        with self._lock, self._conn:
+            last_clear = self._last_clear()
+            if edit_id is None:
+                edit_id, = self._conn.execute(
+                    f"SELECT MAX(edit_id) FROM {self.table}_edits WHERE undone_at IS NULL AND edit_id > ?",
+                    (last_clear,)
+                ).fetchone()
+            if edit_id is None:
+                return None
+            entries = self._conn.execute(
+                f"SELECT row_id, action, before FROM {self.table}_edits "
+                f"WHERE edit_id = ? AND undone_at IS NULL AND action != 'clear' ORDER BY seq DESC", (edit_id,)
+            ).fetchall()
+            if not entries:
+                return None
+            if edit_id < last_clear:
+                raise EditConflictError(f"Edit #{edit_id} tidak bisa dibatalkan: tabel sudah dikosongkan sesudahnya")
+            later = self._later_edits(edit_id, [row_id for row_id, _, _ in entries])
+            if later:
+                raise EditConflictError(
+                    f"Edit #{edit_id} tidak bisa dibatalkan: {later} baris sudah diubah lagi oleh edit berikutnya"
+                )
+            assignments = ', '.join(f"{identifier} = ?" for identifier in self._identifiers)
+            for row_id, action, before in entries:
+                if action == 'insert':
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE id = ?", (row_id,))
+                elif action == 'update':
+                    _, record = self._record_from_log(before)
+                    self._conn.execute(
+                        f"UPDATE {self.table} SET {assignments} WHERE id = ?", record + (row_id,)
+                    )
+                else:
+                    batch_id, record = self._record_from_log(before)
+                    # Tabel lama (tanpa AUTOINCREMENT) bisa sudah memakai ulang id ini
+                    # untuk baris lain; kembalikan baris dengan id baru
+                    taken = self._conn.execute(
+                        f"SELECT 1 FROM {self.table} WHERE id = ?", (row_id,)
+                    ).fetchone()
+                    self._conn.execute(
+                        f"INSERT INTO {self.table} (id, batch_id, {', '.join(self._identifiers)}) "
+                        f"VALUES ({', '.join('?' for _ in range(len(self.columns) + 2))})",
+                        (None if taken else row_id, batch_id) + record
+                    )
+            self._conn.execute(
+                f"UPDATE {self.table}_edits SET undone_at = ? WHERE edit_id = ?", (time.time(), edit_id)
+            )
+            self._version += 1
+        return edit_id
+
+    def edit_log(self, limit=100):
+        """
+        Riwayat edit terbaru untuk audit (satu baris per baris data yang disentuh)
+        """
+        with self._lock:
+            frame = pd.read_sql_query(
+                f"SELECT edit_id, row_id, action, before, after, source, created_at, undone_at "
+                f"FROM {self.table}_edits ORDER BY seq DESC LIMIT {int(limit)}",
+                self._conn
+            )
+        for column in ('created_at', 'undone_at'):
+            frame[column] = pd.to_datetime(frame[column], unit='s')
+        return frame
+
+    def clear(self):
+        """
+        Kosongkan tabel. Log edit tetap ada dan pengosongan dicatat sebagai satu
+        edit_id; id baris dan edit_id tidak mulai lagi dari 1, sehingga edit_id
+        yang masih dipegang sesi lain tidak pernah menunjuk edit baru.
+        """
+        with self._lock, self._conn:
+            last_row_id, = self._conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {self.table}").fetchone()
+            sequence = self._conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = ?", (self.table,)
+            ).fetchone() if self._has_sequence() else None
+            last_row_id = max(last_row_id, sequence[0] if sequence else 0)
+
+            # DROP + buat ulang jauh lebih cepat daripada DELETE per baris lewat trigger agregat
+            self._conn.execute(f"DROP TABLE IF EXISTS {self.table}")
+            self._conn.execute(f"DELETE FROM {self.table}_aggregates")
+            self._conn.execute(f"DELETE FROM {self.table}_batches")
+            self._create_tables()
+            # DROP ikut menghapus urutan AUTOINCREMENT tabel; lanjutkan dari id terakhir
+            self._conn.execute(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (self.table, last_row_id)
+            )
+            self._conn.execute(
+                f"INSERT INTO {self.table}_edits (edit_id, row_id, action, source, created_at) "
+                f"SELECT COALESCE(MAX(edit_id), 0) + 1, 0, 'clear', 'clear', ? FROM {self.table}_edits",
+                (time.time(),)
+            )
+            self._version += 1
+
+    def _has_sequence(self):
+        # sqlite_sequence baru ada setelah tabel AUTOINCREMENT pertama dibuat
+        return self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_sequence'"
+        ).fetchone() is not None
+
+    def close(self):
+        """
+        Tutup koneksi; jangan dipanggil untuk store bersama dari `get_asset_store`
+        """
+        with self._lock:
+            self._conn.close()
+
+    def stats(self):
+        with self._lock:
+            rows, = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+            batches, = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}_batches").fetchone()
+        return {
+            'path': self.path,
+            'table': self.table,
+            'rows': rows,
+            'batches': batches,
+            'bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_asset_store(table, columns, path=DEFAULT_STORE_PATH):
+    """
+    Instance store bersama untuk seluruh proses (satu per file dan tabel)
+    """
+    key = (os.path.abspath(path), column_identifier(table))
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = AssetStore(table, columns, path)
+            _STORES[key] = store
+        return store
@@ -0,0 +1,195 @@
+"""
+Pipeline struk berbasis asyncio dengan `generate_content_async`.
+
+Encoding gambar (di thread), OCR, dan analysis untuk struk yang berbeda
+berjalan tumpang tindih; jumlah panggilan API yang berjalan bersamaan
+dibatasi semaphore, dan setiap panggilan melewati penjadwal kuota. Bisa dipakai dari Streamlit lewat `BackgroundPipelineRun`
+(loop di thread terpisah, bisa dibatalkan) atau secara headless lewat
+`run_pipeline`.
+"""
+import asyncio
+import threading
+import time
+
+from asset_ocr.gemini_client import agenerate_content
+from asset_ocr.image_preprocessing import prepare_for_upload
+
+
+class AsyncReceiptResult:
+    def __init__(self, name):
+        self.name = name
+        self.ocr_text = None
+        self.analysis_text = None
+        self.error = None
+        self.timings = {}
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class AsyncReceiptPipeline:
+    def __init__(self, api_key, ocr_prompt, analysis_prompt_template=None,
+                 model_name='gemini-1.5-flash', ocr_generation_config=None,
+                 concurrency=4, encode_concurrency=2, upload_settings=None,
+                 model_factory=None, scheduler=None):
+        """
+        Jika analysis_prompt_template None, keluaran OCR langsung menjadi hasil
+        analisis (mode satu tahap dengan ocr_generation_config JSON).
+        """
+        self.api_key = api_key
+        self.ocr_prompt = ocr_prompt
+        self.analysis_prompt_template = analysis_prompt_template
+        self.model_name = model_name
+        self.ocr_generation_config = ocr_generation_config
+        self.concurrency = max(1, int(concurrency))
+        self.encode_concurrency = max(1, int(encode_concurrency))
+        self.upload_settings = upload_settings
+        self.model_factory = model_factory
+        self.scheduler = scheduler
+
+    def _model(self, generation_config=None):
+        if self.model_factory is not None:
+            return self.model_factory(self.api_key, self.model_name, generation_config)
+        from asset_ocr.gemini_client import get_async_model
+
+        return get_async_model(self.api_key, self.model_name, generation_config)
+
+    async def _timed(self, result, stage, semaphore, coroutine_fn):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                return await coroutine_fn()
+            finally:
+                result.timings[stage] = time.perf_counter() - start
+
+    async def _process(self, name, image, encode_semaphore, api_semaphore):
+        result = AsyncReceiptResult(name)
+        try:
+            data, mime_type, _ = await self._timed(
+                result, 'encode', encode_semaphore,
+                lambda: asyncio.to_thread(prepare_for_upload, image, self.upload_settings)
+            )
+
+            ocr_model = self._model(self.ocr_generation_config)
+            response = await self._timed(
+                result, 'ocr', api_semaphore,
+                lambda: agenerate_content(
+                    self.api_key, ocr_model,
+                    [self.ocr_prompt, {'mime_type': mime_type, 'data': data}],
+                    scheduler=self.scheduler
+                )
+            )
+
+            if self.analysis_prompt_template is None:
+                result.analysis_text = response.text
+                return result
+
+            result.ocr_text = response.text
+            analysis_model = self._model()
+            prompt = self.analysis_prompt_template.format(text=result.ocr_text)
+            response = await self._timed(
+                result, 'analysis', api_semaphore,
+                lambda: agenerate_content(
+                    self.api_key, analysis_model, prompt, scheduler=self.scheduler
+                )
+            )
+            result.analysis_text = response.text
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            result.error = e
+        return result
+
+    async def run(self, items, on_progress=None):
+        """
+        Proses list (nama, gambar PIL); on_progress(selesai, total, hasil)
+        dipanggil setiap struk selesai. Urutan hasil mengikuti input.
+        """
+        items = list(items)
+        encode_semaphore = asyncio.Semaphore(self.encode_concurrency)
+        api_semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            asyncio.create_task(self._process(name, image, encode_semaphore, api_semaphore))
+            for name, image in items
+        ]
+        try:
+            done = 0
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                done += 1
+                if on_progress is not None:
+                    on_progress(done, len(tasks), result)
+            return [task.result() for task in tasks]
+        finally:
+            # Batalkan struk yang belum selesai jika run dibatalkan
+            for task in tasks:
+                task.cancel()
+            if self.model_factory is None:
+                from asset_ocr.gemini_client import aclose_loop_models
+
+                await aclose_loop_models()
+
+
+def run_pipeline(pipeline, items, on_progress=None):
+    """
+    Jalankan pipeline secara sinkron (untuk skrip/batch headless)
+    """
+    return asyncio.run(pipeline.run(items, on_progress))
+
+
+class BackgroundPipelineRun:
+    """
+    Menjalankan pipeline di event loop pada thread terpisah sehingga script
+    Streamlit bisa memantau progres dan membatalkannya saat pengguna berpindah.
+    """
+
+    def __init__(self, pipeline, items):
+        self.pipeline = pipeline
+        self.items = list(items)
+        self.total = len(self.items)
+        self.completed = 0
+        self.results = None
+        self.error = None
+        self.cancelled = False
+        self._loop = asyncio.new_event_loop()
+        self._task = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._main, daemon=True)
+
+    def _on_progress(self, done, total, result):
+        self.completed = done
+
+    def _main(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._task = self._loop.create_task(self.pipeline.run(self.items, self._on_progress))
+            self._ready.set()
+            self.results = self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        finally:
+            self._ready.set()
+            self._loop.close()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._ready.wait()
+        if self._task is not None and not self._task.done():
+            try:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            except RuntimeError:
+                # Loop sudah ditutup: run selesai di antara pengecekan dan pembatalan
+                pass
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return self.done()
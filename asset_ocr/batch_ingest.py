@@ -0,0 +1,490 @@
+"""
+Ingest struk headless dari direktori atau tarball, tanpa Streamlit.
+
+Memakai prompt main_ocr2.py (`asset_ocr.prompts`), `AsyncReceiptPipeline`,
+dan `parse_many` yang sama dengan aplikasi. Gambar diproses per batch
+(`--batch-size`); setiap batch yang selesai ditulis ke keluaran lalu dicatat
+di checkpoint SQLite, sehingga run yang terputus bisa dilanjutkan dan hanya
+batch yang belum tercatat yang diproses ulang:
+
+- CSV: ditambahkan ke satu file; checkpoint menyimpan ukuran file setelah
+  batch terakhir dan sisa tulisan batch yang terputus dipotong saat lanjut
+- Parquet: satu file part per batch di direktori keluaran (ditulis ke nama
+  sementara lalu di-rename); part di luar checkpoint dihapus saat lanjut
+- SQLite: `AssetStore` (tabel yang sama dengan aplikasi); checkpoint disimpan
+  di database yang sama dan dicatat dalam transaksi simpan batch
+
+Dengan `--mock` model diganti `FakeGenerativeModel` sehingga bisa dijalankan
+tanpa jaringan dan tanpa API key.
+
+Contoh:
+    python -m asset_ocr.batch_ingest struk/ hasil.csv --concurrency 8
+    python -m asset_ocr.batch_ingest struk.tar.gz data/assets.sqlite --table main_ocr2_assets
+    python -m asset_ocr.batch_ingest struk/ hasil.parquet --mock --mock-latency 0.2
+"""
+import argparse
+import io
+import json
+import os
+import sqlite3
+import tarfile
+import time
+
+from asset_ocr.analysis_parser import parse_many
+from asset_ocr.async_pipeline import AsyncReceiptPipeline, run_pipeline
+from asset_ocr.prompts import MAIN_OCR2_PROMPTS, STRUCTURED_FIELD_COLUMNS
+from asset_ocr.request_scheduler import DEFAULT_RPM, get_scheduler
+from asset_ocr.schema import COLUMNS_7, coerce_frame
+from asset_ocr.validation import validate_frame
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.tif', '.tiff')
+OUTPUT_FORMATS = ('csv', 'parquet', 'sqlite')
+EXTRACTION_MODES = ('two_stage', 'one_shot')
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_TABLE = 'main_ocr2_assets'
+MOCK_RPM = 1_000_000
+
+
+def is_image_name(name):
+    return name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def _open_image(data):
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        image = Image.open(io.BytesIO(data) if isinstance(data, bytes) else data)
+    except UnidentifiedImageError:
+        raise ValueError("format gambar tidak dikenali") from None
+    image.load()
+    return image
+
+
+def iter_sources(path):
+    """
+    (nama, loader) untuk setiap gambar di direktori (rekursif) atau tarball,
+    terurut; nama relatif terhadap sumber dan menjadi kunci checkpoint.
+    Gambar baru dibaca saat loader dipanggil.
+    """
+    if os.path.isdir(path):
+        for root, directories, files in os.walk(path):
+            directories.sort()
+            for name in sorted(files):
+                if is_image_name(name):
+                    full_path = os.path.join(root, name)
+                    relative = os.path.relpath(full_path, path).replace(os.sep, '/')
+                    yield relative, lambda full_path=full_path: _open_image(full_path)
+        return
+
+    if not tarfile.is_tarfile(path):
+        raise ValueError(f"Sumber bukan direktori atau tarball: {path}")
+    with tarfile.open(path, 'r:*') as archive:
+        for member in archive:
+            if member.isfile() and is_image_name(member.name):
+                yield member.name, lambda member=member: _open_image(archive.extractfile(member).read())
+
+
+def _batches(sources, done, batch_size, limit=None):
+    """
+    Batch berisi (nama, gambar, error baca) untuk sumber yang belum selesai.
+    Gambar dibaca selagi sumber masih terbuka (tarball ditutup setelah iterasi).
+    """
+    batch, taken = [], 0
+    for name, loader in sources:
+        if name in done:
+            continue
+        if limit is not None and taken >= limit:
+            break
+        try:
+            batch.append((name, loader(), None))
+        except Exception as e:
+            batch.append((name, None, f"Gagal membaca gambar: {e}"))
+        taken += 1
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class IngestCheckpoint:
+    """
+    Catatan file dan batch yang sudah selesai, di database SQLite
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_files (
+                    name TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    batch INTEGER,
+                    finished_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_batches (
+                    batch INTEGER PRIMARY KEY,
+                    files INTEGER NOT NULL,
+                    failed INTEGER NOT NULL,
+                    rows INTEGER NOT NULL,
+                    marker TEXT,
+                    seconds REAL NOT NULL,
+                    finished_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_config (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+
+    def check_config(self, config):
+        """
+        Simpan konfigurasi run pertama; tolak lanjutan dengan konfigurasi berbeda
+        """
+        with self._conn:
+            for key, value in config.items():
+                row = self._conn.execute("SELECT value FROM ingest_config WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self._conn.execute("INSERT INTO ingest_config (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+                elif json.loads(row[0]) != value:
+                    raise ValueError(
+                        f"Checkpoint {self.path} dibuat dengan {key}={json.loads(row[0])!r}, bukan {value!r}"
+                    )
+
+    def done_names(self):
+        """
+        File yang sudah berhasil; file yang gagal dicoba lagi saat lanjut
+        """
+        return {name for name, in self._conn.execute("SELECT name FROM ingest_files WHERE status = 'ok'")}
+
+    def marker(self):
+        row = self._conn.execute("SELECT marker FROM ingest_batches ORDER BY batch DESC LIMIT 1").fetchone()
+        if row is None:
+            # Belum ada batch tercatat: posisi awal keluaran dari `mark_start`, jika ada
+            row = self._conn.execute("SELECT value FROM ingest_config WHERE key = 'start_marker'").fetchone()
+        return None if row is None or row[0] is None else json.loads(row[0])
+
+    def mark_start(self, marker=0):
+        """
+        Catat posisi awal keluaran (kosong) sebelum batch pertama ditulis, agar
+        run yang terputus sebelum checkpoint pertama tercatat tetap bisa dilanjutkan
+        """
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO ingest_config (key, value) VALUES ('start_marker', ?)", (json.dumps(marker),)
+            )
+
+    def next_batch(self):
+        return self._conn.execute("SELECT COALESCE(MAX(batch), 0) + 1 FROM ingest_batches").fetchone()[0]
+
+    def record(self, batch, results, rows, marker, seconds, conn=None):
+        """
+        Catat satu batch; dengan `conn` dijalankan di transaksi milik pemanggil
+        """
+        now = time.time()
+        statements = [
+            ("INSERT INTO ingest_batches (batch, files, failed, rows, marker, seconds, finished_at) "
+             "VALUES (?, ?, ?, ?, ?, ?, ?)",
+             [(batch, len(results), sum(error is not None for _, error in results), rows,
+               json.dumps(marker), seconds, now)]),
+            ("INSERT INTO ingest_files (name, status, error, batch, finished_at) VALUES (?, ?, ?, ?, ?) "
+             "ON CONFLICT (name) DO UPDATE SET status = excluded.status, error = excluded.error, "
+             "batch = excluded.batch, finished_at = excluded.finished_at",
+             [(name, 'ok' if error is None else 'error', error, batch, now) for name, error in results]),
+        ]
+        if conn is not None:
+            for sql, params in statements:
+                conn.executemany(sql, params)
+            return
+        with self._conn:
+            for sql, params in statements:
+                self._conn.executemany(sql, params)
+
+    def summary(self):
+        files = dict(self._conn.execute("SELECT status, COUNT(*) FROM ingest_files GROUP BY status").fetchall())
+        batches, rows = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(rows), 0) FROM ingest_batches").fetchone()
+        return {'ok': files.get('ok', 0), 'error': files.get('error', 0), 'batches': batches, 'rows': rows}
+
+    def errors(self, limit=20):
+        return self._conn.execute(
+            "SELECT name, error FROM ingest_files WHERE status = 'error' ORDER BY name LIMIT ?", (limit,)
+        ).fetchall()
+
+    def close(self):
+        self._conn.close()
+
+
+class CSVSink:
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = list(columns)
+
+    def resume(self, marker):
+        """
+        Potong tulisan batch yang tidak sempat dicatat checkpoint
+        """
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if marker is None and size:
+            raise FileExistsError(f"{self.path} sudah ada tetapi tidak tercatat di checkpoint")
+        if marker is not None and size > marker:
+            with open(self.path, 'r+b') as handle:
+                handle.truncate(marker)
+
+    def write(self, frame, record):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'ab') as handle:
+            if not frame.empty:
+                text = frame.to_csv(index=False, header=handle.tell() == 0, date_format='%Y-%m-%d')
+                handle.write(text.encode('utf-8'))
+                handle.flush()
+                os.fsync(handle.fileno())
+            marker = handle.tell()
+        record(marker)
+
+    def close(self):
+        pass
+
+
+class ParquetSink:
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = list(columns)
+
+    def _parts(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(name for name in os.listdir(self.path) if name.startswith('part-'))
+
+    def resume(self, marker):
+        """
+        Hapus part (dan file sementara) yang tidak tercatat di checkpoint
+        """
+        parts = self._parts()
+        if marker is None and parts:
+            raise FileExistsError(f"{self.path} sudah berisi part tetapi tidak tercatat di checkpoint")
+        for name in parts[marker or 0:]:
+            os.remove(os.path.join(self.path, name))
+        if os.path.isdir(self.path):
+            for name in os.listdir(self.path):
+                if name.endswith('.tmp'):
+                    os.remove(os.path.join(self.path, name))
+
+    def write(self, frame, record):
+        os.makedirs(self.path, exist_ok=True)
+        parts = len(self._parts())
+        if not frame.empty:
+            name = os.path.join(self.path, f"part-{parts:05d}.parquet")
+            frame.to_parquet(f"{name}.tmp", index=False)
+            os.replace(f"{name}.tmp", name)
+            parts += 1
+        record(parts)
+
+    def close(self):
+        pass
+
+
+class SQLiteSink:
+    def __init__(self, path, columns, table=DEFAULT_TABLE):
+        from asset_ocr.asset_store import AssetStore
+
+        self.path = path
+        self.store = AssetStore(table, columns, path)
+
+    def resume(self, marker):
+        # Simpan batch dan checkpoint satu transaksi: tidak ada sisa tulisan
+        pass
+
+    def write(self, frame, record):
+        if frame.empty:
+            record(None)
+            return
+        self.store.append(frame, before_commit=lambda conn, batch_id: record(batch_id, conn))
+
+    def close(self):
+        self.store.close()
+
+
+def infer_format(path):
+    lowered = path.lower()
+    if lowered.endswith('.csv'):
+        return 'csv'
+    if lowered.endswith('.parquet'):
+        return 'parquet'
+    if lowered.endswith(('.sqlite', '.sqlite3', '.db')):
+        return 'sqlite'
+    raise ValueError(f"Format keluaran tidak dikenali dari {path}; pakai --format")
+
+
+def make_sink(path, fmt, columns=COLUMNS_7, table=DEFAULT_TABLE):
+    if fmt == 'csv':
+        return CSVSink(path, columns)
+    if fmt == 'parquet':
+        return ParquetSink(path, columns)
+    if fmt == 'sqlite':
+        return SQLiteSink(path, columns, table)
+    raise ValueError(f"Format keluaran tidak dikenal: {fmt}")
+
+
+def default_checkpoint_path(output, fmt):
+    # SQLite: checkpoint di database yang sama agar tercatat atomik bersama batch
+    return output if fmt == 'sqlite' else f"{output.rstrip('/')}.checkpoint.sqlite"
+
+
+def build_pipeline(api_key, mode='two_stage', concurrency=4, model_factory=None, scheduler=None,
+                   prompts=MAIN_OCR2_PROMPTS):
+    """
+    Pipeline async untuk mode ekstraksi (`two_stage`/`one_shot`) dengan prompt
+    aplikasi `prompts`; dipakai juga oleh `asset_ocr.receipt_runner`
+    """
+    if mode == 'one_shot':
+        return AsyncReceiptPipeline(
+            api_key, prompts.structured_prompt, model_name=prompts.model_name,
+            ocr_generation_config={
+                'response_mime_type': 'application/json',
+                'response_schema': prompts.response_schema,
+            },
+            concurrency=concurrency, model_factory=model_factory, scheduler=scheduler
+        )
+    return AsyncReceiptPipeline(
+        api_key, prompts.ocr_prompt, prompts.analysis_template, model_name=prompts.model_name,
+        concurrency=concurrency, model_factory=model_factory, scheduler=scheduler
+    )
+
+
+def ingest(source, sink, checkpoint, pipeline, columns=COLUMNS_7, batch_size=DEFAULT_BATCH_SIZE,
+           limit=None, on_batch=None):
+    """
+    Proses semua gambar `source` yang belum tercatat di checkpoint.
+    on_batch(nomor, statistik) dipanggil setiap batch selesai.
+    """
+    sink.resume(checkpoint.marker())
+    checkpoint.mark_start()
+    done = checkpoint.done_names()
+    batch_number = checkpoint.next_batch()
+
+    for batch in _batches(iter_sources(source), done, batch_size, limit):
+        start = time.perf_counter()
+        errors = {name: error for name, _, error in batch if error is not None}
+        items = [(name, image) for name, image, error in batch if error is None]
+
+        texts = []
+        for result in run_pipeline(pipeline, items) if items else []:
+            if result.ok:
+                texts.append(result.analysis_text)
+            else:
+                errors[result.name] = str(result.error)
+        for _, image in items:
+            image.close()
+
+        frame = coerce_frame(parse_many(texts, columns, STRUCTURED_FIELD_COLUMNS), columns)
+        results = [(name, errors.get(name)) for name, _, _ in batch]
+        seconds = time.perf_counter() - start
+        sink.write(
+            frame,
+            lambda marker, conn=None: checkpoint.record(
+                batch_number, results, len(frame), marker, seconds, conn
+            )
+        )
+        if on_batch is not None:
+            on_batch(batch_number, {
+                'files': len(batch),
+                'failed': len(errors),
+                'rows': len(frame),
+                'invalid': int((validate_frame(frame) != '').sum()) if len(frame) else 0,
+                'seconds': seconds,
+            })
+        batch_number += 1
+    return checkpoint.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', help="Direktori gambar struk atau tarball (.tar/.tar.gz/.tgz)")
+    parser.add_argument('output', help="File .csv, direktori .parquet, atau database .sqlite")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, help="Default: dari ekstensi keluaran")
+    parser.add_argument('--table', default=DEFAULT_TABLE, help="Tabel AssetStore untuk keluaran SQLite")
+    parser.add_argument('--checkpoint', help="Default: <output>.checkpoint.sqlite (SQLite: database keluaran)")
+    parser.add_argument('--mode', choices=EXTRACTION_MODES, default='two_stage')
+    parser.add_argument('--concurrency', type=int, default=4, help="Panggilan API bersamaan")
+    parser.add_argument('--rpm', type=int, help=f"Kuota request/menit (default {DEFAULT_RPM}; --mock: tanpa batas)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Gambar per checkpoint")
+    parser.add_argument('--limit', type=int, help="Proses paling banyak N gambar baru pada run ini")
+    parser.add_argument('--mock', action='store_true', help="Pakai FakeGenerativeModel (tanpa jaringan)")
+    parser.add_argument('--mock-latency', type=float, default=0.0)
+    parser.add_argument('--mock-error-rate', type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or infer_format(args.output)
+    model_factory = None
+    if args.mock:
+        from asset_ocr.fake_gemini import default_responder, fake_model_factory, json_responder
+
+        model_factory = fake_model_factory(
+            latency=args.mock_latency, error_rate=args.mock_error_rate,
+            responder=json_responder if args.mode == 'one_shot' else default_responder
+        )
+        api_key = 'offline'
+    else:
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+        api_key = os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            parser.error("GEMINI_API_KEY belum diatur (atau pakai --mock)")
+
+    sink = make_sink(args.output, fmt, COLUMNS_7, args.table)
+    checkpoint = IngestCheckpoint(args.checkpoint or default_checkpoint_path(args.output, fmt))
+    checkpoint.check_config({'format': fmt, 'mode': args.mode, 'columns': list(COLUMNS_7), 'table': args.table})
+    # Penjadwal kuota mengikuti paralelisme yang diminta, bukan batas default aplikasi
+    rpm = args.rpm or (MOCK_RPM if args.mock else DEFAULT_RPM)
+    scheduler = get_scheduler(api_key, requests_per_minute=rpm, max_concurrent=max(1, args.concurrency))
+    pipeline = build_pipeline(api_key, args.mode, args.concurrency, model_factory, scheduler)
+
+    start = time.perf_counter()
+
+    def on_batch(number, stats):
+        rate = stats['files'] / stats['seconds'] if stats['seconds'] else 0.0
+        print(
+            f"[batch {number}] {stats['files']} gambar ({stats['failed']} gagal), "
+            f"{stats['rows']} baris ({stats['invalid']} tidak lolos validasi), "
+            f"{stats['seconds']:.1f} s, {rate:.1f} gambar/s",
+            flush=True
+        )
+
+    try:
+        summary = ingest(
+            args.source, sink, checkpoint, pipeline, COLUMNS_7,
+            batch_size=max(1, args.batch_size), limit=args.limit, on_batch=on_batch
+        )
+    except KeyboardInterrupt:
+        print("Dihentikan; jalankan perintah yang sama untuk melanjutkan dari checkpoint.")
+        return 130
+    finally:
+        sink.close()
+
+    print(
+        f"Selesai dalam {time.perf_counter() - start:.1f} s: {summary['ok']} gambar berhasil, "
+        f"{summary['error']} gagal, {summary['rows']} baris di {args.output}"
+    )
+    for name, error in checkpoint.errors():
+        print(f"  {name}: {error}")
+    checkpoint.close()
+    return 1 if summary['error'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+"""
+Eksekusi pipeline struk (OCR -> analisis -> parsing) untuk banyak gambar.
+
+Setiap gambar diproses di thread pool berukuran tetap, dan setiap tahap punya
+batas konkurensi sendiri (semaphore) agar mis. pemanggilan API analisis tidak
+melebihi kuota walaupun jumlah worker lebih besar.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class BatchItemResult:
+    def __init__(self, name):
+        self.name = name
+        self.output = None
+        self.error = None
+        self.failed_stage = None
+        self.timings = {}
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class BatchPipeline:
+    def __init__(self, stages, max_workers=4):
+        """
+        stages: list berisi (nama_tahap, fungsi, batas_konkurensi).
+        Keluaran satu tahap menjadi masukan tahap berikutnya.
+        """
+        self.stages = [
+            (name, fn, threading.BoundedSemaphore(max(1, int(limit))))
+            for name, fn, limit in stages
+        ]
+        self.max_workers = max(1, int(max_workers))
+
+    def _run_item(self, name, payload):
+        result = BatchItemResult(name)
+        value = payload
+        for stage_name, fn, semaphore in self.stages:
+            start = time.perf_counter()
+            try:
+                with semaphore:
+                    value = fn(value)
+            except Exception as e:
+                result.error = e
+                result.failed_stage = stage_name
+                return result
+            finally:
+                result.timings[stage_name] = time.perf_counter() - start
+        result.output = value
+        return result
+
+    def run(self, items, on_progress=None):
+        """
+        Proses list (nama, payload); on_progress(selesai, total, hasil) dipanggil
+        dari thread pemanggil setiap satu item selesai. Urutan hasil mengikuti input.
+        """
+        items = list(items)
+        results = [None] * len(items)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._run_item, name, payload): index
+                for index, (name, payload) in enumerate(items)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                results[index] = future.result()
+                if on_progress is not None:
+                    on_progress(done, len(items), results[index])
+
+        return results
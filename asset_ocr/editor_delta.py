@@ -0,0 +1,74 @@
+"""
+Perubahan `st.data_editor` dibaca dari change set-nya, bukan dari DataFrame
+yang dikembalikan.
+
+Streamlit menyimpan perubahan editor di `st.session_state[key]` sebagai
+`edited_rows` ({posisi baris: {kolom: nilai baru}}), `added_rows` (list dict)
+dan `deleted_rows` (list posisi). Dengan itu hanya baris yang disentuh yang
+dibandingkan dan ditulis balik, sehingga biaya rerun sebanding dengan jumlah
+edit, bukan ukuran halaman/tabel.
+
+Change set tetap ada di session state selama kunci editor sama, jadi setelah
+perubahan diterapkan UI harus mengganti kunci editor (mis. memuat versi
+tabel) agar edit yang sama tidak diterapkan dua kali.
+"""
+import pandas as pd
+
+from asset_ocr.schema import coerce_frame, editable_frame
+
+
+def _differs(left, right):
+    # Kategori dibandingkan sebagai string agar beda kategori tidak memicu TypeError
+    left, right = editable_frame(left), editable_frame(right)
+    same = left.eq(right).fillna(False) | (left.isna() & right.isna())
+    return ~same.astype(bool)
+
+
+def changed_rows(page, edited_rows, columns):
+    """
+    Baris `page` yang benar-benar berubah menurut `edited_rows`, dengan nilai
+    baru dan dtype skema; index tetap index `page` (id baris di store)
+    """
+    positions = sorted(int(position) for position in (edited_rows or {}) if int(position) < len(page))
+    if not positions:
+        return coerce_frame(page.iloc[:0], columns)
+
+    original = coerce_frame(page.iloc[positions], columns)
+    # Lewat object agar teks dari editor (mis. tanggal ISO) bisa ditaruh di kolom bertipe
+    rows = original.astype(object)
+    for position in positions:
+        values = edited_rows.get(position, edited_rows.get(str(position), {}))
+        for column, value in values.items():
+            if column in rows.columns:
+                rows.at[page.index[position], column] = value
+    rows = coerce_frame(rows, columns)
+
+    return rows[_differs(rows, original).any(axis=1).to_numpy()]
+
+
+def added_frame(added_rows, columns):
+    """
+    Baris baru dari `added_rows`, dengan dtype skema; baris yang masih kosong dilewati
+    """
+    frame = coerce_frame(pd.DataFrame(list(added_rows or []), columns=list(columns)), columns)
+    return frame[frame.notna().any(axis=1).to_numpy()].reset_index(drop=True)
+
+
+def deleted_labels(page, deleted_rows):
+    """
+    Label index `page` untuk posisi di `deleted_rows`
+    """
+    positions = sorted(int(position) for position in (deleted_rows or []) if int(position) < len(page))
+    return list(page.index[positions])
+
+
+def editor_delta(page, state, columns):
+    """
+    (baris berubah, baris baru, label terhapus) dari state sebuah st.data_editor
+    """
+    state = state or {}
+    return (
+        changed_rows(page, state.get('edited_rows'), columns),
+        added_frame(state.get('added_rows'), columns),
+        deleted_labels(page, state.get('deleted_rows')),
+    )
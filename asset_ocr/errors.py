@@ -0,0 +1,57 @@
+"""
+Exception layanan inti, terpisah dari UI.
+
+Layanan di `asset_ocr` melempar turunan `ServiceError` alih-alih memanggil
+`st.error`; aplikasi Streamlit menangkapnya dan memilih cara menampilkannya,
+sedangkan worker/CLI bisa mencatat atau mengirimnya balik sebagai hasil.
+Exception ini bisa di-pickle (penyebab asli disimpan sebagai teks) sehingga
+aman dikembalikan dari process pool.
+"""
+
+
+class ServiceError(Exception):
+    # Tahap pipeline tempat kegagalan terjadi
+    stage = 'service'
+
+    def __init__(self, message, cause=None):
+        super().__init__(message)
+        self.message = message
+        # Nama tipe exception asli (bukan objeknya, yang belum tentu bisa di-pickle)
+        self.cause = type(cause).__name__ if cause is not None else None
+
+    def __reduce__(self):
+        return _restore, (type(self), self.message, self.cause)
+
+
+def _restore(cls, message, cause):
+    error = cls(message)
+    error.cause = cause
+    return error
+
+
+class OCRError(ServiceError):
+    stage = 'ocr'
+
+
+class AnalysisError(ServiceError):
+    stage = 'analysis'
+
+
+class ExtractionError(ServiceError):
+    stage = 'extraction'
+
+
+class ParseError(ServiceError):
+    stage = 'parse'
+
+
+class ReportError(ServiceError):
+    stage = 'report'
+
+
+class ExportError(ServiceError):
+    stage = 'export'
+
+
+class EditConflictError(ServiceError):
+    stage = 'edit'
@@ -0,0 +1,258 @@
+"""
+Ekspor tabel aset ke buffer per permintaan, untuk diunduh lewat browser.
+
+Setiap ekspor ditulis ke `SpooledTemporaryFile` miliknya sendiri (di memori
+sampai batas tertentu, lalu pindah ke file sementara), bukan ke nama file
+tetap di direktori kerja server, sehingga pengguna yang mengekspor bersamaan
+tidak saling menimpa. Data dibaca per potongan (`AssetStore.iter_chunks`)
+dan langsung ditulis:
+
+- CSV dan CSV gzip: per potongan, header sekali
+- Parquet: satu row group per potongan lewat `pyarrow.parquet.ParquetWriter`
+- Excel: xlsxwriter mode `constant_memory` (baris ditulis lalu dilepas);
+  tabel di atas batas baris Excel dilanjutkan ke sheet berikutnya
+
+`ExportJob` menjalankan ekspor di thread terpisah agar script Streamlit tidak
+terblokir; progres dibaca dari `rows_written`.
+"""
+import gzip
+import io
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from asset_ocr.errors import ExportError
+
+DEFAULT_CHUNK_ROWS = 50_000
+DEFAULT_SPOOL_BYTES = 32 * 1024 * 1024
+EXCEL_MAX_ROWS = 1_048_576
+
+# Format -> (label, MIME, ekstensi, modul opsional yang dibutuhkan)
+EXPORT_FORMATS = {
+    'csv': ('CSV', 'text/csv', '.csv', None),
+    'csv.gz': ('CSV (gzip)', 'application/gzip', '.csv.gz', None),
+    'parquet': ('Parquet', 'application/vnd.apache.parquet', '.parquet', 'pyarrow'),
+    'xlsx': ('Excel', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', '.xlsx', 'xlsxwriter'),
+}
+
+
+def _module_available(name):
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+
+def available_formats():
+    """
+    Format ekspor yang dependensinya terpasang
+    """
+    return [
+        fmt for fmt, (_, _, _, module) in EXPORT_FORMATS.items()
+        if module is None or _module_available(module)
+    ]
+
+
+def export_filename(fmt, prefix='asset_data'):
+    return f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}{EXPORT_FORMATS[fmt][2]}"
+
+
+def _without_index(chunks):
+    # Index potongan dari store adalah id baris; tidak ikut diekspor
+    for chunk in chunks:
+        yield chunk.reset_index(drop=True)
+
+
+def write_csv(chunks, fileobj, compress=False, on_rows=None):
+    """
+    Tulis potongan DataFrame sebagai satu CSV (opsional gzip) ke `fileobj`
+    """
+    target = gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=6) if compress else fileobj
+    text = io.TextIOWrapper(target, encoding='utf-8', newline='')
+    try:
+        for index, chunk in enumerate(_without_index(chunks)):
+            chunk.to_csv(text, index=False, header=index == 0, date_format='%Y-%m-%d')
+            if on_rows:
+                on_rows(len(chunk))
+        text.flush()
+    finally:
+        # Lepas wrapper tanpa menutup fileobj milik pemanggil
+        text.detach()
+        if compress:
+            target.close()
+
+
+def write_parquet(chunks, fileobj, on_rows=None):
+    """
+    Tulis potongan DataFrame sebagai satu file Parquet, satu row group per potongan
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in _without_index(chunks):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(fileobj, table.schema, compression='snappy')
+            else:
+                # Kategori tiap potongan berbeda; samakan dengan skema potongan pertama
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            if on_rows:
+                on_rows(len(chunk))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _cell_kind(values):
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return 'date'
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return 'number'
+    return 'text'
+
+
+def _cell_values(values, kind):
+    if kind == 'date':
+        items = list(values.dt.to_pydatetime())
+    elif kind == 'number':
+        items = values.astype('float64').tolist()
+    else:
+        items = values.astype(object).tolist()
+    missing = values.isna().to_numpy()
+    if missing.any():
+        for position in missing.nonzero()[0]:
+            items[position] = None
+    if kind == 'text':
+        items = [item if item is None or isinstance(item, str) else str(item) for item in items]
+    return items
+
+
+def write_excel(chunks, fileobj, sheet_name='Aset', on_rows=None):
+    """
+    Tulis potongan DataFrame ke xlsx dengan memori konstan (xlsxwriter)
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(fileobj, {'constant_memory': True, 'in_memory': False})
+    date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+    sheet, row, sheets = None, 0, 0
+    try:
+        for chunk in _without_index(chunks):
+            columns = list(chunk.columns)
+            # Nilai per kolom sebagai objek Python dan jenis sel-nya, sekali per potongan
+            kinds = [_cell_kind(chunk[column]) for column in columns]
+            values = [_cell_values(chunk[column], kind) for column, kind in zip(columns, kinds)]
+            for record in zip(*values):
+                if sheet is None or row >= EXCEL_MAX_ROWS:
+                    sheets += 1
+                    sheet = workbook.add_worksheet(sheet_name if sheets == 1 else f"{sheet_name} {sheets}")
+                    sheet.write_row(0, 0, columns)
+                    writers = {
+                        'date': lambda r, c, v: sheet.write_datetime(r, c, v, date_format),
+                        'number': sheet.write_number,
+                        'text': sheet.write_string,
+                    }
+                    row = 1
+                for column, (value, kind) in enumerate(zip(record, kinds)):
+                    # None = sel kosong (NaN/NaT/NA)
+                    if value is not None:
+                        writers[kind](row, column, value)
+                row += 1
+            if on_rows:
+                on_rows(len(chunk))
+        if sheet is None:
+            workbook.add_worksheet(sheet_name)
+    finally:
+        workbook.close()
+
+
+WRITERS = {
+    'csv': write_csv,
+    'csv.gz': lambda chunks, fileobj, on_rows=None: write_csv(chunks, fileobj, compress=True, on_rows=on_rows),
+    'parquet': write_parquet,
+    'xlsx': write_excel,
+}
+
+
+def export_chunks(chunks, fmt, fileobj, on_rows=None):
+    """
+    Tulis potongan DataFrame ke `fileobj` dalam format `fmt`
+    """
+    if fmt not in WRITERS:
+        raise ExportError(f"Format ekspor tidak dikenal: {fmt}")
+    WRITERS[fmt](chunks, fileobj, on_rows=on_rows)
+
+
+class ExportJob:
+    """
+    Ekspor isi store di thread terpisah ke buffer sementara milik job ini.
+    """
+
+    def __init__(self, store, fmt, chunk_rows=DEFAULT_CHUNK_ROWS, spool_bytes=DEFAULT_SPOOL_BYTES):
+        if fmt not in available_formats():
+            raise ExportError(f"Format ekspor tidak tersedia: {fmt}")
+        self.store = store
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.filename = export_filename(fmt)
+        self.mime = EXPORT_FORMATS[fmt][1]
+        try:
+            self.total_rows = store.count()
+        except Exception as e:
+            raise ExportError(f"Gagal membaca tabel: {e}", e) from e
+        self.rows_written = 0
+        self.error = None
+        self.seconds = None
+        self._buffer = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        self._thread = threading.Thread(target=self._main, daemon=True)
+
+    def _on_rows(self, rows):
+        self.rows_written += rows
+
+    def _main(self):
+        start = time.perf_counter()
+        try:
+            export_chunks(self.store.iter_chunks(self.chunk_rows), self.fmt, self._buffer, self._on_rows)
+        except Exception as e:
+            self.error = e if isinstance(e, ExportError) else ExportError(str(e), e)
+        finally:
+            self.seconds = time.perf_counter() - start
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return self.done()
+
+    @property
+    def progress(self):
+        return min(1.0, self.rows_written / self.total_rows) if self.total_rows else 1.0
+
+    @property
+    def size(self):
+        if not self.done():
+            return None
+        return self._buffer.seek(0, io.SEEK_END)
+
+    def data(self):
+        """
+        Byte hasil ekspor (hanya setelah job selesai tanpa error)
+        """
+        if not self.done() or self.error:
+            return None
+        self._buffer.seek(0)
+        return self._buffer.read()
+
+    def close(self):
+        self._buffer.close()
@@ -0,0 +1,165 @@
+"""
+Pengganti GenerativeModel untuk pengujian dan benchmark tanpa jaringan.
+
+`FakeGenerativeModel` meniru `generate_content` dan `generate_content_async`
+dengan latensi yang bisa diatur, lalu mengembalikan teks tetap atau hasil
+fungsi `responder(contents)`. Model ini juga bisa menyuntikkan error 429/5xx
+secara acak atau menegakkan kuota request/menit seperti endpoint sungguhan.
+"""
+import asyncio
+import collections
+import random
+import threading
+import time
+
+SAMPLE_OCR_TEXT = """TOKO BANGUNAN SEJAHTERA
+2023-10-15
+Semen Tiga Roda 1.5 kg 50000 75000
+Paku 2 inch 2 pcs 1500 3000"""
+
+SAMPLE_ANALYSIS_CSV_5 = """'2023-10-15','Semen Tiga Roda','1.5','50000','75000'
+'2023-10-15','Paku 2 inch','2','1500','3000'"""
+
+SAMPLE_ANALYSIS_CSV_7 = """'2023-10-15','Semen Tiga Roda','1.5','kg','50000','75000','Toko Bangunan Sejahtera'
+'2023-10-15','Paku 2 inch','2','pcs','1500','3000','Toko Bangunan Sejahtera'"""
+
+SAMPLE_EXTRACTION_JSON = """[
+{"tanggal_beli": "2023-10-15", "nama_item": "Semen Tiga Roda", "quantity": 1.5, "jenis_satuan": "kg", "harga": 50000, "total_harga": 75000, "vendor": "Toko Bangunan Sejahtera"},
+{"tanggal_beli": "2023-10-15", "nama_item": "Paku 2 inch", "quantity": 2, "jenis_satuan": "pcs", "harga": 1500, "total_harga": 3000, "vendor": "Toko Bangunan Sejahtera"}
+]"""
+
+
+class FakeAPIError(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeRateLimit:
+    """
+    Kuota request per jendela waktu yang dibagi beberapa model palsu
+    """
+
+    def __init__(self, requests_per_minute, window=60.0):
+        self.requests_per_minute = requests_per_minute
+        self.window = window
+        self._calls = collections.deque()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def check(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._calls and now - self._calls[0] > self.window:
+                self._calls.popleft()
+            if len(self._calls) >= self.requests_per_minute:
+                self.rejected += 1
+                raise FakeAPIError("429 Resource has been exhausted (e.g. check quota).", 429)
+            self._calls.append(now)
+
+
+class FakeUsage:
+    def __init__(self, prompt_token_count, candidates_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class FakeResponse:
+    def __init__(self, text, prompt_tokens=0):
+        self.text = text
+        self.usage_metadata = FakeUsage(prompt_tokens, len(text.split()))
+
+
+class FakeStreamResponse:
+    """
+    Meniru respons `stream=True`: iterasi menghasilkan potongan dengan atribut `text`
+    """
+    def __init__(self, response, chunk_size=40, chunk_latency=0.0):
+        self.text = response.text
+        self.usage_metadata = response.usage_metadata
+        self.chunk_size = chunk_size
+        self.chunk_latency = chunk_latency
+
+    def __iter__(self):
+        for start in range(0, len(self.text), self.chunk_size):
+            if self.chunk_latency:
+                time.sleep(self.chunk_latency)
+            yield FakeResponse(self.text[start:start + self.chunk_size])
+
+
+def _estimate_tokens(contents):
+    if isinstance(contents, str):
+        return len(contents.split())
+    if isinstance(contents, (list, tuple)):
+        return sum(_estimate_tokens(part) for part in contents)
+    # Bagian gambar dihitung tetap seperti tarif Gemini per gambar
+    return 258
+
+
+def default_responder(contents):
+    """
+    Teks OCR untuk permintaan bergambar, CSV untuk permintaan teks saja
+    """
+    if isinstance(contents, (list, tuple)) and any(isinstance(part, dict) for part in contents):
+        return SAMPLE_OCR_TEXT
+    if "'Jenis Satuan'" in str(contents):
+        return SAMPLE_ANALYSIS_CSV_7
+    return SAMPLE_ANALYSIS_CSV_5
+
+
+def json_responder(contents):
+    """
+    Keluaran JSON terstruktur untuk mode ekstraksi satu tahap
+    """
+    return SAMPLE_EXTRACTION_JSON
+
+
+class FakeGenerativeModel:
+    def __init__(self, model_name='fake-gemini', generation_config=None, latency=0.0,
+                 responder=default_responder, error_rate=0.0, error_codes=(429, 503),
+                 rate_limit=None, seed=None):
+        self.model_name = model_name
+        self.generation_config = generation_config
+        self.latency = latency
+        self.responder = responder
+        self.error_rate = error_rate
+        self.error_codes = error_codes
+        self.rate_limit = rate_limit
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+
+    def _respond(self, contents):
+        self.calls += 1
+        if self.rate_limit is not None:
+            self.rate_limit.check()
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            code = self._random.choice(self.error_codes)
+            raise FakeAPIError(f"{code} error simulasi", code)
+        return FakeResponse(self.responder(contents), _estimate_tokens(contents))
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        response = self._respond(contents)
+        if stream:
+            return FakeStreamResponse(response)
+        return response
+
+    async def generate_content_async(self, contents, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(contents)
+
+
+def fake_model_factory(latency=0.0, responder=default_responder, **options):
+    """
+    Factory dengan tanda tangan sama seperti `gemini_client.get_async_model`
+    """
+    def factory(api_key, model_name, generation_config=None):
+        return FakeGenerativeModel(
+            model_name, generation_config, latency=latency, responder=responder, **options
+        )
+    return factory
@@ -0,0 +1,182 @@
+"""
+Pabrik client dan model Gemini yang di-cache per proses.
+
+`genai.configure()` mengubah konfigurasi global dan membuang client gRPC yang
+sudah ada, sehingga memanggilnya di setiap request membuat koneksi baru dan
+tidak aman saat beberapa sesi memakai API key berbeda. Di sini setiap API key
+punya client sendiri, dan model di-cache per (API key, nama model, konfigurasi
+generasi). Panggil `close_all()` untuk melepas koneksi (mis. saat shutdown).
+
+Pemanggilan model sebaiknya lewat `generate_content`/`agenerate_content` agar
+melewati penjadwal kuota (rate limit, retry) milik API key tersebut.
+"""
+import json
+import threading
+import weakref
+
+_LOCK = threading.Lock()
+_CLIENTS = {}
+_MODELS = {}
+_STATS = {'client_created': 0, 'model_created': 0, 'model_hits': 0}
+
+# Client async gRPC terikat ke event loop tempat ia dibuat, jadi di-cache per loop
+_ASYNC_MODELS = weakref.WeakKeyDictionary()
+
+
+def _config_key(generation_config):
+    if generation_config is None:
+        return None
+    if not isinstance(generation_config, dict):
+        # Objek GenerationConfig: pakai representasinya sebagai kunci
+        return repr(generation_config)
+    return json.dumps(generation_config, sort_keys=True, default=repr)
+
+
+def get_client(api_key):
+    """
+    Client GenerativeService milik satu API key (tanpa konfigurasi global)
+    """
+    with _LOCK:
+        client = _CLIENTS.get(api_key)
+        if client is None:
+            from google.ai import generativelanguage as glm
+
+            client = glm.GenerativeServiceClient(client_options={'api_key': api_key})
+            _CLIENTS[api_key] = client
+            _STATS['client_created'] += 1
+        return client
+
+
+def get_model(api_key, model_name='gemini-1.5-flash', generation_config=None):
+    """
+    Ambil GenerativeModel yang sudah dikonfigurasi dari cache
+    """
+    key = (api_key, model_name, _config_key(generation_config))
+    with _LOCK:
+        model = _MODELS.get(key)
+        if model is not None:
+            _STATS['model_hits'] += 1
+            return model
+
+    import google.generativeai as genai
+
+    client = get_client(api_key)
+    model = genai.GenerativeModel(model_name, generation_config=generation_config)
+    # Pakai client milik API key ini alih-alih client default global
+    model._client = client
+
+    with _LOCK:
+        # Jika thread lain lebih dulu membuat model yang sama, pakai milik mereka
+        model = _MODELS.setdefault(key, model)
+        _STATS['model_created'] += 1
+        return model
+
+
+def get_async_model(api_key, model_name='gemini-1.5-flash', generation_config=None):
+    """
+    Model untuk `generate_content_async`, di-cache per event loop yang sedang berjalan
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    key = (api_key, model_name, _config_key(generation_config))
+    with _LOCK:
+        models = _ASYNC_MODELS.setdefault(loop, {})
+        model = models.get(key)
+        if model is not None:
+            _STATS['model_hits'] += 1
+            return model
+
+    import google.generativeai as genai
+    from google.ai import generativelanguage as glm
+
+    model = genai.GenerativeModel(model_name, generation_config=generation_config)
+    model._async_client = glm.GenerativeServiceAsyncClient(client_options={'api_key': api_key})
+
+    with _LOCK:
+        model = _ASYNC_MODELS.setdefault(loop, {}).setdefault(key, model)
+        _STATS['model_created'] += 1
+        return model
+
+
+def generate_content(api_key, model, contents, scheduler=None, **kwargs):
+    """
+    Panggil `model.generate_content` lewat penjadwal kuota milik API key
+    """
+    from asset_ocr.request_scheduler import estimate_tokens, get_scheduler
+
+    scheduler = scheduler or get_scheduler(api_key)
+    return scheduler.call(
+        model.generate_content, contents,
+        estimated_tokens=estimate_tokens(contents), **kwargs
+    )
+
+
+def stream_content(api_key, model, contents, scheduler=None, **kwargs):
+    """
+    Generator teks per potongan dari `generate_content(stream=True)`
+
+    Hanya pembukaan stream yang melewati penjadwal (kuota dan retry); kesalahan
+    di tengah stream diteruskan ke pemanggil.
+    """
+    response = generate_content(api_key, model, contents, scheduler=scheduler, stream=True, **kwargs)
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            # Potongan tanpa teks (mis. hanya metadata/safety rating)
+            continue
+        if text:
+            yield text
+
+
+async def agenerate_content(api_key, model, contents, scheduler=None, **kwargs):
+    """
+    Versi async dari `generate_content`
+    """
+    from asset_ocr.request_scheduler import estimate_tokens, get_scheduler
+
+    scheduler = scheduler or get_scheduler(api_key)
+    return await scheduler.acall(
+        model.generate_content_async, contents,
+        estimated_tokens=estimate_tokens(contents), **kwargs
+    )
+
+
+async def aclose_loop_models():
+    """
+    Tutup client async milik event loop yang sedang berjalan
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    with _LOCK:
+        models = _ASYNC_MODELS.pop(loop, {})
+
+    for model in models.values():
+        try:
+            await model._async_client.transport.close()
+        except Exception:
+            pass
+
+
+def close_all():
+    """
+    Tutup semua koneksi client dan kosongkan cache
+    """
+    with _LOCK:
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+        _MODELS.clear()
+        _ASYNC_MODELS.clear()
+
+    for client in clients:
+        try:
+            client.transport.close()
+        except Exception:
+            pass
+
+
+def stats():
+    with _LOCK:
+        return dict(_STATS, clients=len(_CLIENTS), models=len(_MODELS))
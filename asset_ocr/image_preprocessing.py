@@ -0,0 +1,228 @@
+"""
+Pra-pemrosesan gambar struk sebelum diunggah ke model.
+
+Foto ponsel 12 MP yang di-encode ulang sebagai PNG lossless bisa berukuran
+beberapa MB. Di sini gambar diputar sesuai orientasi EXIF, sisi terpanjang
+dibatasi setara DPI tertentu, lalu di-encode ulang (grayscale, JPEG/WebP)
+tanpa metadata EXIF.
+
+Untuk engine OCR lokal tersedia `ReceiptPreprocessor` berbasis OpenCV
+(crop area struk, deskew, denoise, threshold adaptif) yang bisa diatur per engine.
+"""
+import io
+import os
+import time
+
+from PIL import Image, ImageOps
+
+DEFAULT_UPLOAD_SETTINGS = {
+    # Sisi terpanjang maksimal = dpi * long_edge_inches (struk ~11 inci)
+    'dpi': int(os.getenv('OCR_UPLOAD_DPI', '200')),
+    'long_edge_inches': float(os.getenv('OCR_UPLOAD_LONG_EDGE_INCHES', '11')),
+    'format': os.getenv('OCR_UPLOAD_FORMAT', 'JPEG').upper(),
+    'quality': int(os.getenv('OCR_UPLOAD_QUALITY', '85')),
+    'grayscale': os.getenv('OCR_UPLOAD_GRAYSCALE', '1') not in ('0', 'false', 'False'),
+}
+
+MIME_TYPES = {
+    'JPEG': 'image/jpeg',
+    'WEBP': 'image/webp',
+    'PNG': 'image/png',
+}
+
+
+def max_long_edge(settings):
+    return int(round(settings['dpi'] * settings['long_edge_inches']))
+
+
+def prepare_for_upload(image, settings=None):
+    """
+    Kembalikan (bytes, mime_type, statistik) dari gambar yang siap diunggah
+    """
+    settings = {**DEFAULT_UPLOAD_SETTINGS, **(settings or {})}
+    image_format = settings['format']
+    start = time.perf_counter()
+
+    # Terapkan orientasi EXIF sebelum metadata dibuang
+    prepared = ImageOps.exif_transpose(image)
+
+    if settings['grayscale']:
+        prepared = prepared.convert('L')
+    elif prepared.mode not in ('RGB', 'L'):
+        prepared = prepared.convert('RGB')
+
+    # Batasi sisi terpanjang tanpa mengubah rasio aspek
+    limit = max_long_edge(settings)
+    if max(prepared.size) > limit:
+        prepared = prepared.copy()
+        prepared.thumbnail((limit, limit), Image.LANCZOS)
+
+    # WebP tidak menerima mode L secara langsung di semua versi Pillow
+    if image_format == 'WEBP' and prepared.mode == 'L':
+        prepared = prepared.convert('RGB')
+
+    buffered = io.BytesIO()
+    save_kwargs = {}
+    if image_format in ('JPEG', 'WEBP'):
+        save_kwargs['quality'] = settings['quality']
+    if image_format == 'JPEG':
+        save_kwargs['optimize'] = True
+    # Tidak meneruskan `exif=` sehingga metadata tidak ikut tersimpan
+    prepared.save(buffered, format=image_format, **save_kwargs)
+    data = buffered.getvalue()
+
+    stats = {
+        'original_size': image.size,
+        'upload_size': prepared.size,
+        'bytes_after': len(data),
+        'encode_seconds': time.perf_counter() - start,
+    }
+    return data, MIME_TYPES[image_format], stats
+
+
+def legacy_png_size(image):
+    """
+    Ukuran byte encoding PNG penuh (perilaku lama) sebagai pembanding
+    """
+    buffered = io.BytesIO()
+    image.save(buffered, format="PNG")
+    return len(buffered.getvalue())
+
+
+# Tahapan pra-pemrosesan OpenCV untuk engine OCR lokal. Semua tahap bekerja
+# langsung pada array NumPy (tanpa bolak-balik ke PIL).
+PREPROCESS_STAGES = ('grayscale', 'downscale', 'crop', 'deskew', 'denoise', 'threshold')
+
+DEFAULT_PREPROCESS_STEPS = {
+    'grayscale': True,
+    'downscale': True,
+    'crop': True,
+    'deskew': True,
+    'denoise': True,
+    'threshold': 'adaptive',  # 'adaptive', 'otsu', atau False
+}
+
+# Pengaturan bawaan per engine; engine lain bisa memakai langkah berbeda
+ENGINE_PREPROCESS_STEPS = {
+    'easyocr': dict(DEFAULT_PREPROCESS_STEPS, threshold=False),
+    'tesseract': dict(DEFAULT_PREPROCESS_STEPS),
+}
+
+PREPROCESS_MAX_LONG_EDGE = int(os.getenv('OCR_PREPROCESS_MAX_LONG_EDGE', '1600'))
+
+
+class ReceiptPreprocessor:
+    def __init__(self, steps=None, max_long_edge=PREPROCESS_MAX_LONG_EDGE):
+        self.steps = {**DEFAULT_PREPROCESS_STEPS, **(steps or {})}
+        self.max_long_edge = max_long_edge
+
+    def signature(self):
+        """
+        Representasi singkat pengaturan (untuk kunci cache)
+        """
+        enabled = [
+            stage if self.steps[stage] is True else f"{stage}={self.steps[stage]}"
+            for stage in PREPROCESS_STAGES
+            if self.steps.get(stage)
+        ]
+        return '+'.join(enabled) or 'raw'
+
+    def run(self, array):
+        """
+        Jalankan tahapan yang aktif; kembalikan (array, waktu per tahap dalam detik)
+        """
+        timings = {}
+        for stage in PREPROCESS_STAGES:
+            if not self.steps.get(stage):
+                continue
+            start = time.perf_counter()
+            array = getattr(self, f"_{stage}")(array)
+            timings[stage] = time.perf_counter() - start
+        return array, timings
+
+    @staticmethod
+    def _grayscale(array):
+        import cv2
+
+        if array.ndim == 2:
+            return array
+        if array.shape[2] == 4:
+            return cv2.cvtColor(array, cv2.COLOR_RGBA2GRAY)
+        return cv2.cvtColor(array, cv2.COLOR_RGB2GRAY)
+
+    def _downscale(self, array):
+        import cv2
+
+        height, width = array.shape[:2]
+        scale = self.max_long_edge / max(height, width)
+        if scale >= 1:
+            return array
+        return cv2.resize(
+            array, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA
+        )
+
+    @staticmethod
+    def _crop(array):
+        """
+        Potong ke area struk: kontur terang terbesar pada gambar
+        """
+        import cv2
+
+        gray = ReceiptPreprocessor._grayscale(array)
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        mask = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return array
+
+        x, y, w, h = cv2.boundingRect(max(contours, key=cv2.contourArea))
+        # Abaikan kontur kecil (kemungkinan bukan struk)
+        if w * h < 0.2 * gray.shape[0] * gray.shape[1]:
+            return array
+        return array[y:y + h, x:x + w]
+
+    @staticmethod
+    def _deskew(array):
+        """
+        Luruskan kemiringan teks berdasarkan kotak minimum piksel tinta
+        """
+        import cv2
+        import numpy as np
+
+        gray = ReceiptPreprocessor._grayscale(array)
+        ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+        coords = np.column_stack(np.nonzero(ink))
+        if len(coords) < 10:
+            return array
+
+        angle = cv2.minAreaRect(coords[:, ::-1].astype(np.float32))[-1]
+        # minAreaRect mengembalikan sudut di rentang berbeda antar versi OpenCV
+        if angle > 45:
+            angle -= 90
+        elif angle < -45:
+            angle += 90
+        if abs(angle) < 0.5:
+            return array
+
+        height, width = array.shape[:2]
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        return cv2.warpAffine(
+            array, matrix, (width, height),
+            flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE
+        )
+
+    @staticmethod
+    def _denoise(array):
+        import cv2
+
+        return cv2.medianBlur(array, 3)
+
+    def _threshold(self, array):
+        import cv2
+
+        gray = self._grayscale(array)
+        if self.steps['threshold'] == 'otsu':
+            return cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
+        return cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10
+        )
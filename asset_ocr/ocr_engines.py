@@ -0,0 +1,177 @@
+"""
+Antarmuka engine OCR bersama dan registri backend.
+
+Setiap engine menerima gambar PIL dan mengembalikan `OCRResult`. Backend yang
+tersedia: Tesseract dan EasyOCR (lokal), Gemini (API), serta mock untuk
+pengujian tanpa jaringan. Dependensi berat diimpor saat engine dipakai.
+"""
+import os
+import time
+
+from asset_ocr.image_preprocessing import ENGINE_PREPROCESS_STEPS, ReceiptPreprocessor, prepare_for_upload
+
+DEFAULT_GEMINI_OCR_PROMPT = """
+Salin seluruh teks pada struk/dokumen ini apa adanya, baris demi baris.
+Jangan menambahkan penjelasan.
+"""
+
+SAMPLE_RECEIPT_TEXT = """TOKO BANGUNAN SEJAHTERA
+2023-10-15
+Semen Tiga Roda 1.5 kg 50000 75000
+Paku 2 inch 2 pcs 1500 3000
+TOTAL 78000"""
+
+
+class OCRResult:
+    def __init__(self, text, engine, confidence=None, boxes=None, seconds=None):
+        self.text = text
+        self.engine = engine
+        # Rata-rata keyakinan 0..1; None jika engine tidak menyediakannya
+        self.confidence = confidence
+        self.boxes = boxes or []
+        self.seconds = seconds
+
+    def __repr__(self):
+        return f"OCRResult(engine={self.engine!r}, confidence={self.confidence!r}, chars={len(self.text)})"
+
+
+class OCREngine:
+    name = None
+    # True jika engine memanggil layanan jaringan berbayar
+    remote = False
+    # True untuk engine khusus pengujian/benchmark yang tidak ditawarkan di UI
+    testing = False
+
+    def perform_ocr(self, image):
+        start = time.perf_counter()
+        result = self._recognize(image)
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def _recognize(self, image):
+        raise NotImplementedError
+
+
+ENGINE_REGISTRY = {}
+
+
+def register_engine(cls):
+    ENGINE_REGISTRY[cls.name] = cls
+    return cls
+
+
+def get_engine(name, **options):
+    """
+    Buat engine dari registri berdasarkan nama
+    """
+    try:
+        engine_cls = ENGINE_REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Engine OCR tidak dikenal: {name}") from None
+    return engine_cls(**options)
+
+
+def selectable_engines():
+    """
+    Nama engine yang boleh dipilih pengguna (tanpa engine pengujian)
+    """
+    return [name for name, engine_cls in ENGINE_REGISTRY.items() if not engine_cls.testing]
+
+
+def _to_array(image, preprocess_steps):
+    import numpy as np
+
+    array = np.asarray(image.convert('RGB') if image.mode not in ('RGB', 'L') else image)
+    if preprocess_steps:
+        array, _ = ReceiptPreprocessor(preprocess_steps).run(array)
+    return array
+
+
+@register_engine
+class TesseractEngine(OCREngine):
+    name = 'tesseract'
+
+    def __init__(self, lang=os.getenv('TESSERACT_LANG', 'eng+ind'), preprocess_steps=ENGINE_PREPROCESS_STEPS['tesseract']):
+        self.lang = lang
+        self.preprocess_steps = preprocess_steps
+
+    def _recognize(self, image):
+        import pytesseract
+
+        array = _to_array(image, self.preprocess_steps)
+        data = pytesseract.image_to_data(array, lang=self.lang, output_type=pytesseract.Output.DICT)
+
+        # Susun ulang kata per baris dan kumpulkan confidence kata yang valid
+        lines = {}
+        confidences = []
+        for index, word in enumerate(data['text']):
+            conf = float(data['conf'][index])
+            if not word.strip() or conf < 0:
+                continue
+            key = (data['block_num'][index], data['par_num'][index], data['line_num'][index])
+            lines.setdefault(key, []).append(word)
+            confidences.append(conf / 100)
+
+        text = '\n'.join(' '.join(words) for words in lines.values())
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return OCRResult(text, self.name, confidence=confidence, boxes=confidences)
+
+
+@register_engine
+class EasyOCREngine(OCREngine):
+    name = 'easyocr'
+
+    def __init__(self, languages=('en', 'id'), preprocess_steps=ENGINE_PREPROCESS_STEPS['easyocr']):
+        self.languages = languages
+        self.preprocess_steps = preprocess_steps
+
+    def _recognize(self, image):
+        from asset_ocr.reader_pool import get_reader_pool
+
+        array = _to_array(image, self.preprocess_steps)
+        with get_reader_pool(self.languages).reader() as reader:
+            results = reader.readtext(array)
+
+        text = ' '.join(result[1] for result in results)
+        confidences = [float(result[2]) for result in results]
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return OCRResult(text, self.name, confidence=confidence, boxes=results)
+
+
+@register_engine
+class GeminiEngine(OCREngine):
+    name = 'gemini'
+    remote = True
+
+    def __init__(self, api_key=None, prompt=DEFAULT_GEMINI_OCR_PROMPT, model_name='gemini-1.5-flash', upload_settings=None):
+        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+        self.prompt = prompt
+        self.model_name = model_name
+        self.upload_settings = upload_settings
+
+    def _recognize(self, image):
+        from asset_ocr.gemini_client import generate_content, get_model
+
+        model = get_model(self.api_key, self.model_name)
+
+        data, mime_type, _ = prepare_for_upload(image, self.upload_settings)
+        response = generate_content(
+            self.api_key, model, [self.prompt, {'mime_type': mime_type, 'data': data}]
+        )
+        return OCRResult(response.text, self.name)
+
+
+@register_engine
+class MockEngine(OCREngine):
+    name = 'mock'
+    testing = True
+
+    def __init__(self, text=SAMPLE_RECEIPT_TEXT, confidence=0.9, latency=0.0):
+        self.text = text
+        self.confidence = confidence
+        self.latency = latency
+
+    def _recognize(self, image):
+        if self.latency:
+            time.sleep(self.latency)
+        return OCRResult(self.text, self.name, confidence=self.confidence)
@@ -0,0 +1,181 @@
+"""
+Router OCR bertingkat: engine lokal lebih dulu, Gemini hanya jika perlu.
+
+Setiap tingkat menghasilkan skor gabungan dari confidence engine dan
+kelengkapan teks terhadap kolom yang diharapkan (tanggal, item, angka, dst).
+Jika skor di bawah ambang, struk dinaikkan ke tingkat berikutnya. Keputusan
+routing dicatat ke logger dan dirangkum oleh `RoutingStats`; struk yang gagal
+di semua tingkat dihitung terpisah, bukan sebagai hasil tingkat terakhir.
+Struk dihitung "menyentuh jaringan" jika ada tingkat `OCREngine.remote` yang
+dicoba, berhasil atau tidak.
+"""
+import logging
+import re
+import threading
+import time
+
+from asset_ocr.ocr_engines import OCREngine, get_engine, register_engine
+from asset_ocr.schema import COLUMNS_5, COLUMNS_7
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_TIERS = ('tesseract', 'easyocr', 'gemini')
+
+_DATE = re.compile(r'\b(\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4})\b')
+_WORD = re.compile(r'[A-Za-z]{3,}')
+_SMALL_NUMBER = re.compile(r'(?<![\d.,])\d{1,3}(?:[.,]\d{1,2})?(?![\d.,])')
+_AMOUNT = re.compile(r'\b\d{1,3}(?:[.,]\d{3})+\b|\b\d{4,}\b')
+_UNIT = re.compile(r'\b(pcs|pc|kg|gr|gram|g|ons|m|meter|cm|mm|lembar|lbr|pack|pak|lusin|unit|buah|bh|btl|botol|liter|ltr|l|sak|roll|dus|box)\b', re.I)
+_VENDOR = re.compile(r'\b(toko|tb|cv|pt|ud|mart|market|store|apotek|bangunan)\b', re.I)
+
+
+def completeness_score(text, columns=COLUMNS_5):
+    """
+    Perkiraan 0..1 seberapa banyak kolom yang bisa diisi dari teks OCR
+    """
+    if not text or not text.strip():
+        return 0.0
+
+    amounts = len(_AMOUNT.findall(text))
+    lines = [line for line in text.splitlines() if line.strip()]
+    checks = {
+        'Tanggal Beli': bool(_DATE.search(text)),
+        'Nama Item': any(_WORD.search(line) for line in lines),
+        'Quantity': bool(_SMALL_NUMBER.search(_DATE.sub(' ', text))),
+        'Harga': amounts >= 1,
+        'Total Harga': amounts >= 2,
+        'Jenis Satuan': bool(_UNIT.search(text)),
+        'Vendor': bool(_VENDOR.search(text)) or bool(lines and not re.search(r'\d', lines[0])),
+    }
+    return sum(checks[column] for column in columns) / len(columns)
+
+
+def routing_score(result, columns=COLUMNS_5):
+    completeness = completeness_score(result.text, columns)
+    if result.confidence is None:
+        return completeness
+    return 0.5 * result.confidence + 0.5 * completeness
+
+
+class RoutingStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = 0
+        self.final_tier = {}
+        self.failed = 0
+        self.remote_attempted = 0
+        self.tier_latency = {}
+        self.tier_failures = {}
+        self.escalations = 0
+
+    def record(self, attempts, final_engine=None, remote_attempted=False):
+        """
+        Catat satu struk; `final_engine` None berarti semua tingkat gagal,
+        `remote_attempted` True jika ada tingkat jaringan yang dicoba
+        """
+        with self._lock:
+            self.total += 1
+            self.remote_attempted += bool(remote_attempted)
+            if final_engine is None:
+                self.failed += 1
+            else:
+                self.final_tier[final_engine] = self.final_tier.get(final_engine, 0) + 1
+            self.escalations += len(attempts) - 1
+            for engine_name, seconds, score in attempts:
+                self.tier_latency.setdefault(engine_name, []).append(seconds)
+                if score is None:
+                    self.tier_failures[engine_name] = self.tier_failures.get(engine_name, 0) + 1
+
+    def report(self):
+        """
+        Ringkasan: porsi struk yang tidak pernah menyentuh jaringan dan latensi per tingkat
+        """
+        with self._lock:
+            latency = {}
+            for engine_name, values in self.tier_latency.items():
+                ordered = sorted(values)
+                latency[engine_name] = {
+                    'calls': len(values),
+                    'failures': self.tier_failures.get(engine_name, 0),
+                    'mean_seconds': sum(values) / len(values),
+                    'p95_seconds': ordered[min(len(ordered) - 1, int(0.95 * (len(ordered) - 1) + 0.5))],
+                }
+            local = self.total - self.remote_attempted
+            return {
+                'total': self.total,
+                'failed': self.failed,
+                'remote_attempted': self.remote_attempted,
+                'local_only': local,
+                'local_fraction': local / self.total if self.total else None,
+                'escalations': self.escalations,
+                'final_tier': dict(self.final_tier),
+                'tier_latency': latency,
+            }
+
+
+# Statistik bersama untuk seluruh proses
+ROUTING_STATS = RoutingStats()
+
+
+@register_engine
+class CascadingOCRRouter(OCREngine):
+    name = 'cascade'
+
+    def __init__(self, tiers=DEFAULT_TIERS, threshold=DEFAULT_THRESHOLD,
+                 columns=COLUMNS_5, engine_options=None, stats=ROUTING_STATS):
+        self.tiers = list(tiers)
+        self.threshold = threshold
+        self.columns = columns
+        self.engine_options = engine_options or {}
+        self.stats = stats
+
+    def _recognize(self, image):
+        attempts = []
+        best = None
+        best_score = -1.0
+        remote_attempted = False
+
+        for index, engine_name in enumerate(self.tiers):
+            is_last = index == len(self.tiers) - 1
+            engine = get_engine(engine_name, **self.engine_options.get(engine_name, {}))
+            remote_attempted = remote_attempted or engine.remote
+            start = time.perf_counter()
+            try:
+                result = engine.perform_ocr(image)
+            except Exception as e:
+                attempts.append((engine_name, time.perf_counter() - start, None))
+                logger.warning("OCR tier %s gagal: %s", engine_name, e)
+                if is_last and best is None:
+                    self.stats.record(attempts, remote_attempted=remote_attempted)
+                    raise
+                continue
+
+            score = routing_score(result, self.columns)
+            attempts.append((engine_name, result.seconds, score))
+            if score > best_score:
+                best, best_score = result, score
+
+            if score >= self.threshold or is_last:
+                break
+            logger.info(
+                "OCR tier %s skor %.2f < %.2f, eskalasi ke %s",
+                engine_name, score, self.threshold, self.tiers[index + 1]
+            )
+
+        # Tingkat terakhir yang berhasil menjadi final_tier; tingkat jaringan yang
+        # dicoba tetap dihitung walaupun gagal
+        final_engine = next(name for name, _, score in reversed(attempts) if score is not None)
+        self.stats.record(attempts, final_engine, remote_attempted)
+        logger.info(
+            "OCR routing selesai di %s (skor terbaik %.2f dari %s); percobaan: %s",
+            final_engine, best_score, best.engine,
+            ', '.join(
+                f"{name}={seconds:.2f}s/" + ('gagal' if score is None else f"{score:.2f}")
+                for name, seconds, score in attempts
+            )
+        )
+
+        best.engine = f"{self.name}:{best.engine}"
+        best.routing = attempts
+        return best
@@ -0,0 +1,288 @@
+"""
+Prompt dan skema keluaran Gemini untuk ketiga aplikasi.
+
+Dipakai bersama oleh aplikasi Streamlit, ingest batch headless
+(`asset_ocr.batch_ingest`), dan layanan inti (`asset_ocr.services`) agar
+semuanya mengirim prompt yang sama dan menghasilkan kunci cache yang sama.
+Naikkan versi prompt saat isinya berubah.
+
+`ReceiptPrompts` mengelompokkan prompt, model, dan kolom satu aplikasi
+sebagai objek biasa yang bisa di-pickle ke worker proses.
+"""
+from asset_ocr.schema import COLUMNS_5, COLUMNS_7
+
+
+class ReceiptPrompts:
+    def __init__(self, version, columns, analysis_template, model_name='gemini-1.5-flash',
+                 ocr_prompt=None, structured_prompt=None, response_schema=None, field_columns=None):
+        self.version = version
+        self.columns = tuple(columns)
+        self.analysis_template = analysis_template
+        self.model_name = model_name
+        self.ocr_prompt = ocr_prompt
+        self.structured_prompt = structured_prompt
+        self.response_schema = response_schema
+        self.field_columns = field_columns
+
+    def cache_version(self, mode='two_stage'):
+        return self.version if mode == 'two_stage' else f"{self.version}-{mode}"
+
+
+# --- main_ocr2.py: tabel 7 kolom ---
+
+# Identitas pipeline untuk kunci cache hasil
+PIPELINE_MODEL = 'gemini-1.5-flash'
+PROMPT_VERSION = 'main_ocr2-v2'
+
+# Prompt untuk ekstraksi teks dari gambar
+OCR_PROMPT = """
+            Ekstrak informasi detail dari struk/dokumen dengan presisi tinggi:
+
+            Panduan Ekstraksi:
+            1. Identifikasi dengan jelas setiap komponen
+            2. Fokus pada informasi penting
+            3. Perhatikan format angka dan tanggal
+            4. Konversi pecahan menjadi desimal
+
+            Informasi yang WAJIB diekstrak:
+            - Tanggal Transaksi (format YYYY-MM-DD)
+            - Nama Produk/Item (nama lengkap)
+            - Harga Satuan (dalam angka)
+            - Jumlah/Quantity (angka atau pecahan)
+            - Jenis Satuan (contoh: pcs, kg, meter, lembar, pack)
+            - Total Harga 
+            - Vendor (Nama toko/tempat)
+
+            Aturan Jenis Satuan:
+            - Gunakan satuan umum yang ada di struk
+            - Jika tidak ada, tuliskan N/A
+            - Pastikan satuan sesuai dengan jenis produk
+
+            Catatan Penting:
+            - Gunakan format numerik yang bersih
+            - Konversi pecahan (mis. 1/2 → 0.5)
+            - Hilangkan simbol mata uang
+            - Prioritaskan keakuratan data
+            - Jika yang lain tidak ada, tuliskan N/A
+            """
+
+# Prompt untuk ekstraksi data terstruktur dari teks OCR
+ANALYSIS_PROMPT_TEMPLATE = """
+            Instruksi Ekstraksi Data Terperinci:
+
+            Sumber Teks:
+            {text}
+
+            Panduan Ekstraksi:
+            1. Ekstrak data dengan format CSV yang ketat
+            2. Setiap kolom memiliki kriteria spesifik
+            3. Konversi pecahan ke desimal
+
+            Format Keluaran PASTI:
+            'Tanggal Beli','Nama Item','Quantity','Jenis Satuan','Harga','Total Harga','Vendor'
+
+            Aturan Ketat:
+            - Gunakan tanda kutip tunggal
+            - Pisahkan dengan koma TEPAT
+            - Tanggal: format YYYY-MM-DD
+            - Nama Item: nama lengkap, hilangkan karakter khusus 
+            - Quantity: bilangan desimal (konversi pecahan)
+            - Jenis Satuan: satuan yang sesuai dengan produk (pcs, kg, meter, dll)
+            - Harga: bilangan bulat, tanpa simbol mata uang
+            - Total Harga: hasil perkalian Quantity * Harga
+            - Vendor: Nama toko pada struk
+
+            Contoh Valid:
+            '2023-10-15','Semen Tiga Roda','1.5','kg','50000','75000','Toko Bangunan'
+
+            Instruksi Akhir:
+            - Kembalikan HANYA data dalam format CSV
+            - Jangan tambahkan penjelasan atau komentar
+            - Prioritaskan presisi dan konsistensi
+            """
+
+# Prompt ekstraksi satu tahap; struktur keluaran diatur STRUCTURED_RESPONSE_SCHEMA
+STRUCTURED_PROMPT = """
+            Ekstrak setiap baris item pada struk/dokumen ini sebagai array JSON.
+
+            Aturan:
+            - tanggal_beli: format YYYY-MM-DD
+            - nama_item: nama lengkap produk
+            - quantity: bilangan desimal (konversi pecahan, mis. 1/2 → 0.5)
+            - jenis_satuan: satuan yang sesuai dengan produk (pcs, kg, meter, dll), atau N/A
+            - harga: harga satuan, bilangan tanpa simbol mata uang
+            - total_harga: total pada struk, atau quantity * harga jika tidak ada
+            - vendor: nama toko/tempat pada struk, atau N/A
+            - Hilangkan simbol mata uang dan pemisah ribuan
+            - Jika informasi teks tidak ditemukan, gunakan 'N/A'
+            - Jika angka (quantity, harga, total_harga) tidak ditemukan, gunakan null
+            """
+
+# Pemetaan field JSON ke kolom tabel
+STRUCTURED_FIELD_COLUMNS = {
+    'tanggal_beli': 'Tanggal Beli',
+    'nama_item': 'Nama Item',
+    'quantity': 'Quantity',
+    'jenis_satuan': 'Jenis Satuan',
+    'harga': 'Harga',
+    'total_harga': 'Total Harga',
+    'vendor': 'Vendor',
+}
+
+STRUCTURED_RESPONSE_SCHEMA = {
+    'type': 'ARRAY',
+    'items': {
+        'type': 'OBJECT',
+        'properties': {
+            'tanggal_beli': {'type': 'STRING'},
+            'nama_item': {'type': 'STRING'},
+            'quantity': {'type': 'NUMBER', 'nullable': True},
+            'jenis_satuan': {'type': 'STRING'},
+            'harga': {'type': 'NUMBER', 'nullable': True},
+            'total_harga': {'type': 'NUMBER', 'nullable': True},
+            'vendor': {'type': 'STRING'},
+        },
+        'required': ['tanggal_beli', 'nama_item', 'quantity', 'jenis_satuan', 'harga', 'total_harga', 'vendor'],
+    },
+}
+
+MAIN_OCR2_PROMPTS = ReceiptPrompts(
+    PROMPT_VERSION, COLUMNS_7, ANALYSIS_PROMPT_TEMPLATE, PIPELINE_MODEL,
+    ocr_prompt=OCR_PROMPT, structured_prompt=STRUCTURED_PROMPT,
+    response_schema=STRUCTURED_RESPONSE_SCHEMA, field_columns=STRUCTURED_FIELD_COLUMNS,
+)
+
+
+# --- main4.py: tabel 5 kolom ---
+
+MAIN4_PIPELINE_MODEL = 'gemini-1.5-flash'
+MAIN4_PROMPT_VERSION = 'main4-v2'
+
+# Prompt untuk ekstraksi teks dari gambar
+MAIN4_OCR_PROMPT = """
+            Ekstrak informasi detail dari struk/dokumen dengan presisi tinggi:
+
+            Panduan Ekstraksi:
+            1. Identifikasi dengan jelas setiap komponen
+            2. Fokus pada informasi penting
+            3. Perhatikan format angka dan tanggal
+
+            Informasi yang WAJIB diekstrak:
+            - Tanggal Transaksi (format YYYY-MM-DD)
+            - Nama Produk/Item (nama lengkap)
+            - Harga Satuan (dalam angka)
+            - Jumlah/Quantity (angka)
+            - Total Harga (jika sudah ada maka tulis jika tidak maka hasil perkalian harga satuan dengan quantity)
+
+            Catatan Penting:
+            - Gunakan format numerik yang bersih
+            - Pertahankan tanda kurung pada nama item
+            - Hilangkan simbol mata uang
+            - Jika informasi tidak ditemukan, gunakan 'N/A'
+            - Prioritaskan keakuratan data
+            """
+
+# Prompt untuk ekstraksi data terstruktur dari teks OCR
+MAIN4_ANALYSIS_PROMPT_TEMPLATE = """
+            Instruksi Ekstraksi Data Terperinci:
+
+            Sumber Teks:
+            {text}
+
+            Panduan Ekstraksi:
+            1. Ekstrak data dengan format CSV yang ketat
+            2. Setiap kolom memiliki kriteria spesifik
+
+            Format Keluaran PASTI:
+            'Tanggal Beli','Nama Item','Quantity','Harga','Total Harga'
+
+            Aturan Ketat:
+            - Gunakan tanda kutip tunggal
+            - Pisahkan dengan koma TEPAT
+            - Tanggal: format YYYY-MM-DD
+            - Nama Item: nama lengkap, hilangkan karakter khusus n
+            - Quantity: bilangan bulat positif
+            - Harga: bilangan bulat, tanpa simbol mata uang
+            - Total Harga: hasil perkalian Quantity * Harga
+
+            Contoh Valid:
+            '2023-10-15','Oreo Vanilla','38','2000','76000'
+
+            Instruksi Akhir:
+            - Kembalikan HANYA data dalam format CSV
+            - Jangan tambahkan penjelasan atau komentar
+            - Prioritaskan presisi dan konsistensi
+            """
+
+# Prompt ekstraksi satu tahap; struktur keluaran diatur MAIN4_RESPONSE_SCHEMA
+MAIN4_STRUCTURED_PROMPT = """
+            Ekstrak setiap baris item pada struk/dokumen ini sebagai array JSON.
+
+            Aturan:
+            - tanggal_beli: format YYYY-MM-DD
+            - nama_item: nama lengkap produk, pertahankan tanda kurung
+            - quantity: bilangan bulat positif
+            - harga: harga satuan, bilangan tanpa simbol mata uang
+            - total_harga: total pada struk, atau quantity * harga jika tidak ada
+            - Hilangkan simbol mata uang dan pemisah ribuan
+            - Jika informasi teks tidak ditemukan, gunakan 'N/A'
+            - Jika angka (quantity, harga, total_harga) tidak ditemukan, gunakan null
+            """
+
+# Pemetaan field JSON ke kolom tabel
+MAIN4_FIELD_COLUMNS = {
+    'tanggal_beli': 'Tanggal Beli',
+    'nama_item': 'Nama Item',
+    'quantity': 'Quantity',
+    'harga': 'Harga',
+    'total_harga': 'Total Harga',
+}
+
+MAIN4_RESPONSE_SCHEMA = {
+    'type': 'ARRAY',
+    'items': {
+        'type': 'OBJECT',
+        'properties': {
+            'tanggal_beli': {'type': 'STRING'},
+            'nama_item': {'type': 'STRING'},
+            'quantity': {'type': 'NUMBER', 'nullable': True},
+            'harga': {'type': 'NUMBER', 'nullable': True},
+            'total_harga': {'type': 'NUMBER', 'nullable': True},
+        },
+        'required': ['tanggal_beli', 'nama_item', 'quantity', 'harga', 'total_harga'],
+    },
+}
+
+MAIN4_PROMPTS = ReceiptPrompts(
+    MAIN4_PROMPT_VERSION, COLUMNS_5, MAIN4_ANALYSIS_PROMPT_TEMPLATE, MAIN4_PIPELINE_MODEL,
+    ocr_prompt=MAIN4_OCR_PROMPT, structured_prompt=MAIN4_STRUCTURED_PROMPT,
+    response_schema=MAIN4_RESPONSE_SCHEMA, field_columns=MAIN4_FIELD_COLUMNS,
+)
+
+
+# --- main_ocr.py: OCR lokal (EasyOCR/Tesseract) + analisis Gemini, 5 kolom ---
+
+MAIN_OCR_PIPELINE_MODEL = 'gemini-1.5-pro'
+MAIN_OCR_PROMPT_VERSION = 'main_ocr-v1'
+
+# Prompt analisis teks hasil OCR lokal
+MAIN_OCR_ANALYSIS_PROMPT_TEMPLATE = """
+            Ekstrak informasi dari teks berikut HANYA dalam format:
+            'Tanggal Beli','Nama Item','Quantity','Harga','Total Harga'
+
+            Contoh format keluaran:
+            '2023-10-15','Oreo Vanilla','38','2000','76000'
+
+            Aturan:
+            - Gunakan tanda kutip tunggal
+            - Pisahkan dengan koma
+            - Jika data tidak ada, gunakan 'N/A'
+            - Hanya kembalikan data, tanpa penjelasan tambahan
+
+            Teks untuk diekstrak:
+            {text}
+            """
+
+MAIN_OCR_PROMPTS = ReceiptPrompts(
+    MAIN_OCR_PROMPT_VERSION, COLUMNS_5, MAIN_OCR_ANALYSIS_PROMPT_TEMPLATE, MAIN_OCR_PIPELINE_MODEL,
+)
@@ -0,0 +1,137 @@
+"""
+Pool reader EasyOCR yang dibagi dalam satu proses.
+
+Membuat `easyocr.Reader` memuat ulang bobot model deteksi dan pengenalan
+(beberapa detik dan ratusan MB), jadi reader dibuat sekali per kombinasi
+bahasa lalu dipinjamkan ke setiap sesi Streamlit melalui pool berukuran tetap.
+"""
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_LANGUAGES = ('en', 'id')
+DEFAULT_POOL_SIZE = int(os.getenv('EASYOCR_POOL_SIZE', '2'))
+
+
+class EasyOCRReaderPool:
+    def __init__(self, languages=DEFAULT_LANGUAGES, size=DEFAULT_POOL_SIZE, gpu=None):
+        self.languages = list(languages)
+        self.size = max(1, int(size))
+        self.gpu = gpu
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._load_seconds = []
+
+    def _create_reader(self):
+        """
+        Muat satu reader baru dan catat waktu muatnya
+        """
+        import easyocr
+
+        start = time.perf_counter()
+        if self.gpu is None:
+            reader = easyocr.Reader(self.languages)
+        else:
+            reader = easyocr.Reader(self.languages, gpu=self.gpu)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._load_seconds.append(elapsed)
+        return reader
+
+    def warm(self):
+        """
+        Pastikan minimal satu reader sudah dimuat
+        """
+        with self._lock:
+            if self._created > 0:
+                return
+            self._created += 1
+        try:
+            self._idle.put(self._create_reader())
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    @contextmanager
+    def reader(self, timeout=None):
+        """
+        Pinjam reader dari pool; reader dikembalikan setelah blok selesai
+        """
+        reader = self._acquire(timeout)
+        try:
+            yield reader
+        finally:
+            self._idle.put(reader)
+
+    def _acquire(self, timeout):
+        try:
+            reader = self._idle.get_nowait()
+            with self._lock:
+                self._hits += 1
+            return reader
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+                self._misses += 1
+            else:
+                self._waits += 1
+
+        if can_create:
+            try:
+                return self._create_reader()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        # Pool penuh: tunggu reader yang sedang dipakai sesi lain
+        reader = self._idle.get(timeout=timeout)
+        with self._lock:
+            self._hits += 1
+        return reader
+
+    def stats(self):
+        """
+        Statistik pool: jumlah reader, hit/miss, dan waktu muat
+        """
+        with self._lock:
+            return {
+                'languages': list(self.languages),
+                'size': self.size,
+                'loaded': self._created,
+                'idle': self._idle.qsize(),
+                'hits': self._hits,
+                'misses': self._misses,
+                'waits': self._waits,
+                'load_seconds_total': sum(self._load_seconds),
+                'load_seconds_last': self._load_seconds[-1] if self._load_seconds else None,
+            }
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_reader_pool(languages=DEFAULT_LANGUAGES, size=DEFAULT_POOL_SIZE, gpu=None):
+    """
+    Ambil pool untuk kombinasi bahasa tertentu (satu pool per proses)
+    """
+    key = tuple(sorted(languages))
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = EasyOCRReaderPool(languages, size=size, gpu=gpu)
+            _POOLS[key] = pool
+        return pool
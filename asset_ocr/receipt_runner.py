@@ -0,0 +1,242 @@
+"""
+Pemrosesan struk bersama untuk main4.py dan main_ocr2.py, tanpa UI.
+
+Kedua aplikasi hanya berbeda prompt dan kolom (`ReceiptPrompts`), jadi batch
+thread pool (`run_batch`), batch asyncio di thread latar (`AsyncReceiptBatch`),
+dan mode streaming (`stream_receipt`) ada di sini sekali. Aplikasi hanya
+menampilkan progres lewat callback. Semua mode memakai cache hasil yang sama
+(`asset_ocr.result_cache`) dengan kunci `cache_key`: hanya hasil yang selesai
+utuh yang disimpan, beserta baris hasil parsingnya, sehingga cache hit tidak
+di-parse ulang.
+"""
+import json
+
+import pandas as pd
+from PIL import Image
+
+from asset_ocr import services
+from asset_ocr.async_pipeline import BackgroundPipelineRun
+from asset_ocr.batch_ingest import build_pipeline
+from asset_ocr.batch_pipeline import BatchPipeline
+from asset_ocr.errors import AnalysisError, ExtractionError, OCRError, ServiceError
+from asset_ocr.result_cache import cached_rows, get_result_cache, make_cache_key
+from asset_ocr.schema import coerce_frame
+from asset_ocr.stream_parser import IncrementalJSONParser, IncrementalLineParser
+from asset_ocr.table_builder import TableBuilder
+
+# Tahap stream -> jenis kesalahan yang dilempar
+STREAM_ERRORS = {'ocr': OCRError, 'analysis': AnalysisError, 'extraction': ExtractionError}
+
+
+def cache_key(prompts, image, mode='two_stage'):
+    """
+    Kunci cache hasil untuk gambar, model, dan versi prompt/mode
+    """
+    return make_cache_key(image, prompts.model_name, prompts.cache_version(mode))
+
+
+def cached_frame(prompts, cache, key, cached):
+    """
+    Baris dari entri cache; entri tanpa baris (format lama) di-parse dari
+    teksnya sekali lalu disimpan ulang bersama barisnya
+    """
+    rows = cached_rows(cached, prompts.columns)
+    if rows is None:
+        rows = services.parse_results([cached['analysis_text']], prompts)
+        cache.set(key, cached['ocr_text'], cached['analysis_text'], rows)
+    return rows
+
+
+def load_image(source):
+    """
+    Buka dan dekode gambar (path atau file unggahan)
+    """
+    image = Image.open(source)
+    image.load()
+    return image
+
+
+def run_batch(prompts, sources, api_key, mode='two_stage', max_workers=4, ocr_limit=2, analysis_limit=2,
+              on_progress=None, cache=None):
+    """
+    Banyak struk (nama, file) di thread pool: load -> OCR -> analisis -> parse.
+    Kembalikan `BatchItemResult` per struk (urutan input) dengan `output` DataFrame.
+    """
+    cache = cache or get_result_cache()
+
+    def load_stage(source):
+        image = load_image(source)
+        key = cache_key(prompts, image, mode)
+        return {'image': image, 'cache_key': key, 'cached': cache.get(key)}
+
+    def ocr_stage(item):
+        if item['cached']:
+            item['ocr_text'] = item['cached']['ocr_text']
+            return item
+        if mode == 'one_shot':
+            # Ekstraksi satu tahap menggantikan OCR + analisis
+            item['ocr_text'] = None
+            item['analysis_text'] = services.extract_structured(
+                item['image'], api_key, prompts.structured_prompt, prompts.response_schema, prompts.model_name
+            )
+            if not item['analysis_text']:
+                raise ExtractionError("Ekstraksi tidak menghasilkan data")
+            return item
+        item['ocr_text'] = services.run_ocr(
+            item['image'], 'gemini', api_key=api_key, prompt=prompts.ocr_prompt, model_name=prompts.model_name
+        ).text
+        if not item['ocr_text']:
+            raise OCRError("OCR tidak menghasilkan teks")
+        return item
+
+    def analysis_stage(item):
+        if item['cached']:
+            item['analysis_text'] = item['cached']['analysis_text']
+            return item
+        if mode == 'one_shot':
+            return item
+        item['analysis_text'] = services.analyze_text(
+            item['ocr_text'], api_key, prompts.analysis_template, prompts.model_name
+        )
+        if not item['analysis_text']:
+            raise AnalysisError("Analisis tidak menghasilkan data")
+        return item
+
+    def parse_stage(item):
+        if item['cached']:
+            return cached_frame(prompts, cache, item['cache_key'], item['cached'])
+        rows = services.parse_results([item['analysis_text']], prompts)
+        cache.set(item['cache_key'], item['ocr_text'], item['analysis_text'], rows)
+        return rows
+
+    pipeline = BatchPipeline([
+        ('load', load_stage, max_workers),
+        ('ocr', ocr_stage, ocr_limit),
+        ('analysis', analysis_stage, analysis_limit),
+        ('parse', parse_stage, max_workers),
+    ], max_workers=max_workers)
+    return pipeline.run(sources, on_progress=on_progress)
+
+
+class AsyncReceiptBatch:
+    """
+    Banyak struk lewat pipeline asyncio (`build_pipeline`) di thread latar;
+    struk yang sudah ada di cache tidak dikirim ulang. Pemanggil memantau dan
+    membatalkan `run`, lalu memanggil `finish` setelah run selesai.
+    """
+
+    def __init__(self, prompts, sources, api_key, mode='two_stage', concurrency=4, cache=None,
+                 model_factory=None, scheduler=None):
+        self.prompts = prompts
+        self.cache = cache or get_result_cache()
+        self.cached_frames = []
+        self.pending = []
+        for name, source in sources:
+            image = load_image(source)
+            key = cache_key(prompts, image, mode)
+            cached = self.cache.get(key)
+            if cached:
+                self.cached_frames.append(cached_frame(prompts, self.cache, key, cached))
+            else:
+                self.pending.append((name, image, key))
+        self.documents = 0
+
+        pipeline = build_pipeline(api_key, mode, concurrency, model_factory, scheduler, prompts=prompts)
+        self.run = BackgroundPipelineRun(pipeline, [(name, image) for name, image, _ in self.pending])
+
+    def start(self):
+        self.run.start()
+        return self
+
+    def finish(self):
+        """
+        Parse hasil baru per struk dan simpan ke cache bersama barisnya, lalu
+        gabungkan dengan baris dari cache; kembalikan (DataFrame, [(nama, kesalahan)])
+        """
+        frames = list(self.cached_frames)
+        failures = []
+        for (name, _, key), result in zip(self.pending, self.run.results or []):
+            if result.ok:
+                rows = services.parse_results([result.analysis_text], self.prompts)
+                self.cache.set(key, result.ocr_text, result.analysis_text, rows)
+                frames.append(rows)
+            else:
+                failures.append((name, result.error))
+        self.documents = len(frames)
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return services.parse_results([], self.prompts), failures
+        return coerce_frame(pd.concat(frames, ignore_index=True), self.prompts.columns), failures
+
+
+def stream_receipt(prompts, image, api_key, mode='two_stage', on_text=None, on_rows=None, key=None, cache=None):
+    """
+    Satu struk dengan stream=True; kembalikan `ReceiptResult`.
+
+    `on_text(tahap, teks)` dipanggil dengan teks sejauh ini untuk tahap
+    'ocr', 'analysis', atau 'extraction', dan `on_rows(tahap, TableBuilder)`
+    setiap ada baris lengkap baru. Baris hanya ditampung di `ReceiptResult.rows`;
+    kesalahan disimpan di `ReceiptResult.error` dan hasil hanya masuk cache
+    jika stream selesai utuh.
+    """
+    result = services.ReceiptResult(None)
+    rows = TableBuilder(prompts.columns)
+
+    def consume(stage, start, parser, to_text):
+        text = ''
+        try:
+            for chunk in start():
+                text += chunk
+                if on_text is not None:
+                    on_text(stage, text)
+                if parser is not None:
+                    add_rows(stage, parser.feed(chunk), to_text)
+            if parser is not None:
+                add_rows(stage, parser.flush(), to_text)
+        except ServiceError:
+            raise
+        except Exception as e:
+            raise STREAM_ERRORS[stage](str(e), e) from e
+        return text
+
+    def add_rows(stage, records, to_text):
+        appended = False
+        for record in records:
+            frame = services.parse_results([to_text(record)], prompts)
+            if not frame.empty:
+                rows.append_frame(frame)
+                appended = True
+        if appended and on_rows is not None:
+            on_rows(stage, rows)
+
+    try:
+        if mode == 'one_shot':
+            result.analysis_text = consume(
+                'extraction',
+                lambda: services.stream_extract(
+                    image, api_key, prompts.structured_prompt, prompts.response_schema, prompts.model_name
+                ),
+                IncrementalJSONParser(), lambda record: json.dumps([record])
+            )
+        else:
+            result.ocr_text = consume(
+                'ocr', lambda: services.stream_ocr(image, api_key, prompts.ocr_prompt, prompts.model_name),
+                None, None
+            )
+            if not result.ocr_text.strip():
+                raise OCRError("OCR tidak menghasilkan teks")
+            result.analysis_text = consume(
+                'analysis',
+                lambda: services.stream_analysis(
+                    result.ocr_text, api_key, prompts.analysis_template, prompts.model_name
+                ),
+                IncrementalLineParser(), lambda record: record
+            )
+    except ServiceError as e:
+        result.error = e
+        return result
+
+    result.rows = rows.to_frame()
+    cache = cache or get_result_cache()
+    cache.set(key or cache_key(prompts, image, mode), result.ocr_text, result.analysis_text, result.rows)
+    return result
@@ -0,0 +1,107 @@
+"""
+Grafik laporan aset sebagai PNG, di-cache per hash data agregat.
+
+Grafik digambar lewat API berorientasi objek (`matplotlib.figure.Figure` +
+canvas Agg), bukan state global `pyplot`, sehingga tidak ada figure yang
+tertinggal di registry pyplot; figure dibersihkan begitu PNG selesai ditulis.
+Rerun dengan agregat yang sama memakai PNG dari cache tanpa menggambar ulang.
+matplotlib baru diimpor saat grafik benar-benar perlu digambar.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+DEFAULT_MAX_CHARTS = 32
+
+
+def data_fingerprint(series):
+    """
+    Hash isi Series (index, nilai, dan nama) untuk kunci cache grafik
+    """
+    series = pd.Series(series)
+    digest = hashlib.sha256()
+    digest.update(repr(series.name).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(series, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def render_bar_png(series, title, xlabel, ylabel, figsize=(10, 5), dpi=100):
+    """
+    Gambar diagram batang menjadi byte PNG tanpa menyentuh pyplot
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(figure)
+    try:
+        axes = figure.add_subplot()
+        axes.bar([str(label) for label in series.index], series.to_numpy())
+        axes.set_title(title)
+        axes.set_xlabel(xlabel)
+        axes.set_ylabel(ylabel)
+        axes.tick_params(axis='x', labelrotation=45)
+        figure.tight_layout()
+
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format='png')
+        return buffer.getvalue()
+    finally:
+        # Lepas artist dan buffer render sekarang, bukan menunggu garbage collector
+        figure.clear()
+
+
+class ChartCache:
+    def __init__(self, max_charts=DEFAULT_MAX_CHARTS):
+        self.max_charts = max_charts
+        self._charts = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def bar_chart(self, series, title, xlabel, ylabel):
+        """
+        PNG diagram batang; digambar ulang hanya jika data atau label berubah
+        """
+        key = (data_fingerprint(series), title, xlabel, ylabel)
+        with self._lock:
+            png = self._charts.get(key)
+            if png is not None:
+                self._charts.move_to_end(key)
+                self.hits += 1
+                return png
+            self.misses += 1
+
+        png = render_bar_png(series, title, xlabel, ylabel)
+        with self._lock:
+            self._charts[key] = png
+            while len(self._charts) > self.max_charts:
+                self._charts.popitem(last=False)
+        return png
+
+    def stats(self):
+        with self._lock:
+            return {
+                'charts': len(self._charts),
+                'bytes': sum(len(png) for png in self._charts.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_CHART_CACHE = None
+_CHART_CACHE_LOCK = threading.Lock()
+
+
+def get_chart_cache():
+    """
+    Cache grafik bersama untuk seluruh proses
+    """
+    global _CHART_CACHE
+    with _CHART_CACHE_LOCK:
+        if _CHART_CACHE is None:
+            _CHART_CACHE = ChartCache()
+        return _CHART_CACHE
@@ -0,0 +1,283 @@
+"""
+Penjadwal terpusat untuk semua panggilan model Gemini.
+
+Setiap API key punya penjadwal sendiri dengan:
+- token bucket untuk request/menit dan token/menit,
+- batas jumlah request yang berjalan bersamaan (antrean per API key), berlaku
+  bersama untuk `call` (thread) dan `acall` (asyncio),
+- retry dengan exponential backoff + jitter untuk error yang bisa diulang
+  (429, 500, 502, 503, 504),
+- akuntansi kuota untuk ditampilkan di dashboard.
+
+`get_scheduler` dengan opsi pada API key yang sudah punya penjadwal menerapkan
+opsi itu ke penjadwal yang ada (`configure`), bukan mengabaikannya.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+
+DEFAULT_RPM = int(os.getenv('GEMINI_RPM', '15'))
+DEFAULT_TPM = int(os.getenv('GEMINI_TPM', '1000000'))
+DEFAULT_MAX_CONCURRENT = int(os.getenv('GEMINI_MAX_CONCURRENT', '4'))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_NAMES = {
+    'ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable',
+    'InternalServerError', 'BadGateway', 'GatewayTimeout', 'DeadlineExceeded',
+}
+
+# Perkiraan token per gambar (tarif tetap Gemini) untuk reservasi awal
+IMAGE_TOKENS = 258
+
+
+def estimate_tokens(contents):
+    """
+    Perkiraan kasar token masukan: ~4 karakter per token, gambar tarif tetap
+    """
+    if isinstance(contents, str):
+        return max(1, len(contents) // 4)
+    if isinstance(contents, (list, tuple)):
+        return sum(estimate_tokens(part) for part in contents)
+    return IMAGE_TOKENS
+
+
+def status_code(exc):
+    code = getattr(exc, 'code', None)
+    if callable(code):
+        try:
+            code = code()
+        except Exception:
+            code = None
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(exc):
+    if status_code(exc) in RETRYABLE_STATUS:
+        return True
+    return any(cls.__name__ in RETRYABLE_NAMES for cls in type(exc).__mro__)
+
+
+class TokenBucket:
+    def __init__(self, per_minute, burst=None):
+        """
+        Isi ulang `per_minute` unit per menit. `burst` (bawaan 1/10 laju per
+        menit) membatasi lonjakan agar jendela 60 detik mana pun tidak jauh
+        melampaui kuota.
+        """
+        self.rate = float(per_minute) / 60.0
+        self.capacity = float(burst if burst is not None else max(1, per_minute // 10))
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount):
+        """
+        Pesan `amount` unit; kembalikan lama menunggu (detik) sebelum boleh dipakai.
+        Reservasi berurutan sehingga pemanggil dilayani sesuai urutan datang.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level -= amount
+            return 0.0 if self._level >= 0 else -self._level / self.rate
+
+    def adjust(self, delta):
+        """
+        Koreksi setelah pemakaian sebenarnya diketahui (positif = pakai lebih banyak)
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level = min(self.capacity, self._level - delta)
+
+    def available(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._level
+
+
+class RequestScheduler:
+    def __init__(self, requests_per_minute=DEFAULT_RPM, tokens_per_minute=DEFAULT_TPM,
+                 max_concurrent=DEFAULT_MAX_CONCURRENT, max_retries=5,
+                 base_delay=1.0, max_delay=60.0, sleep=time.sleep):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrent = max(1, max_concurrent)
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'retries': 0,
+            'rate_limited': 0,
+            'tokens_used': 0,
+            'throttle_seconds': 0.0,
+            'backoff_seconds': 0.0,
+        }
+
+    def configure(self, requests_per_minute=None, tokens_per_minute=None, max_concurrent=None,
+                  max_retries=None, base_delay=None, max_delay=None, sleep=None):
+        """
+        Ubah batas penjadwal yang sudah dipakai; argumen None tidak diubah.
+        Bucket dan slot hanya dibuat ulang jika nilainya berbeda; request yang
+        sedang berjalan tetap melepas slot lamanya.
+        """
+        if requests_per_minute is not None and requests_per_minute != self.requests_per_minute:
+            self.requests_per_minute = requests_per_minute
+            self.request_bucket = TokenBucket(requests_per_minute)
+        if tokens_per_minute is not None and tokens_per_minute != self.tokens_per_minute:
+            self.tokens_per_minute = tokens_per_minute
+            self.token_bucket = TokenBucket(tokens_per_minute)
+        if max_concurrent is not None and max(1, max_concurrent) != self.max_concurrent:
+            self.max_concurrent = max(1, max_concurrent)
+            self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        if max_retries is not None:
+            self.max_retries = max_retries
+        if base_delay is not None:
+            self.base_delay = base_delay
+        if max_delay is not None:
+            self.max_delay = max_delay
+        if sleep is not None:
+            self._sleep = sleep
+        return self
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _reserve(self, estimated_tokens):
+        wait = max(
+            self.request_bucket.reserve(1),
+            self.token_bucket.reserve(estimated_tokens),
+        )
+        if wait:
+            self._count('throttle_seconds', wait)
+        return wait
+
+    def _backoff(self, attempt, exc):
+        # Equal jitter: acak di antara setengah batas eksponensial dan batasnya
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = random.uniform(cap / 2, cap)
+        retry_after = getattr(exc, 'retry_after', None)
+        if isinstance(retry_after, (int, float)):
+            delay = max(delay, retry_after)
+        self._count('backoff_seconds', delay)
+        return delay
+
+    def _settle(self, response, estimated_tokens):
+        usage = getattr(response, 'usage_metadata', None)
+        actual = getattr(usage, 'total_token_count', None)
+        if isinstance(actual, int):
+            self.token_bucket.adjust(actual - estimated_tokens)
+            self._count('tokens_used', actual)
+        else:
+            self._count('tokens_used', estimated_tokens)
+        self._count('succeeded')
+
+    def _should_retry(self, exc, attempt):
+        if status_code(exc) == 429 or 'ResourceExhausted' in {cls.__name__ for cls in type(exc).__mro__}:
+            self._count('rate_limited')
+        if attempt < self.max_retries and is_retryable(exc):
+            self._count('retries')
+            return True
+        self._count('failed')
+        return False
+
+    def call(self, fn, *args, estimated_tokens=0, **kwargs):
+        """
+        Jalankan fn(*args, **kwargs) sesuai batas kuota, dengan retry
+        """
+        self._count('requests')
+        attempt = 0
+        while True:
+            wait = self._reserve(estimated_tokens)
+            if wait:
+                self._sleep(wait)
+            try:
+                with self._slots:
+                    response = fn(*args, **kwargs)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                self._sleep(self._backoff(attempt, e))
+                attempt += 1
+                continue
+            self._settle(response, estimated_tokens)
+            return response
+
+    async def _acquire_slot(self):
+        # Slot yang sama dengan `call`, diambil tanpa memblokir event loop
+        slots = self._slots
+        delay = 0.005
+        while not slots.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.05)
+        return slots
+
+    async def acall(self, coroutine_fn, *args, estimated_tokens=0, **kwargs):
+        """
+        Versi async dari `call` dengan batas kuota, slot paralel, dan retry yang sama
+        """
+        self._count('requests')
+        attempt = 0
+        while True:
+            wait = self._reserve(estimated_tokens)
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                slots = await self._acquire_slot()
+                try:
+                    response = await coroutine_fn(*args, **kwargs)
+                finally:
+                    slots.release()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                await asyncio.sleep(self._backoff(attempt, e))
+                attempt += 1
+                continue
+            self._settle(response, estimated_tokens)
+            return response
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            'requests_per_minute': self.requests_per_minute,
+            'tokens_per_minute': self.tokens_per_minute,
+            'request_budget_left': max(0.0, self.request_bucket.available()),
+            'token_budget_left': max(0.0, self.token_bucket.available()),
+        })
+        return stats
+
+
+_SCHEDULERS = {}
+_SCHEDULERS_LOCK = threading.Lock()
+
+
+def get_scheduler(api_key, **options):
+    """
+    Penjadwal bersama untuk satu API key (satu antrean per key per proses);
+    `options` diterapkan juga ke penjadwal yang sudah ada
+    """
+    with _SCHEDULERS_LOCK:
+        scheduler = _SCHEDULERS.get(api_key)
+        if scheduler is None:
+            scheduler = RequestScheduler(**options)
+            _SCHEDULERS[api_key] = scheduler
+        elif options:
+            scheduler.configure(**options)
+        return scheduler
@@ -0,0 +1,186 @@
+"""
+Cache hasil OCR dan analisis di disk, dialamatkan oleh hash isi gambar.
+
+Kunci cache adalah SHA-256 dari piksel gambar yang sudah didekode (mode,
+ukuran, dan byte piksel) ditambah nama model dan versi prompt, sehingga struk
+yang sama tidak memanggil API lagi, sedangkan perubahan prompt/model otomatis
+membuat kunci baru. Ukuran cache dibatasi dan entri terlama (LRU) dibuang.
+
+Selain teks OCR/analisis, entri menyimpan baris hasil parsing (`rows`) sehingga
+cache hit langsung menjadi DataFrame tanpa parsing ulang (`cached_rows`). Teks
+tetap disimpan: baris dengan `ROWS_VERSION` lama (parser/skema berubah tanpa
+perubahan prompt) di-parse ulang dari teksnya, bukan dipakai apa adanya.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from asset_ocr.schema import coerce_frame
+
+DEFAULT_CACHE_PATH = os.getenv('OCR_CACHE_PATH', os.path.join('.cache', 'ocr_results.sqlite'))
+DEFAULT_MAX_BYTES = int(os.getenv('OCR_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# Naikkan saat parser atau skema tabel berubah agar baris lama di cache diabaikan
+ROWS_VERSION = 1
+
+
+def image_fingerprint(image):
+    """
+    Hash byte piksel gambar yang sudah didekode
+    """
+    digest = hashlib.sha256()
+    digest.update(image.mode.encode('utf-8'))
+    digest.update(repr(image.size).encode('utf-8'))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def make_cache_key(image, model_name, prompt_version):
+    """
+    Gabungkan hash gambar dengan model dan versi prompt
+    """
+    fingerprint = image if isinstance(image, str) else image_fingerprint(image)
+    return f"{fingerprint}:{model_name}:{prompt_version}"
+
+
+def encode_rows(frame):
+    """
+    DataFrame hasil parsing -> bentuk JSON untuk payload cache
+    """
+    encoded = json.loads(frame.to_json(orient='split', index=False, date_format='iso'))
+    encoded['version'] = ROWS_VERSION
+    return encoded
+
+
+def cached_rows(cached, columns):
+    """
+    Baris hasil parsing dari entri cache dengan dtype skema, atau None jika
+    entri tidak menyimpan baris atau versinya lama
+    """
+    rows = (cached or {}).get('rows')
+    if not rows or rows.get('version') != ROWS_VERSION or list(rows['columns']) != list(columns):
+        return None
+    return coerce_frame(pd.DataFrame(rows['data'], columns=rows['columns']), columns)
+
+
+class OCRResultCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_cache (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ocr_cache_access ON ocr_cache(last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        """
+        Ambil hasil dari cache, atau None jika belum ada
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM ocr_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE ocr_cache SET last_access = ? WHERE key = ?",
+                (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key, ocr_text, analysis_text, rows=None):
+        """
+        Simpan teks OCR, teks analisis, dan (jika ada) DataFrame hasil parsing
+        """
+        payload = {
+            'ocr_text': ocr_text,
+            'analysis_text': analysis_text,
+        }
+        if rows is not None:
+            payload['rows'] = encode_rows(rows)
+        payload = json.dumps(payload)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache (key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload.encode('utf-8')), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """
+        Buang entri yang paling lama tidak diakses sampai ukuran di bawah batas
+        """
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM ocr_cache ORDER BY last_access ASC"
+        ).fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM ocr_cache WHERE key = ?", stale)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM ocr_cache")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_cache"
+            ).fetchone()
+            return {
+                'entries': entries,
+                'bytes': total,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_result_cache():
+    """
+    Instance cache bersama untuk seluruh proses
+    """
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = OCRResultCache()
+        return _CACHE
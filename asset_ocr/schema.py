@@ -0,0 +1,89 @@
+"""
+Skema kolom tabel aset bersama untuk ketiga aplikasi.
+
+Tabel 5 kolom (main4.py, main_ocr.py) dan 7 kolom (main_ocr2.py) didefinisikan
+sekali di sini beserta dtype ringkasnya: tanggal sebagai datetime64, vendor
+dan satuan sebagai kategori (nilainya banyak berulang), dan nama item sebagai
+string Arrow bila pyarrow terpasang. Data dipaksa ke skema
+ini saat masuk tabel (`coerce_frame`), bukan dibiarkan sebagai object.
+
+Quantity, Harga, dan Total Harga tetap float64. float32 hanya teliti sampai
+~7 digit, sehingga total Rupiah di atas puluhan juta akan bergeser, dan
+pecahan desimal seperti 1.1 tersimpan sebagai 1.100000023841858 begitu
+dilebarkan ke REAL SQLite atau diekspor.
+"""
+import pandas as pd
+
+DATE_COLUMN = 'Tanggal Beli'
+NAME_COLUMN = 'Nama Item'
+NUMERIC_COLUMNS = ('Quantity', 'Harga', 'Total Harga')
+CATEGORY_COLUMNS = ('Jenis Satuan', 'Vendor')
+
+COLUMNS_5 = ('Tanggal Beli', 'Nama Item', 'Quantity', 'Harga', 'Total Harga')
+COLUMNS_7 = ('Tanggal Beli', 'Nama Item', 'Quantity', 'Jenis Satuan', 'Harga', 'Total Harga', 'Vendor')
+
+
+def _string_dtype():
+    # String Arrow jauh lebih hemat memori daripada object; pyarrow opsional
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return 'string'
+    return 'string[pyarrow]'
+
+
+STRING_DTYPE = _string_dtype()
+
+DTYPES = {
+    'Tanggal Beli': 'datetime64[ns]',
+    'Nama Item': STRING_DTYPE,
+    'Quantity': 'float64',
+    'Jenis Satuan': 'category',
+    'Harga': 'float64',
+    'Total Harga': 'float64',
+    'Vendor': 'category',
+}
+
+
+def has_dtype(values, dtype):
+    if dtype == 'category':
+        return isinstance(values.dtype, pd.CategoricalDtype)
+    return values.dtype == pd.api.types.pandas_dtype(dtype)
+
+
+def coerce_column(values, dtype):
+    """
+    Paksa satu kolom ke dtype tujuan; nilai yang tidak terbaca menjadi NaN/NaT
+    """
+    if has_dtype(values, dtype):
+        return values
+    if dtype.startswith('datetime64'):
+        return pd.to_datetime(values, errors='coerce', format='ISO8601').astype(dtype)
+    if dtype.startswith(('float', 'int', 'Int', 'Float')):
+        return pd.to_numeric(values, errors='coerce').astype(dtype)
+    return values.astype(dtype)
+
+
+def coerce_frame(frame, columns, dtypes=None):
+    """
+    Samakan kolom dan dtype sebuah DataFrame dengan skema tabel
+    """
+    dtypes = DTYPES if dtypes is None else dtypes
+    frame = frame.reindex(columns=list(columns))
+    for column in frame.columns:
+        dtype = dtypes.get(column, 'object')
+        if not has_dtype(frame[column], dtype):
+            frame[column] = coerce_column(frame[column], dtype)
+    return frame
+
+
+def editable_frame(frame):
+    """
+    Salinan untuk st.data_editor: kolom kategori diubah ke string agar nilai
+    baru bisa diketik (kategori ditampilkan Streamlit sebagai pilihan tetap)
+    """
+    categories = {
+        column: STRING_DTYPE for column in frame.columns
+        if isinstance(frame[column].dtype, pd.CategoricalDtype)
+    }
+    return frame.astype(categories) if categories else frame
@@ -0,0 +1,200 @@
+"""
+Layanan inti struk tanpa UI: OCR, analisis, ekstraksi terstruktur, parsing,
+dan ringkasan laporan.
+
+Tidak ada panggilan Streamlit di sini. Kegagalan dilempar sebagai turunan
+`ServiceError` (`asset_ocr.errors`) dengan tahapnya, dan hasil dikembalikan
+sebagai objek biasa; aplikasi menangkap exception itu lalu memanggil
+`st.error`. Modul ini hanya mengimpor pandas dan PIL: klien Gemini, OpenCV,
+EasyOCR, Tesseract, dan matplotlib baru diimpor oleh engine/klien saat
+benar-benar dipakai, sehingga worker proses mulai dengan cepat.
+
+`process_receipt` menjalankan satu struk dari gambar sampai DataFrame dan
+mengembalikan `ReceiptResult` (kesalahan ikut di dalamnya, bukan dilempar);
+fungsi, argumen (`ReceiptPrompts`, gambar PIL), dan hasilnya bisa di-pickle
+sehingga bisa dikirim ke `ProcessPoolExecutor`.
+"""
+import time
+
+import pandas as pd
+
+from asset_ocr.analysis_parser import parse_many
+from asset_ocr.errors import AnalysisError, ExtractionError, OCRError, ParseError, ReportError, ServiceError
+from asset_ocr.image_preprocessing import prepare_for_upload
+
+
+def image_payload(image, settings=None):
+    """
+    Bagian gambar untuk Gemini: orientasi EXIF, batas resolusi, JPEG/WebP
+    """
+    data, mime_type, _ = prepare_for_upload(image, settings)
+    return {'mime_type': mime_type, 'data': data}
+
+
+def _json_config(response_schema):
+    return {'response_mime_type': 'application/json', 'response_schema': response_schema}
+
+
+def run_ocr(image, engine_name='gemini', **options):
+    """
+    OCR dengan engine terdaftar (`asset_ocr.ocr_engines`); kembalikan OCRResult
+    """
+    from asset_ocr.ocr_engines import get_engine
+
+    try:
+        return get_engine(engine_name, **options).perform_ocr(image)
+    except ServiceError:
+        raise
+    except Exception as e:
+        raise OCRError(str(e), e) from e
+
+
+def analyze_text(text, api_key, prompt_template, model_name='gemini-1.5-flash'):
+    """
+    Teks OCR -> teks analisis (CSV) dari Gemini
+    """
+    from asset_ocr.gemini_client import generate_content, get_model
+
+    try:
+        # Model dari cache (tanpa konfigurasi global per request)
+        model = get_model(api_key, model_name)
+        return generate_content(api_key, model, prompt_template.format(text=text)).text
+    except Exception as e:
+        raise AnalysisError(str(e), e) from e
+
+
+def extract_structured(image, api_key, prompt, response_schema, model_name='gemini-1.5-flash',
+                       upload_settings=None):
+    """
+    Ekstraksi satu tahap: gambar langsung menjadi JSON sesuai skema tabel
+    """
+    from asset_ocr.gemini_client import generate_content, get_model
+
+    try:
+        image_part = image_payload(image, upload_settings)
+        model = get_model(api_key, model_name, generation_config=_json_config(response_schema))
+        return generate_content(api_key, model, [prompt, image_part]).text
+    except Exception as e:
+        raise ExtractionError(str(e), e) from e
+
+
+def stream_ocr(image, api_key, prompt, model_name='gemini-1.5-flash', upload_settings=None):
+    """
+    OCR dengan stream=True: generator potongan teks begitu diterima
+    """
+    from asset_ocr.gemini_client import get_model, stream_content
+
+    image_part = image_payload(image, upload_settings)
+    return stream_content(api_key, get_model(api_key, model_name), [prompt, image_part])
+
+
+def stream_analysis(text, api_key, prompt_template, model_name='gemini-1.5-flash'):
+    """
+    Analisis dengan stream=True: generator potongan CSV begitu diterima
+    """
+    from asset_ocr.gemini_client import get_model, stream_content
+
+    return stream_content(api_key, get_model(api_key, model_name), prompt_template.format(text=text))
+
+
+def stream_extract(image, api_key, prompt, response_schema, model_name='gemini-1.5-flash'):
+    """
+    Ekstraksi satu tahap dengan stream=True: potongan array JSON begitu diterima
+    """
+    from asset_ocr.gemini_client import get_model, stream_content
+
+    image_part = image_payload(image)
+    model = get_model(api_key, model_name, generation_config=_json_config(response_schema))
+    return stream_content(api_key, model, [prompt, image_part])
+
+
+def parse_results(texts, prompts):
+    """
+    Banyak teks analisis (CSV/JSON) -> satu DataFrame dengan kolom aplikasi
+    """
+    try:
+        return parse_many(texts, prompts.columns, prompts.field_columns)
+    except Exception as e:
+        raise ParseError(str(e), e) from e
+
+
+class ReceiptResult:
+    def __init__(self, name):
+        self.name = name
+        self.ocr_text = None
+        self.analysis_text = None
+        self.rows = None
+        self.error = None
+        self.timings = {}
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def process_receipt(name, image, api_key, prompts, mode='two_stage', upload_settings=None):
+    """
+    Satu struk: OCR -> analisis -> parsing (atau ekstraksi satu tahap).
+    Kesalahan disimpan di `ReceiptResult.error` sebagai ServiceError.
+    """
+    result = ReceiptResult(name)
+    stage_start = time.perf_counter()
+    try:
+        if mode == 'one_shot':
+            result.analysis_text = extract_structured(
+                image, api_key, prompts.structured_prompt, prompts.response_schema,
+                prompts.model_name, upload_settings
+            )
+        else:
+            result.ocr_text = run_ocr(
+                image, 'gemini', api_key=api_key, prompt=prompts.ocr_prompt,
+                model_name=prompts.model_name, upload_settings=upload_settings
+            ).text
+            result.timings['ocr'] = time.perf_counter() - stage_start
+            if not result.ocr_text:
+                raise OCRError("OCR tidak menghasilkan teks")
+            result.analysis_text = analyze_text(
+                result.ocr_text, api_key, prompts.analysis_template, prompts.model_name
+            )
+        result.timings['analysis'] = time.perf_counter() - stage_start - result.timings.get('ocr', 0.0)
+
+        parse_start = time.perf_counter()
+        result.rows = parse_results([result.analysis_text], prompts)
+        result.timings['parse'] = time.perf_counter() - parse_start
+    except ServiceError as e:
+        result.error = e
+    return result
+
+
+def summarize_report(aggregates):
+    """
+    Ringkasan laporan dari agregat berjalan (AssetStore.aggregates), O(jumlah grup)
+    """
+    from asset_ocr.unit_conversion import normalize_units
+
+    try:
+        # Ringkasan per jenis satuan (satuan sejenis disatukan, mis. gram -> kg)
+        units = aggregates['unit']
+        quantities, normalized = normalize_units(units.to_numpy(), pd.Series(units.index, dtype=object))
+        return {
+            'Total Aset': aggregates['total'],
+            'Ringkasan Vendor': aggregates['vendor'],
+            'Ringkasan Satuan': quantities.groupby(normalized, observed=True).sum(),
+            'Ringkasan Bulanan': aggregates['month'],
+        }
+    except Exception as e:
+        raise ReportError(f"Gagal membuat ringkasan: {e}", e) from e
+
+
+def vendor_chart_png(summary):
+    """
+    PNG total aset per vendor (di-cache per isi ringkasan)
+    """
+    from asset_ocr.report_charts import get_chart_cache
+
+    try:
+        return get_chart_cache().bar_chart(
+            summary['Ringkasan Vendor'], 'Total Aset per Vendor', 'Vendor', 'Total Harga'
+        )
+    except Exception as e:
+        raise ReportError(f"Gagal membuat visualisasi: {e}", e) from e
@@ -0,0 +1,73 @@
+"""
+Parser inkremental untuk keluaran model yang di-stream.
+
+`IncrementalLineParser` mengeluarkan baris CSV segera setelah baris itu
+lengkap, dan `IncrementalJSONParser` mengeluarkan setiap objek JSON tingkat
+atas di dalam array segera setelah kurung kurawal penutupnya diterima.
+"""
+import json
+
+
+class IncrementalLineParser:
+    def __init__(self):
+        self._buffer = ''
+
+    def feed(self, chunk):
+        """
+        Tambahkan potongan teks; kembalikan baris yang sudah lengkap
+        """
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split('\n')
+        return [line for line in lines if line.strip()]
+
+    def flush(self):
+        """
+        Sisa baris terakhir (tanpa newline penutup)
+        """
+        line, self._buffer = self._buffer, ''
+        return [line] if line.strip() else []
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk):
+        """
+        Tambahkan potongan teks; kembalikan objek JSON (dict) yang sudah lengkap
+        """
+        objects = []
+        for char in chunk:
+            if self._depth > 0:
+                self._buffer.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = self._depth > 0
+            elif char == '{':
+                if self._depth == 0:
+                    self._buffer = [char]
+                self._depth += 1
+            elif char == '}' and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        objects.append(json.loads(''.join(self._buffer)))
+                    except ValueError:
+                        pass
+                    self._buffer = []
+        return objects
+
+    def flush(self):
+        return []
@@ -0,0 +1,171 @@
+"""
+Penampung baris tabel sementara tanpa `pd.concat` per penambahan.
+
+Baris tunggal (input manual) ditampung di list per kolom, sedangkan batch
+hasil analisis disimpan sebagai potongan DataFrame. DataFrame utuh baru
+dibentuk saat UI membutuhkannya (`to_frame`), dengan satu kali concat untuk
+semua potongan baru, lalu di-cache sampai ada penambahan berikutnya. Setiap
+kolom dipaksa ke dtype skema (`asset_ocr.schema`) agar memori tetap stabil.
+
+Edit dari `st.data_editor` diterapkan per baris lewat `apply_edits` (bukan
+mengganti seluruh tabel) dan kebalikannya disimpan di riwayat untuk `undo`.
+Riwayat memakai posisi baris, jadi dikosongkan setiap ada penambahan baris
+atau penggantian tabel di luar `apply_edits`.
+`version` naik setiap isi tabel berubah, untuk kunci editor di UI.
+"""
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from asset_ocr.schema import DTYPES, coerce_frame
+
+
+DEFAULT_HISTORY = 50
+
+
+class TableBuilder:
+    def __init__(self, columns, dtypes=None, history=DEFAULT_HISTORY):
+        self.columns = list(columns)
+        dtypes = DTYPES if dtypes is None else dtypes
+        self.dtypes = {column: dtypes.get(column, 'object') for column in self.columns}
+        self._chunks = []
+        self._pending = {column: [] for column in self.columns}
+        self._pending_rows = 0
+        self._history = deque(maxlen=history)
+        self.version = 0
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self._chunks) + self._pending_rows
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def coerce(self, frame):
+        """
+        Samakan kolom dan dtype sebuah DataFrame dengan skema tabel
+        """
+        return coerce_frame(frame, self.columns, self.dtypes)
+
+    def append_row(self, row):
+        """
+        Tambahkan satu baris (dict) ke buffer kolom, O(1)
+        """
+        for column in self.columns:
+            self._pending[column].append(row.get(column))
+        self._pending_rows += 1
+        self._history.clear()
+        self.version += 1
+
+    def append_frame(self, frame):
+        """
+        Tambahkan satu batch DataFrame sebagai potongan baru, O(batch)
+        """
+        if frame is None or frame.empty:
+            return
+        self._flush()
+        self._chunks.append(self.coerce(frame).reset_index(drop=True))
+        self._history.clear()
+        self.version += 1
+
+    def _flush(self):
+        if not self._pending_rows:
+            return
+        chunk = pd.DataFrame(self._pending, columns=self.columns)
+        self._chunks.append(self.coerce(chunk))
+        self._pending = {column: [] for column in self.columns}
+        self._pending_rows = 0
+
+    def to_frame(self):
+        """
+        DataFrame utuh; potongan yang tertunda digabung sekali lalu di-cache
+        """
+        self._flush()
+        if not self._chunks:
+            return self.coerce(pd.DataFrame(columns=self.columns))
+        if len(self._chunks) > 1:
+            # Kategori berbeda antarpotongan menjadi object saat concat, jadi dipaksa ulang
+            self._chunks = [self.coerce(pd.concat(self._chunks, ignore_index=True))]
+        return self._chunks[0]
+
+    def replace(self, frame):
+        """
+        Ganti seluruh isi tabel (mis. hasil st.data_editor)
+        """
+        self._pending = {column: [] for column in self.columns}
+        self._pending_rows = 0
+        self._chunks = [] if frame is None or frame.empty else [self.coerce(frame).reset_index(drop=True)]
+        self._history.clear()
+        self.version += 1
+
+    def clear(self):
+        self.replace(None)
+
+    def _set_rows(self, frame, rows):
+        # Tulis nilai baris per kolom di tempat; kategori baru ditambahkan lebih dulu
+        for column in self.columns:
+            values = rows[column]
+            if isinstance(frame[column].dtype, pd.CategoricalDtype):
+                new = pd.Index(values.dropna().unique()).difference(frame[column].cat.categories)
+                if len(new):
+                    frame[column] = frame[column].cat.add_categories(new)
+                values = values.astype(object)
+            frame.loc[rows.index, column] = values.to_numpy()
+
+    def apply_edits(self, updated=None, added=None, deleted=()):
+        """
+        Terapkan satu kelompok edit per baris: `updated` (index = posisi baris
+        di `to_frame()`), `added` (ditambahkan di akhir), `deleted` (posisi)
+        """
+        updated = self.coerce(updated) if updated is not None and not updated.empty else None
+        added = self.coerce(added) if added is not None and not added.empty else None
+        deleted = sorted({int(position) for position in deleted})
+        if updated is None and added is None and not deleted:
+            return False
+
+        frame = self.to_frame()
+        size = len(frame)
+        undo = {'size': size, 'updated': None, 'deleted': None, 'added': 0}
+
+        if updated is not None:
+            undo['updated'] = frame.loc[updated.index].copy()
+            self._set_rows(frame, updated)
+        if deleted:
+            undo['deleted'] = frame.iloc[deleted].copy()
+            frame = frame.drop(index=frame.index[deleted]).reset_index(drop=True)
+        if added is not None:
+            undo['added'] = len(added)
+            frame = pd.concat([frame, added], ignore_index=True)
+
+        self._chunks = [self.coerce(frame)] if len(frame) else []
+        self._history.append(undo)
+        self.version += 1
+        return True
+
+    def undo(self):
+        """
+        Batalkan kelompok edit terakhir; kembalikan False jika riwayat kosong
+        """
+        if not self._history:
+            return False
+        undo = self._history.pop()
+        frame = self.to_frame()
+
+        if undo['added']:
+            frame = frame.iloc[:len(frame) - undo['added']]
+        if undo['deleted'] is not None:
+            # Kembalikan baris terhapus ke posisi semula
+            kept = np.setdiff1d(np.arange(undo['size']), undo['deleted'].index.to_numpy())
+            frame = pd.concat([frame.set_axis(kept), undo['deleted']]).sort_index()
+        frame = self.coerce(frame.reset_index(drop=True))
+        if undo['updated'] is not None:
+            self._set_rows(frame, undo['updated'])
+
+        self._chunks = [frame] if len(frame) else []
+        self.version += 1
+        return True
+
+    @property
+    def can_undo(self):
+        return bool(self._history)
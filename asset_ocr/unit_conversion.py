@@ -0,0 +1,86 @@
+"""
+Konversi kolom Quantity dan normalisasi kolom Jenis Satuan per kolom (bukan per nilai).
+
+`convert_quantities` membaca angka, desimal koma, dan pecahan ("1 1/2",
+"3/4", "2,5") sekaligus dan mengembalikan mask error alih-alih memunculkan
+peringatan per sel. `normalize_units` menyatukan satuan sejenis ke satuan
+dasar (gram -> kg, cm -> meter, lusin -> pcs) dan menyesuaikan quantity.
+"""
+import numpy as np
+import pandas as pd
+
+from asset_ocr.analysis_parser import MISSING_VALUES, factorized, parse_numbers
+
+# Alias satuan -> (satuan dasar, faktor pengali ke satuan dasar)
+UNIT_ALIASES = {
+    # Massa
+    'kg': ('kg', 1.0), 'kilo': ('kg', 1.0), 'kilogram': ('kg', 1.0),
+    'g': ('kg', 0.001), 'gr': ('kg', 0.001), 'gram': ('kg', 0.001),
+    'ons': ('kg', 0.1), 'ton': ('kg', 1000.0),
+    # Panjang
+    'm': ('meter', 1.0), 'meter': ('meter', 1.0), 'mtr': ('meter', 1.0),
+    'cm': ('meter', 0.01), 'mm': ('meter', 0.001),
+    # Volume
+    'l': ('liter', 1.0), 'ltr': ('liter', 1.0), 'liter': ('liter', 1.0),
+    'ml': ('liter', 0.001),
+    # Jumlah
+    'pcs': ('pcs', 1.0), 'pc': ('pcs', 1.0), 'buah': ('pcs', 1.0), 'bh': ('pcs', 1.0),
+    'unit': ('pcs', 1.0), 'biji': ('pcs', 1.0),
+    'lusin': ('pcs', 12.0), 'lsn': ('pcs', 12.0), 'dozen': ('pcs', 12.0),
+    'kodi': ('pcs', 20.0), 'gross': ('pcs', 144.0),
+}
+
+
+def convert_quantities(values):
+    """
+    Ubah kolom quantity campuran menjadi float; kembalikan (nilai, mask error)
+
+    Nilai kosong/'N/A' menjadi NaN tanpa dianggap error; nilai lain yang tidak
+    terbaca menjadi NaN dengan mask error True.
+    """
+    values = pd.Series(values, dtype=object)
+    numbers = parse_numbers(values)
+    missing = factorized(
+        values, lambda uniques: uniques.astype(str).str.strip().isin(MISSING_VALUES)
+    )
+    errors = numbers.isna() & ~missing.fillna(True).astype(bool)
+    return numbers, errors
+
+
+def normalize_units(quantities, units, prices=None):
+    """
+    Satukan satuan sejenis ke satuan dasar
+
+    Mengembalikan (quantity, satuan) dan juga harga satuan jika `prices` diberikan
+    (harga dibagi faktor agar Total Harga tetap sama). Satuan yang tidak dikenal
+    tetap apa adanya dengan faktor 1.
+    """
+    units = pd.Series(units)
+    quantities = pd.Series(np.asarray(quantities, dtype='float64'), index=units.index)
+
+    # Petakan per nilai unik, bukan per baris: jumlah satuan unik jauh lebih kecil.
+    # Kolom kategori langsung memakai kodenya tanpa diubah ke object per baris.
+    codes, uniques = pd.factorize(units)
+    uniques = pd.Series(np.asarray(uniques, dtype=object), dtype=object).str.strip()
+    mapped = [
+        UNIT_ALIASES.get(unit.lower()) if isinstance(unit, str) else None
+        for unit in uniques
+    ]
+    bases = [entry[0] if entry else unit for entry, unit in zip(mapped, uniques)]
+    # Elemen terakhir dipakai untuk kode -1 (nilai kosong)
+    factors = np.array([entry[1] if entry else 1.0 for entry in mapped] + [1.0])
+
+    # Hasil berupa kategori: satuan dasar unik sebagai kategori, -1 untuk kosong
+    base_codes, base_categories = pd.factorize(pd.Series(bases, dtype=object))
+    base_codes = np.append(base_codes, -1)
+
+    row_factors = factors[codes]
+    normalized_units = pd.Series(
+        pd.Categorical.from_codes(base_codes[codes], base_categories), index=units.index
+    )
+
+    result = (quantities * row_factors, normalized_units)
+    if prices is not None:
+        prices = pd.Series(np.asarray(prices, dtype='float64'), index=units.index)
+        result += (prices / row_factors,)
+    return result
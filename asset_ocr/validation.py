@@ -0,0 +1,104 @@
+"""
+Validasi tabel aset per DataFrame, bukan per baris.
+
+Setiap aturan dihitung sebagai satu mask boolean atas seluruh kolom dan
+disimpan sebagai bit pada kode error per baris, sehingga ribuan baris hasil
+OCR bisa divalidasi sekaligus dan baris yang bermasalah ditandai di tabel.
+Aturan yang kolomnya tidak ada (mis. Vendor pada tabel 5 kolom) dilewati.
+"""
+import numpy as np
+import pandas as pd
+
+from asset_ocr.analysis_parser import factorized
+
+# Kode error -> pesan; urutan menentukan bit pada flag
+ERROR_MESSAGES = {
+    'NAMA': "Nama Item minimal 2 karakter",
+    'QTY': "Quantity harus lebih dari 0",
+    'HARGA': "Harga tidak boleh negatif",
+    'VENDOR': "Nama Vendor minimal 2 karakter",
+    'TANGGAL': "Tanggal Beli tidak valid (format YYYY-MM-DD)",
+    'TOTAL': "Total Harga tidak sama dengan Quantity x Harga",
+}
+ERROR_BITS = {code: 1 << bit for bit, code in enumerate(ERROR_MESSAGES)}
+
+DEFAULT_TOTAL_TOLERANCE = 0.01
+DEFAULT_TOTAL_ABS_TOLERANCE = 1.0
+
+
+def _too_short(values, minimum=2):
+    # Nama dan vendor banyak berulang: hitung panjang per nilai unik
+    lengths = factorized(values, lambda uniques: uniques.astype(str).str.strip().str.len())
+    return lengths.fillna(0).to_numpy(dtype='float64') < minimum
+
+
+def _numbers(values):
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64')
+
+
+def error_flags(df, tolerance=DEFAULT_TOTAL_TOLERANCE, abs_tolerance=DEFAULT_TOTAL_ABS_TOLERANCE):
+    """
+    Hitung bitmask error per baris (0 berarti valid)
+    """
+    flags = np.zeros(len(df), dtype=np.int64)
+
+    def flag(code, mask):
+        flags[mask] |= ERROR_BITS[code]
+
+    if 'Nama Item' in df.columns:
+        flag('NAMA', _too_short(df['Nama Item']))
+
+    quantity = _numbers(df['Quantity']) if 'Quantity' in df.columns else None
+    price = _numbers(df['Harga']) if 'Harga' in df.columns else None
+
+    if quantity is not None:
+        # NaN juga dianggap tidak valid
+        flag('QTY', ~(quantity > 0))
+    if price is not None:
+        flag('HARGA', ~(price >= 0))
+    if 'Vendor' in df.columns:
+        flag('VENDOR', _too_short(df['Vendor']))
+    if 'Tanggal Beli' in df.columns:
+        dates = df['Tanggal Beli']
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            invalid = dates.isna().to_numpy()
+        else:
+            invalid = factorized(dates, lambda uniques: pd.to_datetime(
+                uniques.astype(str), format='%Y-%m-%d', errors='coerce'
+            ).isna()).fillna(True).to_numpy(dtype=bool)
+        flag('TANGGAL', invalid)
+    if quantity is not None and price is not None and 'Total Harga' in df.columns:
+        expected = quantity * price
+        total = _numbers(df['Total Harga'])
+        allowed = np.maximum(abs_tolerance, tolerance * np.abs(expected))
+        flag('TOTAL', ~(np.abs(total - expected) <= allowed))
+
+    return pd.Series(flags, index=df.index)
+
+
+def describe_flags(flags, separator=', '):
+    """
+    Ubah bitmask menjadi daftar kode error per baris ('' untuk baris valid)
+    """
+    flags = pd.Series(flags)
+    # Kombinasi error yang muncul biasanya sedikit, jadi labeli per nilai unik
+    codes, uniques = pd.factorize(flags)
+    labels = np.array([
+        separator.join(code for code, bit in ERROR_BITS.items() if value & bit)
+        for value in uniques
+    ] + [''], dtype=object)
+    return pd.Series(labels[codes], index=flags.index)
+
+
+def validate_frame(df, tolerance=DEFAULT_TOTAL_TOLERANCE, abs_tolerance=DEFAULT_TOTAL_ABS_TOLERANCE):
+    """
+    Validasi seluruh DataFrame; kembalikan kode error per baris ('' jika valid)
+    """
+    return describe_flags(error_flags(df, tolerance, abs_tolerance))
+
+
+def error_messages(flags):
+    """
+    Pesan error untuk satu bitmask
+    """
+    return [message for code, message in ERROR_MESSAGES.items() if flags & ERROR_BITS[code]]
@@ -0,0 +1,84 @@
+"""
+Bandingkan parser hasil analisis lama (loop split per baris, lalu pd.to_numeric
+per kolom dan pd.concat per struk) dengan `asset_ocr.analysis_parser.parse_many`
+pada keluaran model sintetis berukuran besar.
+
+Keluaran sintetis sengaja memuat nama dengan apostrof dan koma serta angka
+format Indonesia, sehingga jumlah baris yang berhasil dibaca juga dilaporkan.
+
+Contoh:
+    python -m benchmarks.analysis_parser --receipts 5000 --items 20
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from asset_ocr.analysis_parser import parse_many
+from asset_ocr.schema import COLUMNS_5
+
+COLUMNS = list(COLUMNS_5)
+NAMES = [
+    "Oreo Vanilla", "Kacang Dua 'Kelinci'", "Paku, 2 inch", "Semen Tiga Roda",
+    "Kabel NYM 2x1,5", "Cat Tembok (Putih)", "Lampu LED 12W", "Pipa PVC 1/2\"",
+]
+
+
+def synthetic_output(rng, items):
+    lines = ["'Tanggal Beli','Nama Item','Quantity','Harga','Total Harga'"]
+    for _ in range(items):
+        quantity = rng.randint(1, 50)
+        price = rng.randrange(500, 500000, 500)
+        total = quantity * price
+        # Sebagian angka memakai pemisah ribuan titik seperti pada struk
+        price_text = f"{price:,}".replace(',', '.') if rng.random() < 0.3 else str(price)
+        total_text = f"{total:,}".replace(',', '.') if rng.random() < 0.3 else str(total)
+        lines.append(f"'2023-10-{rng.randint(1, 28):02d}','{rng.choice(NAMES)}','{quantity}','{price_text}','{total_text}'")
+    return '\n'.join(lines)
+
+
+def legacy_parse(analysis_result):
+    """
+    Salinan parser lama dari main4.py
+    """
+    clean_result = analysis_result.strip().replace("'", "")
+    processed_data = []
+    for line in clean_result.split('\n'):
+        parts = [part.strip() for part in line.split(',')]
+        if len(parts) == 5:
+            processed_data.append(parts)
+    df = pd.DataFrame(processed_data, columns=COLUMNS)
+    df['Quantity'] = pd.to_numeric(df['Quantity'], errors='coerce')
+    df['Harga'] = pd.to_numeric(df['Harga'], errors='coerce')
+    df['Total Harga'] = pd.to_numeric(df['Total Harga'], errors='coerce')
+    return df.dropna()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--receipts', type=int, default=2000)
+    parser.add_argument('--items', type=int, default=20, help="Baris item per struk")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [synthetic_output(rng, args.items) for _ in range(args.receipts)]
+    expected = args.receipts * args.items
+
+    start = time.perf_counter()
+    legacy = pd.concat([legacy_parse(text) for text in texts], ignore_index=True)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parsed = parse_many(texts, COLUMNS)
+    new_seconds = time.perf_counter() - start
+
+    print(f"{args.receipts} struk x {args.items} item = {expected} baris")
+    print(f"{'parser':<12} {'detik':>8} {'baris':>8} {'terbaca':>8}")
+    print(f"{'lama':<12} {legacy_seconds:>8.3f} {len(legacy):>8} {len(legacy) / expected:>8.1%}")
+    print(f"{'parse_many':<12} {new_seconds:>8.3f} {len(parsed):>8} {len(parsed) / expected:>8.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Periksa dan ukur agregat berjalan `AssetStore.aggregates()`: setelah simpan,
+edit, hapus, dan undo acak hasilnya dibandingkan dengan perhitungan penuh
+(`summarize_frame` atas seluruh tabel), lalu waktu laporan dari agregat
+dibandingkan dengan membaca dan meng-groupby seluruh tabel. Tulisan dari
+instance store kedua (seperti ingest batch) juga harus terlihat.
+
+Contoh:
+    python -m benchmarks.asset_aggregates --rows 1000000 --steps 50
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from asset_ocr.asset_aggregates import summarize_frame
+from asset_ocr.asset_store import AssetStore
+from asset_ocr.schema import COLUMNS_7
+
+VENDORS = [f"Toko {index}" for index in range(50)] + [None]
+UNITS = ['pcs', 'kg', 'gram', 'meter', 'cm', 'lusin', 'sak', None]
+
+
+def synthetic_batch(rows, rng):
+    quantity = rng.integers(1, 20, rows).astype(float)
+    price = rng.integers(500, 500000, rows).astype(float)
+    days = rng.integers(0, 730, rows)
+    return pd.DataFrame({
+        'Tanggal Beli': pd.Timestamp('2023-01-01') + pd.to_timedelta(days, unit='D'),
+        'Nama Item': rng.choice(['Oreo Vanilla', 'Semen Tiga Roda', 'Paku 2 inch'], rows),
+        'Quantity': quantity,
+        'Jenis Satuan': rng.choice(np.array(UNITS, dtype=object), rows),
+        'Harga': price,
+        'Total Harga': quantity * price,
+        'Vendor': rng.choice(np.array(VENDORS, dtype=object), rows),
+    })
+
+
+def same_summary(running, full):
+    if running['rows'] != full['rows'] or not np.isclose(running['total'], full['total'], rtol=1e-9):
+        return False
+    for dimension in ('vendor', 'unit', 'month'):
+        left, right = running[dimension].sort_index(), full[dimension].sort_index()
+        if list(left.index) != list(right.index) or not np.allclose(left, right, rtol=1e-9):
+            return False
+    return True
+
+
+def random_step(store, rng):
+    action = rng.choice(['append', 'edit', 'undo'])
+    if action == 'append':
+        store.append(synthetic_batch(int(rng.integers(1, 50)), rng))
+        return action
+    if action == 'undo':
+        store.undo()
+        return action
+
+    page = store.page(offset=int(rng.integers(0, max(1, store.count() - 20))), limit=20)
+    if page.empty:
+        return action
+    updated = page.sample(min(5, len(page)), random_state=int(rng.integers(1 << 31))).astype(object)
+    updated['Vendor'] = rng.choice(np.array(VENDORS, dtype=object), len(updated))
+    updated['Total Harga'] = rng.integers(1, 1000, len(updated)).astype(float)
+    deleted = [row_id for row_id in page.index[:2] if row_id not in updated.index]
+    store.apply_edits(updated, synthetic_batch(2, rng), deleted)
+    return action
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--steps', type=int, default=50, help="Operasi acak yang diperiksa")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        store = AssetStore('bench_assets', COLUMNS_7, os.path.join(directory, 'assets.sqlite'))
+        start = time.perf_counter()
+        for offset in range(0, args.rows, 100_000):
+            store.append(synthetic_batch(min(100_000, args.rows - offset), rng))
+        print(f"isi {args.rows} baris (dengan trigger agregat): {time.perf_counter() - start:6.1f} s")
+
+        mismatches = 0
+        for _ in range(args.steps):
+            random_step(store, rng)
+            if not same_summary(store.aggregates(), summarize_frame(store.frame())):
+                mismatches += 1
+        print(f"{args.steps} operasi acak, agregat beda dari hitung penuh: {mismatches}")
+
+        # Instance lain pada file yang sama (mis. ingest batch headless) menulis
+        store.aggregates()
+        AssetStore('bench_assets', COLUMNS_7, store.path).append(synthetic_batch(2, rng))
+        seen = same_summary(store.aggregates(), summarize_frame(store.frame())) and len(store.frame()) == store.count()
+        print(f"tulisan dari instance lain terlihat: {'ok' if seen else 'BEDA'}")
+
+        # Laporan setelah satu simpan: versi berubah sehingga keduanya membaca ulang
+        store.append(synthetic_batch(20, rng))
+        start = time.perf_counter()
+        summary = store.aggregates()
+        running_seconds = time.perf_counter() - start
+
+        store.append(synthetic_batch(20, rng))
+        start = time.perf_counter()
+        summarize_frame(store.frame())
+        full_seconds = time.perf_counter() - start
+
+        groups = sum(len(summary[dimension]) for dimension in ('vendor', 'unit', 'month'))
+        print(f"laporan dari agregat    : {running_seconds * 1000:8.1f} ms ({groups} grup)")
+        print(f"laporan dari hitung penuh: {full_seconds * 1000:8.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Bandingkan "Simpan ke Tabel Permanen" lama (pd.concat ke seluruh asset_table
+di session state) dengan `AssetStore.append`, waktu membuka aplikasi (count +
+halaman pertama) pada store kosong vs store berisi banyak baris, serta satu
+halaman hasil filter/pencarian/urutan di SQLite vs memfilter seluruh tabel.
+
+Contoh:
+    python -m benchmarks.asset_store --history 1000000 --saves 200 --batch 20
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from asset_ocr.asset_store import AssetStore
+from asset_ocr.schema import COLUMNS_7
+
+COLUMNS = list(COLUMNS_7)
+
+
+def synthetic_batch(rows, rng):
+    quantity = rng.integers(1, 20, rows).astype(float)
+    price = rng.integers(500, 500000, rows).astype(float)
+    return pd.DataFrame({
+        'Tanggal Beli': '2023-10-15',
+        'Nama Item': rng.choice(['Oreo Vanilla', 'Semen Tiga Roda', 'Paku 2 inch'], rows),
+        'Quantity': quantity,
+        'Jenis Satuan': rng.choice(['pcs', 'kg', 'meter'], rows),
+        'Harga': price,
+        'Total Harga': quantity * price,
+        'Vendor': rng.choice(['Toko Maju', 'Depo Bangunan'], rows),
+    })
+
+
+def open_app(path):
+    start = time.perf_counter()
+    store = AssetStore('bench_assets', COLUMNS, path)
+    store.count()
+    store.page(limit=100, descending=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--history', type=int, default=1_000_000, help="Baris historis di store")
+    parser.add_argument('--saves', type=int, default=200, help="Jumlah penyimpanan dalam satu sesi")
+    parser.add_argument('--batch', type=int, default=20, help="Baris per penyimpanan")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    batches = [synthetic_batch(args.batch, rng) for _ in range(args.saves)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        empty_path = os.path.join(directory, 'empty.sqlite')
+        AssetStore('bench_assets', COLUMNS, empty_path)
+        print(f"buka aplikasi, store kosong        : {open_app(empty_path) * 1000:8.1f} ms")
+
+        path = os.path.join(directory, 'assets.sqlite')
+        store = AssetStore('bench_assets', COLUMNS, path)
+        start = time.perf_counter()
+        for offset in range(0, args.history, 100_000):
+            store.append(synthetic_batch(min(100_000, args.history - offset), rng))
+        print(f"isi {args.history} baris historis        : {time.perf_counter() - start:8.1f} s")
+        print(f"buka aplikasi, {args.history} baris     : {open_app(path) * 1000:8.1f} ms")
+
+        # Satu halaman: vendor tertentu, cari "semen", urut Total Harga menurun
+        start = time.perf_counter()
+        store.count(search='semen', filters={'Vendor': 'Toko Maju'})
+        store.page(offset=100, limit=100, search='semen', filters={'Vendor': 'Toko Maju'},
+                   sort='Total Harga', descending=True)
+        page_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        full = AssetStore('bench_assets', COLUMNS, path).frame()
+        matched = full[(full['Vendor'] == 'Toko Maju') & full['Nama Item'].str.contains('semen', case=False)]
+        matched.sort_values('Total Harga', ascending=False).iloc[100:200]
+        full_seconds = time.perf_counter() - start
+        print(f"halaman terfilter, SQLite          : {page_seconds * 1000:8.1f} ms")
+        print(f"halaman terfilter, seluruh tabel   : {full_seconds * 1000:8.1f} ms")
+
+        # Sesi lama: setiap simpan menyalin seluruh tabel yang sudah dimuat
+        asset_table = store.frame()
+        start = time.perf_counter()
+        for batch in batches:
+            asset_table = pd.concat([asset_table, batch], ignore_index=True)
+        concat_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for batch in batches:
+            store.append(batch)
+        append_seconds = time.perf_counter() - start
+
+    print(f"{args.saves} simpan x {args.batch} baris, pd.concat : {concat_seconds * 1000:8.1f} ms")
+    print(f"{args.saves} simpan x {args.batch} baris, append    : {append_seconds * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
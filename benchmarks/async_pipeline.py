@@ -0,0 +1,59 @@
+"""
+Jalankan pipeline asyncio secara headless dan bandingkan dengan pemrosesan
+berurutan. Tanpa --live, model diganti FakeGenerativeModel dengan latensi
+simulasi sehingga bisa dijalankan tanpa jaringan.
+
+Contoh:
+    python -m benchmarks.async_pipeline fixtures/struk --latency 0.8 --concurrency 8
+    GEMINI_API_KEY=... python -m benchmarks.async_pipeline fixtures/struk --live
+"""
+import argparse
+import os
+import time
+
+from PIL import Image
+
+from asset_ocr.async_pipeline import AsyncReceiptPipeline, run_pipeline
+from asset_ocr.fake_gemini import fake_model_factory
+
+OCR_PROMPT = "Salin seluruh teks pada struk ini."
+ANALYSIS_PROMPT = "Ubah teks berikut menjadi CSV 'Tanggal Beli','Nama Item','Quantity','Harga','Total Harga':\n{text}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('fixtures', help="Direktori berisi gambar struk")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.5, help="Latensi simulasi per panggilan (detik)")
+    parser.add_argument('--live', action='store_true', help="Pakai Gemini sungguhan (butuh GEMINI_API_KEY)")
+    args = parser.parse_args()
+
+    items = []
+    for name in sorted(os.listdir(args.fixtures)):
+        if name.lower().endswith(('.png', '.jpg', '.jpeg')):
+            image = Image.open(os.path.join(args.fixtures, name))
+            image.load()
+            items.append((name, image))
+
+    factory = None if args.live else fake_model_factory(latency=args.latency)
+    api_key = os.getenv('GEMINI_API_KEY', 'offline')
+
+    def progress(done, total, result):
+        status = 'ok' if result.ok else f'gagal: {result.error}'
+        timings = ' '.join(f"{stage}={seconds:.2f}s" for stage, seconds in result.timings.items())
+        print(f"[{done}/{total}] {result.name}: {status} {timings}")
+
+    for concurrency in (1, args.concurrency):
+        pipeline = AsyncReceiptPipeline(
+            api_key, OCR_PROMPT, ANALYSIS_PROMPT,
+            concurrency=concurrency, model_factory=factory
+        )
+        start = time.perf_counter()
+        results = run_pipeline(pipeline, items, progress if concurrency > 1 else None)
+        elapsed = time.perf_counter() - start
+        ok = sum(result.ok for result in results)
+        print(f"concurrency={concurrency}: {elapsed:.2f} s untuk {len(items)} struk ({ok} berhasil)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Jalankan ingest headless terhadap struk sintetis dengan model palsu: ukur
+throughput per tingkat paralelisme, lalu periksa lanjutan dari checkpoint
+(run dipotong dengan --limit, sisa tulisan batch yang tidak tercatat
+disimulasikan, lalu dilanjutkan) untuk setiap format keluaran, termasuk run
+yang terputus sebelum checkpoint batch pertama tercatat.
+
+Contoh:
+    python -m benchmarks.batch_ingest --images 200 --latency 0.2 --concurrency 1 4 16
+"""
+import argparse
+import os
+import tarfile
+import tempfile
+import time
+
+import pandas as pd
+from PIL import Image, ImageDraw
+
+from asset_ocr.analysis_parser import parse_many
+from asset_ocr.batch_ingest import IngestCheckpoint, build_pipeline, default_checkpoint_path, ingest, make_sink
+from asset_ocr.fake_gemini import SAMPLE_ANALYSIS_CSV_7, fake_model_factory
+from asset_ocr.request_scheduler import RequestScheduler
+from asset_ocr.schema import COLUMNS_7, coerce_frame
+
+ROWS_PER_IMAGE = 2
+
+
+def make_fixtures(directory, images):
+    source = os.path.join(directory, 'struk')
+    os.makedirs(source)
+    for index in range(images):
+        image = Image.new('RGB', (600, 800), 'white')
+        ImageDraw.Draw(image).text((20, 20), f"STRUK {index}", fill='black')
+        image.save(os.path.join(source, f"struk_{index:05d}.jpg"))
+    tarball = os.path.join(directory, 'struk.tar.gz')
+    with tarfile.open(tarball, 'w:gz') as archive:
+        archive.add(source, arcname='struk')
+    return source, tarball
+
+
+def run(source, output, fmt, concurrency, latency, batch_size, limit=None):
+    scheduler = RequestScheduler(requests_per_minute=1_000_000, max_concurrent=concurrency)
+    pipeline = build_pipeline(
+        'offline', 'two_stage', concurrency,
+        model_factory=fake_model_factory(latency=latency), scheduler=scheduler
+    )
+    sink = make_sink(output, fmt)
+    checkpoint = IngestCheckpoint(default_checkpoint_path(output, fmt))
+    try:
+        return ingest(source, sink, checkpoint, pipeline, batch_size=batch_size, limit=limit)
+    finally:
+        sink.close()
+        checkpoint.close()
+
+
+def read_rows(output, fmt):
+    if fmt == 'csv':
+        return len(pd.read_csv(output))
+    if fmt == 'parquet':
+        return len(pd.read_parquet(output))
+    import sqlite3
+    with sqlite3.connect(output) as conn:
+        return conn.execute("SELECT COUNT(*) FROM main_ocr2_assets").fetchone()[0]
+
+
+def simulate_crash(output, fmt):
+    """
+    Tulisan batch yang terputus sebelum checkpoint dicatat
+    """
+    if fmt == 'csv':
+        with open(output, 'a') as handle:
+            handle.write("2023-10-15,Batch terputus,1.0,pcs,1000.0,1000.0,Toko\n")
+    elif fmt == 'parquet':
+        parts = sorted(os.listdir(output))
+        with open(os.path.join(output, parts[0]), 'rb') as handle:
+            data = handle.read()
+        with open(os.path.join(output, 'part-99999.parquet'), 'wb') as handle:
+            handle.write(data)
+    # SQLite: batch dan checkpoint satu transaksi, tidak ada sisa tulisan
+
+
+def interrupt_first_batch(tarball, output, fmt):
+    """
+    Batch pertama sudah ditulis ke keluaran, tetapi proses berhenti sebelum
+    checkpoint-nya tercatat
+    """
+    run(tarball, output, fmt, 1, 0.0, 1, limit=0)
+    sink = make_sink(output, fmt)
+    frame = coerce_frame(parse_many([SAMPLE_ANALYSIS_CSV_7], COLUMNS_7), COLUMNS_7)
+    sink.write(frame, lambda marker, conn=None: None)
+    sink.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--images', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.2, help="Latensi simulasi per panggilan (detik)")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source, tarball = make_fixtures(directory, args.images)
+
+        for concurrency in args.concurrency:
+            output = os.path.join(directory, f"throughput_{concurrency}.csv")
+            start = time.perf_counter()
+            summary = run(source, output, 'csv', concurrency, args.latency, args.batch_size)
+            elapsed = time.perf_counter() - start
+            print(f"concurrency={concurrency:3d}: {elapsed:6.2f} s, {summary['ok'] / elapsed:6.1f} gambar/s")
+
+        expected = args.images * ROWS_PER_IMAGE
+        for fmt, extension in (('csv', '.csv'), ('parquet', '.parquet'), ('sqlite', '.sqlite')):
+            output = os.path.join(directory, f"resume{extension}")
+            run(tarball, output, fmt, 8, 0.0, args.batch_size, limit=args.images // 3)
+            simulate_crash(output, fmt)
+            summary = run(tarball, output, fmt, 8, 0.0, args.batch_size)
+            rows = read_rows(output, fmt)
+            status = 'ok' if rows == expected == summary['rows'] else 'BEDA'
+            print(f"lanjut dari checkpoint {fmt:8s}: {rows} baris (harapan {expected}) {status}")
+
+        # SQLite tidak perlu: batch dan checkpoint satu transaksi
+        for fmt, extension in (('csv', '.csv'), ('parquet', '.parquet')):
+            output = os.path.join(directory, f"first{extension}")
+            interrupt_first_batch(tarball, output, fmt)
+            summary = run(tarball, output, fmt, 8, 0.0, args.batch_size)
+            rows = read_rows(output, fmt)
+            status = 'ok' if rows == expected == summary['rows'] else 'BEDA'
+            print(f"terputus di batch pertama {fmt:8s}: {rows} baris (harapan {expected}) {status}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+Bandingkan penerapan edit tabel sementara: mengganti seluruh tabel dengan
+DataFrame hasil st.data_editor setiap rerun (perilaku lama) vs menerapkan
+change set editor (`edited_rows`/`added_rows`/`deleted_rows`) per baris,
+serta `AssetStore.apply_edits` + `undo` untuk tabel permanen. Urutan edit ->
+tambah batch -> undo pada tabel sementara juga diperiksa, begitu pula undo
+hapus setelah ada baris baru dan penolakan undo yang bertabrakan di store.
+
+Contoh:
+    python -m benchmarks.editor_delta --rows 100000 --edits 10
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from asset_ocr.asset_store import AssetStore
+from asset_ocr.editor_delta import editor_delta
+from asset_ocr.errors import EditConflictError
+from asset_ocr.schema import COLUMNS_7, editable_frame
+from asset_ocr.table_builder import TableBuilder
+
+
+def synthetic_frame(rows, rng):
+    quantity = rng.integers(1, 20, rows).astype(float)
+    price = rng.integers(500, 500000, rows).astype(float)
+    return pd.DataFrame({
+        'Tanggal Beli': '2023-10-15',
+        'Nama Item': rng.choice(['Oreo Vanilla', 'Semen Tiga Roda', 'Paku 2 inch'], rows),
+        'Quantity': quantity,
+        'Jenis Satuan': rng.choice(['pcs', 'kg', 'meter'], rows),
+        'Harga': price,
+        'Total Harga': quantity * price,
+        'Vendor': rng.choice(['Toko Maju', 'Depo Bangunan'], rows),
+    })
+
+
+def editor_state(rows, edits, rng):
+    positions = rng.choice(rows, edits, replace=False)
+    return {
+        'edited_rows': {int(position): {'Vendor': 'Mitra 10', 'Harga': 1000.0} for position in positions},
+        'added_rows': [{'Nama Item': 'Kabel NYM', 'Quantity': 2, 'Harga': 5000.0, 'Total Harga': 10000.0}],
+        'deleted_rows': [int(rng.integers(rows))],
+    }
+
+
+def check_undo_after_append(rng):
+    """
+    Edit lalu tambah batch OCR: riwayat undo berbasis posisi harus dikosongkan
+    """
+    builder = TableBuilder(COLUMNS_7)
+    builder.append_frame(synthetic_frame(3, rng))
+    page = editable_frame(builder.to_frame())
+    builder.apply_edits(*editor_delta(page, {'added_rows': [{'Nama Item': 'B'}], 'deleted_rows': [0]}, COLUMNS_7))
+    builder.append_frame(synthetic_frame(1, rng).assign(**{'Nama Item': 'C'}))
+    expected = builder.to_frame().copy()
+    undone = builder.undo()
+    return not undone and not builder.can_undo and builder.to_frame().equals(expected)
+
+
+def check_store_undo(store, rng):
+    """
+    Undo hapus baris terakhir setelah edit lain menambah baris, lalu undo yang
+    barisnya sudah diubah lagi oleh edit berikutnya harus ditolak
+    """
+    last_id = int(store.tail(1).index[-1])
+    rows = store.count()
+    deleted = store.apply_edits(deleted=[last_id])
+    store.apply_edits(added=synthetic_frame(1, rng))
+    store.undo(deleted)
+    restored = store.count() == rows + 1 and last_id in store.tail(2).index
+
+    row = store.tail(1)
+    first = store.apply_edits(updated=row.assign(Harga=1.0))
+    store.apply_edits(updated=row.assign(Harga=2.0))
+    try:
+        store.undo(first)
+        return False
+    except EditConflictError:
+        return restored and float(store.tail(1)['Harga'].iloc[-1]) == 2.0
+
+
+def check_clear_keeps_ids(store, rng):
+    """
+    Setelah `clear`, edit_id dan id baris tetap naik dan edit lama ditolak
+    """
+    last_id = int(store.tail(1).index[-1])
+    old = store.apply_edits(updated=store.tail(1).assign(Harga=3.0))
+    store.clear()
+    store.append(synthetic_frame(1, rng))
+    new = store.apply_edits(updated=store.tail(1).assign(Harga=4.0))
+    monotonic = new > old and int(store.tail(1).index[-1]) > last_id
+    try:
+        store.undo(old)
+        return False
+    except EditConflictError:
+        return monotonic and store.undoable([old, new]) == [new] and store.undo(new) == new
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--edits', type=int, default=10, help="Sel yang diedit per rerun")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    frame = synthetic_frame(args.rows, rng)
+    state = editor_state(args.rows, args.edits, rng)
+
+    builder = TableBuilder(COLUMNS_7)
+    builder.append_frame(frame)
+    page = editable_frame(builder.to_frame())
+
+    # Lama: DataFrame hasil editor (seluruh tabel) ditulis balik setiap rerun
+    start = time.perf_counter()
+    returned = page.astype(object)
+    for position, values in state['edited_rows'].items():
+        for column, value in values.items():
+            returned.iat[position, returned.columns.get_loc(column)] = value
+    returned = returned.drop(index=state['deleted_rows'])
+    returned = pd.concat([returned, pd.DataFrame(state['added_rows'])], ignore_index=True)
+    builder.replace(returned)
+    builder.to_frame()
+    replace_seconds = time.perf_counter() - start
+
+    builder = TableBuilder(COLUMNS_7)
+    builder.append_frame(frame)
+    page = editable_frame(builder.to_frame())
+    start = time.perf_counter()
+    builder.apply_edits(*editor_delta(page, state, COLUMNS_7))
+    delta_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    builder.undo()
+    undo_seconds = time.perf_counter() - start
+
+    print(f"{args.rows} baris, {args.edits} baris diedit + 1 tambah + 1 hapus")
+    print(f"tabel sementara, ganti seluruh tabel : {replace_seconds * 1000:8.1f} ms")
+    print(f"tabel sementara, change set          : {delta_seconds * 1000:8.1f} ms (undo {undo_seconds * 1000:.1f} ms)")
+    print(f"tabel sementara, edit -> tambah -> undo: {'ok' if check_undo_after_append(rng) else 'BEDA'}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = AssetStore('bench_assets', COLUMNS_7, os.path.join(directory, 'assets.sqlite'))
+        store.append(frame)
+        page = editable_frame(store.page(limit=100))
+        page_state = editor_state(len(page), min(args.edits, len(page)), rng)
+
+        start = time.perf_counter()
+        store.apply_edits(*editor_delta(page, page_state, COLUMNS_7))
+        apply_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.undo()
+        store_undo_seconds = time.perf_counter() - start
+        store_check = check_store_undo(store, rng)
+        clear_check = check_clear_keeps_ids(store, rng)
+
+    print(f"tabel permanen, apply_edits          : {apply_seconds * 1000:8.1f} ms (undo {store_undo_seconds * 1000:.1f} ms)")
+    print(f"tabel permanen, undo hapus/tabrakan  : {'ok' if store_check else 'BEDA'}")
+    print(f"tabel permanen, clear -> undo lama    : {'ok' if clear_check else 'BEDA'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Ukur ekspor tabel permanen per format: waktu, ukuran hasil, dan puncak memori
+Python (tracemalloc). Cara lama (`asset_store.frame()` lalu `to_csv`/`to_excel`
+sekaligus) dibandingkan dengan `ExportJob` yang membaca store per potongan
+dan menulis ke buffer sementara. Hasil tiap format dibaca kembali untuk
+memastikan jumlah barisnya sama.
+
+Contoh:
+    python -m benchmarks.export --rows 1000000 --formats csv csv.gz parquet xlsx
+"""
+import argparse
+import gc
+import gzip
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+import numpy as np
+
+from asset_ocr.asset_store import AssetStore
+from asset_ocr.export import EXCEL_MAX_ROWS, ExportJob, available_formats
+from asset_ocr.schema import COLUMNS_7
+
+from benchmarks.asset_aggregates import synthetic_batch
+
+
+def traced(run):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = run()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def legacy_export(store, fmt):
+    """
+    Cara lama: seluruh tabel dimuat lalu ditulis sekaligus
+    """
+    buffer = io.BytesIO()
+    frame = store.frame()
+    if fmt == 'xlsx':
+        frame.to_excel(buffer, index=False)
+    else:
+        frame.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+
+def job_export(store, fmt, chunk_rows):
+    job = ExportJob(store, fmt, chunk_rows=chunk_rows).start()
+    job.wait()
+    if job.error:
+        raise job.error
+    data = job.data()
+    job.close()
+    return data
+
+
+def count_rows(data, fmt):
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(io.BytesIO(data)).metadata.num_rows
+    if fmt == 'xlsx':
+        # Hitung elemen <row> di XML tiap sheet, tanpa memuat workbook
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            sheets = [name for name in archive.namelist() if name.startswith('xl/worksheets/sheet')]
+            return sum(archive.read(name).count(b'<row ') - 1 for name in sheets)
+    if fmt == 'csv.gz':
+        data = gzip.decompress(data)
+    return data.count(b'\n') - 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--chunk-rows', type=int, default=50_000)
+    parser.add_argument('--formats', nargs='+', default=available_formats())
+    parser.add_argument('--legacy', nargs='*', default=['csv'],
+                        help="Format yang juga diukur dengan cara lama (csv, xlsx)")
+    parser.add_argument('--verify', action='store_true', help="Baca ulang hasil dan hitung barisnya")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        store = AssetStore('bench_assets', COLUMNS_7, os.path.join(directory, 'assets.sqlite'))
+        for offset in range(0, args.rows, 100_000):
+            store.append(synthetic_batch(min(100_000, args.rows - offset), rng))
+        print(f"{args.rows} baris, potongan {args.chunk_rows}"
+              + (f" (xlsx: {-(-args.rows // (EXCEL_MAX_ROWS - 1))} sheet)" if 'xlsx' in args.formats else ""))
+
+        runs = [('lama', fmt, lambda fmt=fmt: legacy_export(store, fmt)) for fmt in args.legacy]
+        runs += [
+            ('ExportJob', fmt, lambda fmt=fmt: job_export(store, fmt, args.chunk_rows))
+            for fmt in args.formats
+        ]
+        for name, fmt, run in runs:
+            data, seconds, peak = traced(run)
+            line = (f"{name:9s} {fmt:8s}: {seconds:7.1f} s, puncak {peak / 1024 / 1024:8.1f} MB, "
+                    f"hasil {len(data) / 1024 / 1024:7.1f} MB")
+            if args.verify:
+                line += f", {count_rows(data, fmt)} baris"
+            print(line)
+            del data
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Bandingkan latensi dan pemakaian token: dua tahap (OCR -> analisis CSV)
+versus satu tahap (gambar -> JSON terstruktur).
+
+Contoh:
+    GEMINI_API_KEY=... python -m benchmarks.extraction_modes fixtures/struk --app main_ocr2
+"""
+import argparse
+import importlib
+import os
+import statistics
+import time
+
+import google.generativeai as genai
+from PIL import Image
+
+_USAGE = []
+_original_generate_content = genai.GenerativeModel.generate_content
+
+
+def _recording_generate_content(self, *args, **kwargs):
+    response = _original_generate_content(self, *args, **kwargs)
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None:
+        _USAGE.append((usage.prompt_token_count, usage.candidates_token_count))
+    return response
+
+
+def _measure(fn):
+    _USAGE.clear()
+    start = time.perf_counter()
+    ok = fn()
+    elapsed = time.perf_counter() - start
+    prompt_tokens = sum(usage[0] for usage in _USAGE)
+    output_tokens = sum(usage[1] for usage in _USAGE)
+    return elapsed, prompt_tokens, output_tokens, len(_USAGE), bool(ok)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('fixtures', help="Direktori berisi gambar struk")
+    parser.add_argument('--app', choices=['main4', 'main_ocr2'], default='main_ocr2')
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    api_key = os.environ['GEMINI_API_KEY']
+    app = importlib.import_module(args.app)
+    genai.GenerativeModel.generate_content = _recording_generate_content
+
+    images = [
+        os.path.join(args.fixtures, name)
+        for name in sorted(os.listdir(args.fixtures))
+        if name.lower().endswith(('.png', '.jpg', '.jpeg'))
+    ]
+
+    def two_stage(image):
+        text = app.OCRService.perform_ocr(image, api_key)
+        return text and app.AIAnalysisService.analyze_ocr_text(text, api_key)
+
+    def one_shot(image):
+        return app.StructuredExtractionService.extract(image, api_key)
+
+    results = {'two_stage': [], 'one_shot': []}
+    for path in images:
+        image = Image.open(path)
+        image.load()
+        for _ in range(args.repeat):
+            results['two_stage'].append(_measure(lambda: two_stage(image)))
+            results['one_shot'].append(_measure(lambda: one_shot(image)))
+
+    print(f"{'mode':<10} {'n':>3} {'p50 s':>8} {'mean s':>8} {'calls':>6} {'in tok':>8} {'out tok':>8} {'ok':>4}")
+    for mode, rows in results.items():
+        if not rows:
+            continue
+        latencies = [row[0] for row in rows]
+        print(
+            f"{mode:<10} {len(rows):>3} {statistics.median(latencies):>8.2f} "
+            f"{statistics.mean(latencies):>8.2f} "
+            f"{statistics.mean(row[3] for row in rows):>6.1f} "
+            f"{statistics.mean(row[1] for row in rows):>8.0f} "
+            f"{statistics.mean(row[2] for row in rows):>8.0f} "
+            f"{sum(row[4] for row in rows):>4}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Microbenchmark overhead per request: konfigurasi global + model baru (cara
+lama) versus model dari `asset_ocr.gemini_client` yang di-cache.
+
+Tidak memanggil jaringan; yang diukur hanya penyiapan model dan client gRPC
+(setiap `genai.configure` membuang client default sehingga channel dibuat ulang).
+
+Contoh:
+    python -m benchmarks.gemini_client --iterations 2000
+"""
+import argparse
+import time
+
+import google.generativeai as genai
+from google.generativeai import client as genai_client
+
+from asset_ocr import gemini_client
+
+API_KEY = 'benchmark-dummy-key'
+
+
+def legacy_setup():
+    genai.configure(api_key=API_KEY)
+    model = genai.GenerativeModel('gemini-1.5-flash')
+    # generate_content membuat client default di panggilan pertama setelah configure
+    model._client = genai_client.get_default_generative_client()
+    return model
+
+
+def cached_setup():
+    return gemini_client.get_model(API_KEY, 'gemini-1.5-flash')
+
+
+def measure(fn, iterations):
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=1000)
+    args = parser.parse_args()
+
+    legacy = measure(legacy_setup, args.iterations)
+    cached = measure(cached_setup, args.iterations)
+    print(f"configure + GenerativeModel : {legacy * 1e6:>10.1f} µs/request")
+    print(f"gemini_client.get_model     : {cached * 1e6:>10.1f} µs/request")
+    print(f"overhead dihapus            : {(legacy - cached) * 1e6:>10.1f} µs/request ({legacy / cached:.0f}x)")
+    print(gemini_client.stats())
+    gemini_client.close_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Bandingkan throughput dan latensi engine OCR pada gambar fixture yang sama.
+
+Contoh:
+    python -m benchmarks.ocr_engines fixtures/struk --engines mock tesseract easyocr
+    GEMINI_API_KEY=... python -m benchmarks.ocr_engines fixtures/struk --engines easyocr gemini --workers 4
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from asset_ocr.ocr_engines import ENGINE_REGISTRY, get_engine
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('fixtures', help="Direktori berisi gambar struk")
+    parser.add_argument('--engines', nargs='+', choices=sorted(ENGINE_REGISTRY), default=['mock', 'tesseract', 'easyocr'])
+    parser.add_argument('--workers', type=int, default=1, help="Jumlah thread per engine")
+    parser.add_argument('--warmup', type=int, default=1, help="Jumlah gambar pemanasan (tidak diukur)")
+    args = parser.parse_args()
+
+    images = []
+    for name in sorted(os.listdir(args.fixtures)):
+        if name.lower().endswith(('.png', '.jpg', '.jpeg')):
+            image = Image.open(os.path.join(args.fixtures, name))
+            image.load()
+            images.append(image)
+
+    print(f"{'engine':<10} {'img/s':>7} {'p50 s':>7} {'p95 s':>7} {'conf':>5} {'chars':>7} {'err':>4}")
+    for name in args.engines:
+        engine = get_engine(name)
+        for image in images[:args.warmup]:
+            try:
+                engine.perform_ocr(image)
+            except Exception:
+                pass
+
+        def run(image):
+            try:
+                return engine.perform_ocr(image)
+            except Exception as e:
+                return e
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            results = list(executor.map(run, images))
+        wall = time.perf_counter() - start
+
+        ok = [result for result in results if not isinstance(result, Exception)]
+        latencies = [result.seconds for result in ok] or [float('nan')]
+        confidences = [result.confidence for result in ok if result.confidence is not None]
+        print(
+            f"{name:<10} {len(ok) / wall:>7.2f} {statistics.median(latencies):>7.2f} "
+            f"{percentile(latencies, 0.95):>7.2f} "
+            f"{statistics.mean(confidences) if confidences else float('nan'):>5.2f} "
+            f"{statistics.mean(len(result.text) for result in ok) if ok else 0:>7.0f} "
+            f"{len(results) - len(ok):>4}"
+        )
+
+
+if __name__ == '__main__':
+    main()
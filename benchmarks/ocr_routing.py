@@ -0,0 +1,51 @@
+"""
+Jalankan router OCR bertingkat pada fixture dan laporkan porsi struk yang
+selesai di engine lokal (tanpa jaringan) serta latensi per tingkat.
+
+Contoh:
+    GEMINI_API_KEY=... python -m benchmarks.ocr_routing fixtures/struk --threshold 0.6
+    python -m benchmarks.ocr_routing fixtures/struk --tiers tesseract mock
+"""
+import argparse
+import json
+import logging
+import os
+
+from PIL import Image
+
+from asset_ocr.ocr_router import COLUMNS_5, COLUMNS_7, DEFAULT_THRESHOLD, CascadingOCRRouter, RoutingStats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('fixtures', help="Direktori berisi gambar struk")
+    parser.add_argument('--tiers', nargs='+', default=['tesseract', 'easyocr', 'gemini'])
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--columns', type=int, choices=[5, 7], default=5)
+    parser.add_argument('--verbose', action='store_true', help="Tampilkan log keputusan routing")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    stats = RoutingStats()
+    router = CascadingOCRRouter(
+        tiers=args.tiers,
+        threshold=args.threshold,
+        columns=COLUMNS_7 if args.columns == 7 else COLUMNS_5,
+        stats=stats,
+    )
+
+    for name in sorted(os.listdir(args.fixtures)):
+        if not name.lower().endswith(('.png', '.jpg', '.jpeg')):
+            continue
+        try:
+            result = router.perform_ocr(Image.open(os.path.join(args.fixtures, name)))
+            print(f"{name:<30} -> {result.engine}")
+        except Exception as e:
+            print(f"{name:<30} -> gagal: {e}")
+
+    print(json.dumps(stats.report(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Ukur waktu setiap tahap pra-pemrosesan OpenCV dan dampaknya pada EasyOCR.
+
+Contoh:
+    python -m benchmarks.preprocessing fixtures/struk
+    python -m benchmarks.preprocessing fixtures/struk --engine-steps tesseract --no-ocr
+"""
+import argparse
+import os
+import statistics
+import time
+from collections import defaultdict
+
+import numpy as np
+from PIL import Image
+
+from asset_ocr.image_preprocessing import ENGINE_PREPROCESS_STEPS, ReceiptPreprocessor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('fixtures', help="Direktori berisi gambar struk")
+    parser.add_argument('--engine-steps', choices=sorted(ENGINE_PREPROCESS_STEPS), default='easyocr')
+    parser.add_argument('--no-ocr', action='store_true', help="Hanya ukur tahap pra-pemrosesan")
+    args = parser.parse_args()
+
+    paths = [
+        os.path.join(args.fixtures, name)
+        for name in sorted(os.listdir(args.fixtures))
+        if name.lower().endswith(('.png', '.jpg', '.jpeg'))
+    ]
+    arrays = [np.asarray(Image.open(path).convert('RGB')) for path in paths]
+    preprocessor = ReceiptPreprocessor(ENGINE_PREPROCESS_STEPS[args.engine_steps])
+
+    stage_times = defaultdict(list)
+    processed = []
+    for array in arrays:
+        result, timings = preprocessor.run(array)
+        processed.append(result)
+        for stage, seconds in timings.items():
+            stage_times[stage].append(seconds)
+
+    print(f"Langkah: {preprocessor.signature()}")
+    print(f"{'tahap':<10} {'mean ms':>8} {'max ms':>8}")
+    for stage, seconds in stage_times.items():
+        print(f"{stage:<10} {statistics.mean(seconds) * 1000:>8.1f} {max(seconds) * 1000:>8.1f}")
+
+    pixels_before = sum(array.shape[0] * array.shape[1] for array in arrays)
+    pixels_after = sum(array.shape[0] * array.shape[1] for array in processed)
+    print(f"Piksel: {pixels_before:,} -> {pixels_after:,} ({pixels_after / pixels_before:.2f}x)")
+
+    if args.no_ocr:
+        return
+
+    from asset_ocr.reader_pool import get_reader_pool
+
+    pool = get_reader_pool()
+    pool.warm()
+    with pool.reader() as reader:
+        for label, inputs in (('mentah', arrays), ('diproses', processed)):
+            start = time.perf_counter()
+            boxes = sum(len(reader.readtext(array)) for array in inputs)
+            elapsed = time.perf_counter() - start
+            print(f"EasyOCR {label:<9} {elapsed:>7.2f} s total, {elapsed / len(inputs):>6.2f} s/gambar, {boxes} kotak teks")
+
+
+if __name__ == '__main__':
+    main()
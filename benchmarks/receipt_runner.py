@@ -0,0 +1,142 @@
+"""
+Jalankan pemrosesan struk bersama (`asset_ocr.receipt_runner`) untuk prompt
+main4 dan main_ocr2 dengan model palsu: batch thread pool, batch asyncio,
+dan streaming harus menghasilkan baris yang sama. Batch kedua dengan cache
+yang sama harus memakai baris dari cache tanpa memanggil model. Stream yang
+putus di tengah tidak boleh menghasilkan baris maupun entri cache.
+
+Contoh:
+    python -m benchmarks.receipt_runner --receipts 16 --latency 0.02
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+from PIL import Image
+
+from asset_ocr import gemini_client, services
+from asset_ocr.fake_gemini import FakeGenerativeModel, fake_model_factory, json_responder
+from asset_ocr.prompts import MAIN4_PROMPTS, MAIN_OCR2_PROMPTS
+from asset_ocr.receipt_runner import AsyncReceiptBatch, cache_key, load_image, run_batch, stream_receipt
+from asset_ocr.request_scheduler import get_scheduler
+from asset_ocr.result_cache import OCRResultCache, cached_rows
+
+API_KEY = 'offline'
+
+
+class BrokenStreamModel(FakeGenerativeModel):
+    """
+    Stream yang putus setelah potongan pertama
+    """
+    def generate_content(self, contents, stream=False, **kwargs):
+        response = super().generate_content(contents, stream=stream, **kwargs)
+        if not stream:
+            return response
+
+        def chunks():
+            iterator = iter(response)
+            yield next(iterator)
+            raise ConnectionError("stream terputus")
+        return chunks()
+
+
+class OfflineModel(FakeGenerativeModel):
+    """
+    Model yang tidak boleh dipanggil (semua hasil harus datang dari cache)
+    """
+    def generate_content(self, contents, stream=False, **kwargs):
+        raise ConnectionError("model dipanggil padahal struk ada di cache")
+
+
+def install_models(prompts, latency, model_class=FakeGenerativeModel):
+    json_config = gemini_client._config_key(services._json_config(prompts.response_schema))
+    gemini_client._MODELS[(API_KEY, prompts.model_name, None)] = model_class(latency=latency)
+    gemini_client._MODELS[(API_KEY, prompts.model_name, json_config)] = model_class(
+        latency=latency, responder=json_responder
+    )
+
+
+def encoded_images(count):
+    # Warna berbeda agar setiap gambar punya kunci cache sendiri
+    images = []
+    for index in range(count):
+        buffer = io.BytesIO()
+        Image.new('RGB', (300, 400), (index % 256, index // 256, 0)).save(buffer, format='PNG')
+        images.append((f"struk_{index}.png", buffer.getvalue()))
+    return images
+
+
+def uploads(images):
+    # Seperti file unggahan Streamlit: objek file baru setiap run
+    return [(name, io.BytesIO(data)) for name, data in images]
+
+
+def check(prompts, mode, count, latency, directory):
+    install_models(prompts, latency)
+    images = encoded_images(count)
+
+    cache = OCRResultCache(os.path.join(directory, f"{prompts.version}-{mode}-batch.sqlite"))
+    start = time.perf_counter()
+    results = run_batch(prompts, uploads(images), API_KEY, mode, max_workers=4, cache=cache)
+    batch_seconds = time.perf_counter() - start
+    batch_rows = sum(len(result.output) for result in results if result.ok)
+
+    cache = OCRResultCache(os.path.join(directory, f"{prompts.version}-{mode}-async.sqlite"))
+    start = time.perf_counter()
+    batch = AsyncReceiptBatch(
+        prompts, uploads(images), API_KEY, mode, concurrency=4, cache=cache,
+        model_factory=fake_model_factory(latency, json_responder) if mode == 'one_shot' else fake_model_factory(latency)
+    ).start()
+    batch.run.wait()
+    frame, failures = batch.finish()
+    async_seconds = time.perf_counter() - start
+
+    cache = OCRResultCache(os.path.join(directory, f"{prompts.version}-{mode}-stream.sqlite"))
+    start = time.perf_counter()
+    stream_rows = 0
+    for _, source in uploads(images):
+        result = stream_receipt(prompts, load_image(source), API_KEY, mode, cache=cache)
+        stream_rows += len(result.rows) if result.ok else 0
+    stream_seconds = time.perf_counter() - start
+
+    same = batch_rows == len(frame) == stream_rows and not failures and batch_rows > 0
+    print(f"{prompts.version:12s} {mode:9s}: thread {batch_seconds:5.2f} s, async {async_seconds:5.2f} s, "
+          f"stream {stream_seconds:5.2f} s; {batch_rows} baris -> {'ok' if same else 'BEDA'}")
+
+    # Cache hit: baris tersimpan dipakai langsung, model tidak dipanggil lagi
+    install_models(prompts, latency, OfflineModel)
+    stored = [cached_rows(cache.get(cache_key(prompts, load_image(source), mode)), prompts.columns)
+              for _, source in uploads(images)]
+    cached = run_batch(prompts, uploads(images), API_KEY, mode, max_workers=4, cache=cache)
+    hit_rows = sum(len(result.output) for result in cached if result.ok)
+    reused = all(rows is not None for rows in stored) and hit_rows == stream_rows
+    print(f"{prompts.version:12s} {mode:9s}: cache hit -> {hit_rows} baris dari cache -> {'ok' if reused else 'BEDA'}")
+
+
+def check_broken_stream(prompts, directory):
+    install_models(prompts, 0.0, BrokenStreamModel)
+    cache = OCRResultCache(os.path.join(directory, 'broken.sqlite'))
+    image = load_image(uploads(encoded_images(1))[0][1])
+    result = stream_receipt(prompts, image, API_KEY, 'one_shot', cache=cache)
+    clean = not result.ok and result.rows is None and cache.get(cache_key(prompts, image, 'one_shot')) is None
+    print(f"stream terputus: {type(result.error).__name__}, tanpa baris/cache -> {'ok' if clean else 'BEDA'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--receipts', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.02, help="Latensi simulasi per panggilan (detik)")
+    args = parser.parse_args()
+
+    get_scheduler(API_KEY, requests_per_minute=1_000_000, max_concurrent=16)
+    with tempfile.TemporaryDirectory() as directory:
+        for prompts in (MAIN4_PROMPTS, MAIN_OCR2_PROMPTS):
+            for mode in ('two_stage', 'one_shot'):
+                check(prompts, mode, args.receipts, args.latency, directory)
+        check_broken_stream(MAIN_OCR2_PROMPTS, directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Ukur memori grafik laporan selama banyak rerun dengan tracemalloc: pyplot
+global tanpa menutup figure (perilaku lama `visualize_summary`) vs
+`ChartCache.bar_chart` (Figure OO + cache per hash data). Mode tanpa cache
+menggambar data yang berubah setiap rerun untuk memastikan figure OO memang
+dilepas.
+
+Contoh:
+    python -m benchmarks.report_charts --reruns 1000 --legacy-reruns 50
+"""
+import argparse
+import gc
+import io
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from asset_ocr.report_charts import ChartCache, render_bar_png
+
+
+def vendor_summary(rerun, vendors, changing):
+    values = np.arange(1, vendors + 1, dtype=float) * 1000
+    if changing:
+        values = values + rerun
+    return pd.Series(values, index=[f"Toko {index}" for index in range(vendors)])
+
+
+def legacy_chart(summary):
+    """
+    Salinan visualize_summary lama: pyplot global, figure tidak pernah ditutup
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 5))
+    summary.plot(kind='bar')
+    plt.title('Total Aset per Vendor')
+    plt.xlabel('Vendor')
+    plt.ylabel('Total Harga')
+    plt.tight_layout()
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format='png')
+    buffer.seek(0)
+    return buffer
+
+
+def measure(name, reruns, draw, changing, vendors):
+    # Satu gambar pemanasan agar impor/font cache matplotlib tidak terhitung sebagai pertumbuhan
+    draw(vendor_summary(-1, vendors, True))
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    checkpoints = sorted({max(1, reruns // 10), reruns // 2, reruns})
+    start = time.perf_counter()
+    for rerun in range(1, reruns + 1):
+        draw(vendor_summary(rerun, vendors, changing))
+        if rerun in checkpoints:
+            # Figure yang sudah tidak dirujuk ikut dikumpulkan; yang tersisa memang bocor
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            print(f"{name:<28} rerun {rerun:5d}: +{(current - baseline) / 1e6:8.2f} MB")
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    print(f"{name:<28} {elapsed / reruns * 1000:8.2f} ms/rerun")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reruns', type=int, default=1000)
+    parser.add_argument('--legacy-reruns', type=int, default=50, help="Versi lama bocor dan lambat, jadi dibatasi")
+    parser.add_argument('--vendors', type=int, default=20)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore', message='More than 20 figures')
+    measure("pyplot lama", args.legacy_reruns, legacy_chart, False, args.vendors)
+
+    cache = ChartCache()
+    bar_chart = lambda summary: cache.bar_chart(summary, 'Total Aset per Vendor', 'Vendor', 'Total Harga')
+    measure("ChartCache, data sama", args.reruns, bar_chart, False, args.vendors)
+    print(f"  cache: {cache.stats()}")
+
+    draw = lambda summary: render_bar_png(summary, 'Total Aset per Vendor', 'Vendor', 'Total Harga')
+    measure("Figure OO, data berubah", args.legacy_reruns, draw, True, args.vendors)
+
+
+if __name__ == '__main__':
+    main()
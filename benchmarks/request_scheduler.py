@@ -0,0 +1,93 @@
+"""
+Uji penjadwal kuota terhadap endpoint palsu yang menyuntikkan 429/503 dan
+menegakkan kuota request/menit. Semua request harus berhasil tanpa melewati
+kuota, dan throughput mendekati batas yang dikonfigurasi.
+
+Contoh:
+    python -m benchmarks.request_scheduler --requests 200 --rpm 600 --error-rate 0.1
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asset_ocr.fake_gemini import FakeGenerativeModel, FakeRateLimit
+from asset_ocr.request_scheduler import RequestScheduler, get_scheduler
+
+
+def check_async_slots(max_concurrent=3, calls=20):
+    """
+    `acall` tidak boleh melewati max_concurrent, sama seperti `call`
+    """
+    scheduler = RequestScheduler(requests_per_minute=1_000_000, max_concurrent=max_concurrent)
+    running = peak = 0
+
+    async def one():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def run_all():
+        await asyncio.gather(*(scheduler.acall(one) for _ in range(calls)))
+
+    asyncio.run(run_all())
+    return peak == max_concurrent
+
+
+def check_reconfigure():
+    """
+    Opsi `get_scheduler` untuk key yang sudah punya penjadwal tetap berlaku
+    """
+    get_scheduler('benchmark-reconfigure')
+    scheduler = get_scheduler('benchmark-reconfigure', requests_per_minute=120, max_concurrent=2)
+    return scheduler.requests_per_minute == 120 and scheduler.max_concurrent == 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--rpm', type=int, default=600, help="Kuota endpoint palsu (request/menit)")
+    parser.add_argument('--error-rate', type=float, default=0.1)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--no-scheduler', action='store_true', help="Panggil endpoint langsung (pembanding)")
+    args = parser.parse_args()
+
+    quota = FakeRateLimit(args.rpm)
+    model = FakeGenerativeModel(latency=args.latency, error_rate=args.error_rate, rate_limit=quota, seed=1)
+    # Beri sedikit ruang di bawah kuota endpoint
+    scheduler = RequestScheduler(
+        requests_per_minute=int(args.rpm * 0.9), max_concurrent=args.workers,
+        base_delay=0.05, max_delay=2.0
+    )
+
+    def one(index):
+        prompt = f"permintaan {index}"
+        try:
+            if args.no_scheduler:
+                model.generate_content(prompt)
+            else:
+                scheduler.call(model.generate_content, prompt, estimated_tokens=10)
+            return True
+        except Exception:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        outcomes = list(executor.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    print(f"berhasil {sum(outcomes)}/{args.requests} dalam {elapsed:.2f} s "
+          f"({sum(outcomes) / elapsed * 60:.0f} request/menit, kuota {args.rpm})")
+    print(f"ditolak kuota endpoint: {quota.rejected}, error acak: {model.errors}")
+    if not args.no_scheduler:
+        print(json.dumps(scheduler.stats(), indent=2))
+    print(f"acall menghormati max_concurrent: {'ok' if check_async_slots() else 'BEDA'}")
+    print(f"get_scheduler menerapkan opsi ke penjadwal yang ada: {'ok' if check_reconfigure() else 'BEDA'}")
+
+
+if __name__ == '__main__':
+    main()
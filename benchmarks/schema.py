@@ -0,0 +1,97 @@
+"""
+Bandingkan tabel aset ber-dtype object (perilaku lama `pd.DataFrame(columns=...)`)
+dengan tabel yang dipaksa ke `asset_ocr.schema`: memori per baris dan waktu
+ringkasan ala `ReportGenerator.generate_summary` (groupby vendor dan satuan).
+
+Contoh:
+    python -m benchmarks.schema --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from asset_ocr.schema import COLUMNS_7, STRING_DTYPE, coerce_frame
+from asset_ocr.unit_conversion import normalize_units
+
+ITEMS = [f"Item {index}" for index in range(5000)]
+UNITS = ['pcs', 'kg', 'gram', 'meter', 'cm', 'lusin', 'sak', 'lembar']
+VENDORS = [f"Toko {index}" for index in range(200)]
+
+
+def object_frame(rows, seed):
+    rng = np.random.default_rng(seed)
+    quantity = rng.integers(1, 20, rows).astype(float)
+    price = rng.integers(500, 500000, rows).astype(float)
+    dates = pd.date_range('2023-01-01', periods=365).strftime('%Y-%m-%d').to_numpy(dtype=object)
+    data = {
+        'Tanggal Beli': rng.choice(dates, rows),
+        'Nama Item': rng.choice(np.array(ITEMS, dtype=object), rows),
+        'Quantity': quantity,
+        'Jenis Satuan': rng.choice(np.array(UNITS, dtype=object), rows),
+        'Harga': price,
+        'Total Harga': quantity * price,
+        'Vendor': rng.choice(np.array(VENDORS, dtype=object), rows),
+    }
+    # Semua kolom object, seperti tabel yang dibangun dari pd.DataFrame(columns=[...])
+    return pd.DataFrame(data, columns=list(COLUMNS_7)).astype(object)
+
+
+def summary(frame):
+    """
+    Isi ReportGenerator.generate_summary tanpa Streamlit
+    """
+    total = pd.to_numeric(frame['Total Harga']).sum()
+    vendors = frame.groupby('Vendor', observed=True)['Total Harga'].sum()
+    quantities, units = normalize_units(frame['Quantity'], frame['Jenis Satuan'])
+    satuan = quantities.groupby(units, observed=True).sum()
+    return total, vendors, satuan
+
+
+def timed(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    legacy = object_frame(args.rows, args.seed)
+
+    start = time.perf_counter()
+    typed = coerce_frame(legacy, COLUMNS_7)
+    coerce_seconds = time.perf_counter() - start
+
+    legacy_bytes = legacy.memory_usage(deep=True).sum()
+    typed_bytes = typed.memory_usage(deep=True).sum()
+
+    legacy_seconds, legacy_summary = timed(lambda: summary(legacy), args.repeat)
+    typed_seconds, typed_summary = timed(lambda: summary(typed), args.repeat)
+
+    same = (
+        np.isclose(legacy_summary[0], typed_summary[0])
+        and np.allclose(legacy_summary[1].sort_index().astype(float), typed_summary[1].sort_index())
+        and np.allclose(legacy_summary[2].sort_index().astype(float), typed_summary[2].sort_index())
+    )
+
+    print(f"{args.rows} baris, string: {STRING_DTYPE}")
+    print(f"memori object  : {legacy_bytes / 1e6:8.1f} MB")
+    print(f"memori skema   : {typed_bytes / 1e6:8.1f} MB (coerce {coerce_seconds:.2f} s)")
+    for column in COLUMNS_7:
+        print(f"  {column:<13}: {legacy[column].memory_usage(deep=True, index=False) / 1e6:7.1f} -> "
+              f"{typed[column].memory_usage(deep=True, index=False) / 1e6:6.1f} MB ({typed[column].dtype})")
+    print(f"ringkasan object: {legacy_seconds * 1000:7.1f} ms")
+    print(f"ringkasan skema : {typed_seconds * 1000:7.1f} ms (hasil sama: {same})")
+
+
+if __name__ == '__main__':
+    main()
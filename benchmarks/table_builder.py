@@ -0,0 +1,67 @@
+"""
+Bandingkan penambahan baris tunggal ke tabel sementara: pd.concat per baris
+(perilaku lama, termasuk .copy() di main_ocr2) vs `TableBuilder.append_row`
+dengan satu kali `to_frame()` di akhir, serta memori DataFrame hasilnya.
+
+Contoh:
+    python -m benchmarks.table_builder --rows 10000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from asset_ocr.schema import COLUMNS_7
+from asset_ocr.table_builder import TableBuilder
+
+COLUMNS = list(COLUMNS_7)
+
+
+def synthetic_rows(count, seed):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'Tanggal Beli': f"2023-10-{rng.integers(1, 29):02d}",
+            'Nama Item': str(rng.choice(['Oreo Vanilla', 'Semen Tiga Roda', 'Paku 2 inch'])),
+            'Quantity': float(rng.integers(1, 20)),
+            'Jenis Satuan': str(rng.choice(['pcs', 'kg', 'meter'])),
+            'Harga': float(rng.integers(500, 500000)),
+            'Total Harga': float(rng.integers(500, 5000000)),
+            'Vendor': str(rng.choice(['Toko Maju', 'Depo Bangunan', 'Mitra 10'])),
+        }
+        for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows, args.seed)
+
+    start = time.perf_counter()
+    table = pd.DataFrame(columns=COLUMNS)
+    for row in rows:
+        table = pd.concat([table.copy(), pd.DataFrame([row])], ignore_index=True)
+    concat_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    builder = TableBuilder(COLUMNS)
+    for row in rows:
+        builder.append_row(row)
+    append_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    frame = builder.to_frame()
+    materialize_seconds = time.perf_counter() - start
+
+    print(f"{args.rows} penambahan baris tunggal")
+    print(f"pd.concat per baris : {concat_seconds * 1000:9.1f} ms, {table.memory_usage(deep=True).sum() / 1024:8.0f} KB")
+    print(f"TableBuilder        : {append_seconds * 1000:9.1f} ms + to_frame {materialize_seconds * 1000:.1f} ms, "
+          f"{frame.memory_usage(deep=True).sum() / 1024:8.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
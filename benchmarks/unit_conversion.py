@@ -0,0 +1,73 @@
+"""
+Bandingkan konversi quantity per nilai (SatuanConverter lama) dengan
+`asset_ocr.unit_conversion` yang bekerja per kolom, pada data sintetis.
+
+Contoh:
+    python -m benchmarks.unit_conversion --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from asset_ocr.unit_conversion import convert_quantities, normalize_units
+
+QUANTITY_SAMPLES = np.array(['1 1/2', '3/4', '2,5', 'N/A', '12', '0.5', '7', 'dua'], dtype=object)
+UNIT_SAMPLES = np.array(['kg', 'gram', 'meter', 'cm', 'pcs', 'lusin', 'lembar', 'N/A'], dtype=object)
+
+
+def legacy_convert(value):
+    """
+    Salinan SatuanConverter.convert_fractions lama, tanpa st.warning
+    """
+    try:
+        if isinstance(value, str):
+            if ' ' in value:
+                whole, frac = value.split(' ')
+                num, denom = map(int, frac.split('/'))
+                return float(whole) + num / denom
+            if '/' in value:
+                num, denom = map(int, value.split('/'))
+                return num / denom
+            return float(value)
+        return float(value)
+    except Exception:
+        # Versi lama memanggil st.warning di sini untuk setiap sel
+        return 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    quantities = pd.Series(rng.choice(QUANTITY_SAMPLES, args.rows))
+    units = pd.Series(rng.choice(UNIT_SAMPLES, args.rows))
+
+    start = time.perf_counter()
+    legacy = quantities.map(legacy_convert)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    values, errors = convert_quantities(quantities)
+    convert_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    normalized, normalized_units = normalize_units(values, units)
+    normalize_seconds = time.perf_counter() - start
+
+    # "2,5" dibaca 0.0 oleh versi lama; selebihnya hasil harus sama
+    comparable = ~quantities.isin(['2,5', 'N/A', 'dua'])
+    mismatch = int((~np.isclose(legacy[comparable], values[comparable])).sum())
+
+    print(f"{args.rows} baris")
+    print(f"per nilai (lama)      : {legacy_seconds:.3f} s")
+    print(f"convert_quantities    : {convert_seconds:.3f} s ({int(errors.sum())} error, {mismatch} beda dari versi lama)")
+    print(f"normalize_units       : {normalize_seconds:.3f} s ({normalized_units.nunique()} satuan setelah normalisasi)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Ukur efek pengaturan encoding unggahan terhadap ukuran payload dan akurasi OCR.
+
+Untuk setiap gambar di direktori fixture, setiap kombinasi pengaturan dicatat
+ukurannya dibanding PNG penuh (perilaku lama). Dengan --ocr, teks OCR Gemini
+dibandingkan dengan `<nama>.txt` jika ada, atau dengan hasil OCR dari PNG penuh.
+
+Contoh:
+    python -m benchmarks.upload_encoding fixtures/struk
+    GEMINI_API_KEY=... python -m benchmarks.upload_encoding fixtures/struk --ocr
+"""
+import argparse
+import difflib
+import itertools
+import os
+import statistics
+
+from PIL import Image
+
+from asset_ocr.image_preprocessing import legacy_png_size, prepare_for_upload
+
+GRID = {
+    'dpi': [150, 200, 300],
+    'format': ['JPEG', 'WEBP'],
+    'quality': [60, 75, 85],
+    'grayscale': [True, False],
+}
+
+
+def similarity(reference, candidate):
+    return difflib.SequenceMatcher(None, reference.split(), (candidate or '').split()).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('fixtures', help="Direktori berisi gambar struk")
+    parser.add_argument('--ocr', action='store_true', help="Ukur juga akurasi OCR (butuh GEMINI_API_KEY)")
+    args = parser.parse_args()
+
+    paths = [
+        os.path.join(args.fixtures, name)
+        for name in sorted(os.listdir(args.fixtures))
+        if name.lower().endswith(('.png', '.jpg', '.jpeg'))
+    ]
+
+    if args.ocr:
+        import main_ocr2
+        api_key = os.environ['GEMINI_API_KEY']
+        references = {}
+        for path in paths:
+            truth = os.path.splitext(path)[0] + '.txt'
+            if os.path.exists(truth):
+                with open(truth, encoding='utf-8') as handle:
+                    references[path] = handle.read()
+            else:
+                references[path] = main_ocr2.OCRService.perform_ocr(
+                    Image.open(path), api_key, {'format': 'PNG', 'grayscale': False, 'dpi': 10000}
+                ) or ''
+
+    baseline = {path: legacy_png_size(Image.open(path)) for path in paths}
+
+    print(f"{'dpi':>4} {'fmt':>5} {'q':>3} {'gray':>5} {'KB before':>10} {'KB after':>9} {'ratio':>6} {'ms':>6} {'acc':>5}")
+    for values in itertools.product(*GRID.values()):
+        settings = dict(zip(GRID, values))
+        before, after, seconds, accuracy = [], [], [], []
+        for path in paths:
+            image = Image.open(path)
+            data, _, stats = prepare_for_upload(image, settings)
+            before.append(baseline[path])
+            after.append(len(data))
+            seconds.append(stats['encode_seconds'])
+            if args.ocr:
+                text = main_ocr2.OCRService.perform_ocr(image, api_key, settings)
+                accuracy.append(similarity(references[path], text))
+
+        print(
+            f"{settings['dpi']:>4} {settings['format']:>5} {settings['quality']:>3} "
+            f"{str(settings['grayscale']):>5} {sum(before) / 1024:>10.0f} {sum(after) / 1024:>9.0f} "
+            f"{sum(after) / sum(before):>6.2f} {statistics.mean(seconds) * 1000:>6.1f} "
+            f"{statistics.mean(accuracy) if accuracy else float('nan'):>5.2f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
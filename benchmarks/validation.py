@@ -0,0 +1,73 @@
+"""
+Bandingkan validasi per baris (DataValidator.validate_input lama, satu dict per
+baris) dengan `asset_ocr.validation.validate_frame` atas seluruh DataFrame.
+
+Contoh:
+    python -m benchmarks.validation --rows 100000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from asset_ocr.validation import validate_frame
+
+
+def legacy_validate(data):
+    """
+    Salinan DataValidator.validate_input lama
+    """
+    errors = []
+    if not data['Nama Item'] or len(data['Nama Item']) < 2:
+        errors.append("Nama Item minimal 2 karakter")
+    if data['Quantity'] <= 0:
+        errors.append("Quantity harus lebih dari 0")
+    if data['Harga'] < 0:
+        errors.append("Harga tidak boleh negatif")
+    if not data['Vendor'] or len(data['Vendor']) < 2:
+        errors.append("Nama Vendor minimal 2 karakter")
+    return errors
+
+
+def synthetic_table(rows, seed):
+    rng = np.random.default_rng(seed)
+    quantity = rng.integers(-1, 20, rows).astype(float)
+    price = rng.integers(-100, 500000, rows).astype(float)
+    total = quantity * price
+    # Sebagian total sengaja tidak cocok
+    total[rng.random(rows) < 0.05] += 1000
+    return pd.DataFrame({
+        'Tanggal Beli': rng.choice(['2023-10-15', '2024-02-30', 'N/A', '2024-01-01'], rows),
+        'Nama Item': rng.choice(['Oreo Vanilla', 'X', 'Semen Tiga Roda', ''], rows),
+        'Quantity': quantity,
+        'Jenis Satuan': rng.choice(['pcs', 'kg'], rows),
+        'Harga': price,
+        'Total Harga': total,
+        'Vendor': rng.choice(['Toko Maju', 'A', 'Depo Bangunan'], rows),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    df = synthetic_table(args.rows, args.seed)
+
+    start = time.perf_counter()
+    legacy = [legacy_validate(row) for row in df.to_dict('records')]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    codes = validate_frame(df)
+    frame_seconds = time.perf_counter() - start
+
+    print(f"{args.rows} baris")
+    print(f"per baris (lama, 4 aturan) : {legacy_seconds * 1000:8.1f} ms, {sum(bool(errors) for errors in legacy)} baris bermasalah")
+    print(f"validate_frame (6 aturan)  : {frame_seconds * 1000:8.1f} ms, {int((codes != '').sum())} baris bermasalah")
+
+
+if __name__ == '__main__':
+    main()
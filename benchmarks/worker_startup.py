@@ -0,0 +1,137 @@
+"""
+Ukur biaya start worker proses: waktu impor dan RSS proses baru untuk
+dependensi tingkat atas aplikasi lama (streamlit, google.generativeai, cv2,
+easyocr, pytesseract, ...) dibandingkan `asset_ocr.services`, lalu waktu
+start `ProcessPoolExecutor` (spawn) dan throughput `process_receipt` dengan
+model palsu di dalam worker.
+
+Modul yang tidak terpasang dicatat "tidak terpasang" dan tidak dihitung.
+
+Contoh:
+    python -m benchmarks.worker_startup --receipts 64 --workers 4 --latency 0.05
+"""
+import argparse
+import json
+import multiprocessing
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+# Impor tingkat atas main_ocr2.py / main4.py / main_ocr.py sebelum layanan dipisah
+LEGACY_MODULES = [
+    'streamlit', 'google.generativeai', 'dotenv', 'cv2', 'easyocr', 'pytesseract',
+    'numpy', 'pandas', 'PIL.Image',
+]
+CORE_MODULES = ['asset_ocr.services']
+HEAVY_MODULES = ['streamlit', 'google', 'cv2', 'easyocr', 'pytesseract', 'matplotlib', 'torch']
+
+PROBE = """
+import importlib, json, sys, time
+
+def rss_kb():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+result = {'base_rss': rss_kb(), 'modules': {}}
+start = time.perf_counter()
+for name in json.loads(sys.argv[1]):
+    module_start = time.perf_counter()
+    try:
+        importlib.import_module(name)
+        result['modules'][name] = time.perf_counter() - module_start
+    except ImportError:
+        result['modules'][name] = None
+result['seconds'] = time.perf_counter() - start
+result['rss'] = rss_kb()
+result['heavy'] = sorted(name for name in json.loads(sys.argv[2]) if name in sys.modules)
+print(json.dumps(result))
+"""
+
+
+def probe(modules):
+    """
+    Impor `modules` di interpreter baru; kembalikan waktu dan RSS
+    """
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, json.dumps(modules), json.dumps(HEAVY_MODULES)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+def report(label, modules, repeat):
+    runs = [probe(modules) for _ in range(repeat)]
+    best = min(runs, key=lambda run: run['seconds'])
+    print(f"{label}: impor {best['seconds'] * 1000:7.1f} ms, RSS {best['rss'] / 1024:6.1f} MB "
+          f"(interpreter kosong {best['base_rss'] / 1024:.1f} MB)")
+    for name, seconds in best['modules'].items():
+        print(f"    {name:22s} " + ("tidak terpasang" if seconds is None else f"{seconds * 1000:7.1f} ms"))
+    print(f"    modul berat termuat: {', '.join(best['heavy']) or '-'}")
+
+
+def init_worker(latency):
+    """
+    Initializer worker: model palsu di cache klien dan penjadwal tanpa batas RPM
+    """
+    from asset_ocr import gemini_client, services
+    from asset_ocr.fake_gemini import FakeGenerativeModel, json_responder
+    from asset_ocr.prompts import MAIN_OCR2_PROMPTS
+    from asset_ocr.request_scheduler import get_scheduler
+
+    get_scheduler('offline', requests_per_minute=1_000_000, max_concurrent=64)
+    prompts = MAIN_OCR2_PROMPTS
+    json_config = gemini_client._config_key(services._json_config(prompts.response_schema))
+    gemini_client._MODELS[('offline', prompts.model_name, None)] = FakeGenerativeModel(latency=latency)
+    gemini_client._MODELS[('offline', prompts.model_name, json_config)] = FakeGenerativeModel(
+        latency=latency, responder=json_responder
+    )
+
+
+def pool_run(receipts, workers, latency, mode):
+    from asset_ocr.prompts import MAIN_OCR2_PROMPTS
+    from asset_ocr.services import process_receipt
+
+    image = Image.new('RGB', (600, 800), 'white')
+    context = multiprocessing.get_context('spawn')
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker, initargs=(latency,)) as pool:
+        # Satu tugas per worker dulu: waktu sampai semua worker siap
+        list(pool.map(process_receipt, ['warm'] * workers, [image] * workers,
+                      ['offline'] * workers, [MAIN_OCR2_PROMPTS] * workers, [mode] * workers))
+        ready = time.perf_counter() - start
+        start = time.perf_counter()
+        results = list(pool.map(
+            process_receipt, [f"struk_{index}" for index in range(receipts)], [image] * receipts,
+            ['offline'] * receipts, [MAIN_OCR2_PROMPTS] * receipts, [mode] * receipts
+        ))
+        elapsed = time.perf_counter() - start
+    ok = sum(result.ok for result in results)
+    rows = sum(len(result.rows) for result in results if result.ok)
+    errors = {result.error.stage for result in results if not result.ok}
+    print(f"pool spawn {workers} worker ({mode}): siap {ready * 1000:7.1f} ms, "
+          f"{receipts} struk {elapsed:5.2f} s ({receipts / elapsed:6.1f} struk/s), "
+          f"{ok} ok, {rows} baris" + (f", gagal di tahap {sorted(errors)}" if errors else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--receipts', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.05, help="Latensi simulasi per panggilan (detik)")
+    parser.add_argument('--repeat', type=int, default=3, help="Ulangi probe impor; ambil yang tercepat")
+    args = parser.parse_args()
+
+    report("aplikasi lama", LEGACY_MODULES, args.repeat)
+    report("layanan inti ", CORE_MODULES, args.repeat)
+    for mode in ('two_stage', 'one_shot'):
+        pool_run(args.receipts, args.workers, args.latency, mode)
+
+
+if __name__ == '__main__':
+    main()
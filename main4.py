@@ -1,180 +1,148 @@
 import os
 import streamlit as st
 import pandas as pd
-import base64
-import io
 from PIL import Image
-import google.generativeai as genai
 from dotenv import load_dotenv
-import datetime
+from asset_ocr import receipt_runner, services
+from asset_ocr.asset_store import get_asset_store
+from asset_ocr.errors import ServiceError
+from asset_ocr.prompts import (
+    MAIN4_ANALYSIS_PROMPT_TEMPLATE, MAIN4_FIELD_COLUMNS, MAIN4_OCR_PROMPT, MAIN4_PROMPTS,
+    MAIN4_RESPONSE_SCHEMA, MAIN4_STRUCTURED_PROMPT,
+)
+from asset_ocr.request_scheduler import get_scheduler
+from asset_ocr.result_cache import get_result_cache
+from asset_ocr.schema import COLUMNS_5
+from asset_ocr.table_builder import TableBuilder
 
 # Muat variabel lingkungan
 load_dotenv()
 
+# Tabel aset permanen (SQLite) milik aplikasi ini dan jumlah baris per halaman
+ASSET_STORE_TABLE = 'main4_assets'
+ASSET_PAGE_ROWS = 100
+
+# Metode ekstraksi dokumen yang bisa dipilih pengguna
+EXTRACTION_MODES = {
+    "Dua Tahap (OCR → Analisis)": 'two_stage',
+    "Satu Tahap (JSON terstruktur)": 'one_shot',
+}
+
+# Judul keluaran per tahap pada mode streaming
+STREAM_LABELS = {
+    'ocr': "**Hasil OCR**",
+    'analysis': "**Hasil Analisis**",
+    'extraction': "**Hasil Ekstraksi (JSON)**",
+}
+
 class OCRService:
+    # Prompt untuk ekstraksi teks dari gambar
+    PROMPT = MAIN4_OCR_PROMPT
+
     @staticmethod
-    def image_to_base64(image):
+    def image_payload(image, settings=None):
         """
-        Konversi gambar ke base64
+        Siapkan bagian gambar untuk Gemini: orientasi EXIF, batas resolusi, JPEG/WebP
         """
-        buffered = io.BytesIO()
-        image.save(buffered, format="PNG")
-        return base64.b64encode(buffered.getvalue()).decode('utf-8')
+        return services.image_payload(image, settings)
 
     @staticmethod
-    def perform_ocr(image, gemini_api_key):
+    def perform_ocr(image, gemini_api_key, upload_settings=None):
         """
         Melakukan OCR menggunakan Gemini 1.5 Flash
         """
         try:
-            # Konfigurasi Gemini
-            genai.configure(api_key=gemini_api_key)
-            
-            # Konversi gambar ke base64
-            base64_image = OCRService.image_to_base64(image)
-            
-            # Buat model
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            
-            # Prompt untuk ekstraksi teks dari gambar
-            prompt = """
-            Ekstrak informasi detail dari struk/dokumen dengan presisi tinggi:
-
-            Panduan Ekstraksi:
-            1. Identifikasi dengan jelas setiap komponen
-            2. Fokus pada informasi penting
-            3. Perhatikan format angka dan tanggal
-
-            Informasi yang WAJIB diekstrak:
-            - Tanggal Transaksi (format YYYY-MM-DD)
-            - Nama Produk/Item (nama lengkap)
-            - Harga Satuan (dalam angka)
-            - Jumlah/Quantity (angka)
-            - Total Harga (jika sudah ada maka tulis jika tidak maka hasil perkalian harga satuan dengan quantity)
-
-            Catatan Penting:
-            - Gunakan format numerik yang bersih
-            - Pertahankan tanda kurung pada nama item
-            - Hilangkan simbol mata uang
-            - Jika informasi tidak ditemukan, gunakan 'N/A'
-            - Prioritaskan keakuratan data
-            """
-            
-            # Proses gambar
-            response = model.generate_content([prompt, {'mime_type': 'image/png', 'data': base64_image}])
-            
-            return response.text
-        except Exception as e:
+            return services.run_ocr(
+                image, 'gemini',
+                api_key=gemini_api_key,
+                prompt=OCRService.PROMPT,
+                upload_settings=upload_settings
+            ).text
+        except ServiceError as e:
             st.error(f"Kesalahan OCR: {e}")
             return None
-        
-@staticmethod
-def perform_ocr(image, gemini_api_key):
-    """
-    Melakukan OCR menggunakan Gemini 1.5 Flash
-    """
-    try:
-        # Konfigurasi Gemini
-        genai.configure(api_key=gemini_api_key)
-        
-        # Konversi gambar ke base64
-        base64_image = OCRService.image_to_base64(image) #ganti ini dengangemini flash saja karena tidak ada osr service
-        
-        # Buat model
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        
-        # Prompt untuk ekstraksi teks dari gambar
-        prompt = """
-        Ekstrak informasi penting dari gambar struk/dokumen:
-        - Nama Item/Produk
-        - Harga Satuan
-        - Quantity
-        - Total Harga
-        - Tanggal Transaksi
-
-        Berikan output terstruktur.
-        """
-        
-        # Proses gambar
-        response = model.generate_content([prompt, {'mime_type': 'image/png', 'data': base64_image}])
-        
-        return response.text
-    except Exception as e:
-        st.error(f"Kesalahan OCR: {e}")
-        return None
 
 class AIAnalysisService:
+    # Prompt untuk ekstraksi data terstruktur
+    PROMPT_TEMPLATE = MAIN4_ANALYSIS_PROMPT_TEMPLATE
+
     @staticmethod
     def analyze_ocr_text(text, gemini_api_key):
         try:
-            # Konfigurasi Gemini
-            genai.configure(api_key=gemini_api_key)
-            
-            # Buat model
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            
-            # Prompt untuk ekstraksi data terstruktur
-            prompt = f"""
-            Instruksi Ekstraksi Data Terperinci:
-
-            Sumber Teks:
-            {text}
-
-            Panduan Ekstraksi:
-            1. Ekstrak data dengan format CSV yang ketat
-            2. Setiap kolom memiliki kriteria spesifik
-
-            Format Keluaran PASTI:
-            'Tanggal Beli','Nama Item','Quantity','Harga','Total Harga'
-
-            Aturan Ketat:
-            - Gunakan tanda kutip tunggal
-            - Pisahkan dengan koma TEPAT
-            - Tanggal: format YYYY-MM-DD
-            - Nama Item: nama lengkap, hilangkan karakter khusus n
-            - Quantity: bilangan bulat positif
-            - Harga: bilangan bulat, tanpa simbol mata uang
-            - Total Harga: hasil perkalian Quantity * Harga
-
-            Contoh Valid:
-            '2023-10-15','Oreo Vanilla','38','2000','76000'
-
-            Instruksi Akhir:
-            - Kembalikan HANYA data dalam format CSV
-            - Jangan tambahkan penjelasan atau komentar
-            - Prioritaskan presisi dan konsistensi
-            """
-            
-            response = model.generate_content(prompt)
-            return response.text
-        except Exception as e:
+            return services.analyze_text(text, gemini_api_key, AIAnalysisService.PROMPT_TEMPLATE)
+        except ServiceError as e:
             st.error(f"Kesalahan Analisis: {e}")
             return None
 
+class StructuredExtractionService:
+    # Prompt ekstraksi satu tahap; struktur keluaran diatur RESPONSE_SCHEMA
+    PROMPT = MAIN4_STRUCTURED_PROMPT
+
+    # Pemetaan field JSON ke kolom tabel
+    FIELD_COLUMNS = MAIN4_FIELD_COLUMNS
+
+    RESPONSE_SCHEMA = MAIN4_RESPONSE_SCHEMA
+
+    @staticmethod
+    def extract(image, gemini_api_key):
+        """
+        Ekstraksi satu tahap: gambar langsung menjadi JSON sesuai skema tabel
+        """
+        try:
+            return services.extract_structured(
+                image, gemini_api_key,
+                StructuredExtractionService.PROMPT, StructuredExtractionService.RESPONSE_SCHEMA
+            )
+        except ServiceError as e:
+            st.error(f"Kesalahan Ekstraksi: {e}")
+            return None
+
 class AssetTrackingApp:
     def __init__(self):
-        # Inisialisasi session state untuk tabel
-        if 'asset_table' not in st.session_state:
-            st.session_state.asset_table = pd.DataFrame(columns=[
-                'Tanggal Beli', 'Nama Item', 'Quantity', 'Harga', 'Total Harga'
-            ])
+        # Tabel permanen disimpan di SQLite dan tidak dimuat saat aplikasi dibuka
+        self.asset_store = get_asset_store(ASSET_STORE_TABLE, COLUMNS_5)
         
+        # Tabel sementara ditampung per kolom/potongan, DataFrame dibentuk saat ditampilkan
         if 'temp_table' not in st.session_state:
-            st.session_state.temp_table = pd.DataFrame(columns=[
-                'Tanggal Beli', 'Nama Item', 'Quantity', 'Harga', 'Total Harga'
-            ])
+            st.session_state.temp_table = TableBuilder(COLUMNS_5)
 
     def run(self):
         st.title("🧾 Pencatatan Aset Tetap")
         
         # Input API Key
         gemini_api_key = os.getenv('GEMINI_API_KEY')
+        
+        # Dashboard kuota Gemini untuk API key ini
+        if gemini_api_key:
+            with st.sidebar.expander("Kuota Gemini"):
+                quota = get_scheduler(gemini_api_key).stats()
+                col_ok, col_retry, col_fail = st.columns(3)
+                col_ok.metric("Berhasil", quota['succeeded'])
+                col_retry.metric("Retry", quota['retries'])
+                col_fail.metric("Gagal", quota['failed'])
+                st.json(quota)
     
         # Pilih mode input
         mode = st.selectbox("Pilih Mode Input", 
             ["Upload Gambar", "Input Manual", "Scan Kamera"]
         )
     
+        # Batalkan pipeline async yang masih berjalan jika pengguna berpindah mode
+        if mode != "Upload Gambar" and st.session_state.get('async_run'):
+            st.session_state.async_run.cancel()
+            st.session_state.async_run = None
+    
+        # Pilih metode ekstraksi dokumen
+        if mode in ("Upload Gambar", "Scan Kamera"):
+            extraction_label = st.radio(
+                "Metode Ekstraksi", list(EXTRACTION_MODES), horizontal=True
+            )
+            st.session_state.extraction_mode = EXTRACTION_MODES[extraction_label]
+            st.session_state.streaming = st.checkbox(
+                "Mode streaming", value=False,
+                help="Tampilkan hasil sambil diterima dan tambahkan baris begitu lengkap"
+            )
+    
         # Proses berdasarkan mode
         if mode == "Upload Gambar" and gemini_api_key:
             self.upload_image_mode(gemini_api_key)
@@ -199,9 +167,7 @@ class AssetTrackingApp:
                     # Tombol konfirmasi
                     if st.button("Ya, Reset Tabel"):
                         # Reset HANYA tabel sementara
-                        st.session_state.temp_table = pd.DataFrame(columns=[
-                            'Tanggal Beli', 'Nama Item', 'Quantity', 'Harga', 'Total Harga'
-                        ])
+                        st.session_state.temp_table.clear()
                         st.success("Tabel sementara berhasil direset!")
                     
                     # Tombol batal
@@ -211,28 +177,23 @@ class AssetTrackingApp:
         # Edit tabel dengan opsi dinamis
         with col1:
             edited_table = st.data_editor(
-                st.session_state.temp_table, 
+                st.session_state.temp_table.to_frame(), 
                 num_rows="dynamic"
             )
     
         # Tombol simpan ke tabel permanen
         if st.button("Simpan ke Tabel Permanen"):
-            # Gabungkan tabel permanen dengan data yang diedit
-            st.session_state.asset_table = pd.concat([
-                st.session_state.asset_table, 
-                edited_table
-            ], ignore_index=True)
+            # Tambahkan data yang diedit sebagai satu batch ke tabel permanen
+            self.asset_store.append(edited_table)
             
             # Reset tabel sementara
-            st.session_state.temp_table = pd.DataFrame(columns=[
-                'Tanggal Beli', 'Nama Item', 'Quantity', 'Harga', 'Total Harga'
-            ])
+            st.session_state.temp_table.clear()
             
             st.success("Data berhasil disimpan!")
     
-        # Tampilkan tabel permanen
+        # Tampilkan tabel permanen per halaman, bukan seluruh tabel
         st.subheader("Tabel Aset Permanen")
-        st.dataframe(st.session_state.asset_table)
+        self.asset_table_page("permanent_table")
     
         # Tambahan: Tombol hapus tabel permanen (opsional)
         if st.checkbox("Tampilkan opsi hapus tabel permanen"):
@@ -241,35 +202,66 @@ class AssetTrackingApp:
                 confirm = st.checkbox("Saya yakin ingin menghapus SELURUH tabel permanen")
                 
                 if confirm:
-                    st.session_state.asset_table = pd.DataFrame(columns=[
-                        'Tanggal Beli', 'Nama Item', 'Quantity', 'Harga', 'Total Harga'
-                    ])
+                    self.asset_store.clear()
                     st.warning("Seluruh tabel permanen telah dihapus!")
 
+    def asset_table_page(self, key):
+        """
+        Tampilkan satu halaman tabel permanen dengan pencarian dan urutan yang
+        dijalankan di SQLite
+        """
+        col_search, col_sort, col_order = st.columns([3, 2, 1])
+        search = col_search.text_input("Cari", key=f"{key}_search")
+        sort = col_sort.selectbox("Urutkan", ["Urutan simpan"] + list(COLUMNS_5), key=f"{key}_sort")
+        descending = col_order.checkbox("Menurun", value=True, key=f"{key}_descending")
+
+        matched = self.asset_store.count(search=search)
+        pages = max(1, -(-matched // ASSET_PAGE_ROWS))
+        # Pencarian baru bisa memperkecil jumlah halaman; jangan biarkan nomor halaman di luar batas
+        if st.session_state.get(f"{key}_page", 1) > pages:
+            st.session_state[f"{key}_page"] = pages
+        page_number = st.number_input("Halaman", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+        st.caption(f"{matched} baris cocok, halaman {page_number} dari {pages} ({ASSET_PAGE_ROWS} baris per halaman).")
+
+        st.dataframe(self.asset_store.page(
+            offset=(page_number - 1) * ASSET_PAGE_ROWS,
+            limit=ASSET_PAGE_ROWS,
+            search=search,
+            sort=None if sort == "Urutan simpan" else sort,
+            descending=descending
+        ))
+
     def upload_image_mode(self, gemini_api_key):
-        uploaded_file = st.file_uploader(
+        uploaded_files = st.file_uploader(
             "Upload Gambar Struk/Dokumen", 
-            type=['png', 'jpg', 'jpeg']
+            type=['png', 'jpg', 'jpeg'],
+            accept_multiple_files=True
         )
         
-        if uploaded_file is not None:
-            image = Image.open(uploaded_file)
+        if len(uploaded_files) == 1:
+            image = Image.open(uploaded_files[0])
             st.image(image, caption="Gambar Terunggah", width=300)
             
             if st.button("Proses Dokumen"):
                 with st.spinner("Memproses Dokumen..."):
-                    ocr_result = OCRService.perform_ocr(image, gemini_api_key)
-                    
-                    if ocr_result:
-                        st.text_area("Hasil OCR", ocr_result, height=200)
-                        
-                        analysis_result = AIAnalysisService.analyze_ocr_text(
-                            ocr_result, 
-                            gemini_api_key
-                        )
-                        
-                        if analysis_result:
-                            self.process_analysis_result(analysis_result)
+                    self.process_document(image, gemini_api_key)
+        elif len(uploaded_files) > 1:
+            st.write(f"**{len(uploaded_files)} gambar siap diproses.**")
+            
+            with st.expander("Pengaturan Batch"):
+                max_workers = st.number_input("Jumlah worker", min_value=1, max_value=16, value=4)
+                ocr_limit = st.number_input("Maksimal OCR bersamaan", min_value=1, max_value=16, value=2)
+                analysis_limit = st.number_input("Maksimal analisis bersamaan", min_value=1, max_value=16, value=2)
+                use_async = st.checkbox("Gunakan pipeline asyncio", value=False)
+            
+            if st.button("Proses Semua Dokumen"):
+                if use_async:
+                    self.process_batch_async(uploaded_files, gemini_api_key, max_workers)
+                else:
+                    self.process_batch(
+                        uploaded_files, gemini_api_key,
+                        max_workers, ocr_limit, analysis_limit
+                    )
 
     def camera_scan_mode(self, gemini_api_key):
         picture = st.camera_input("Ambil Gambar Struk")
@@ -280,18 +272,161 @@ class AssetTrackingApp:
             
             if st.button("Proses Dokumen"):
                 with st.spinner("Memproses Dokumen..."):
-                    ocr_result = OCRService.perform_ocr(image, gemini_api_key)
-                    
-                    if ocr_result:
-                        st.text_area("Hasil OCR", ocr_result, height=200)
-                        
-                        analysis_result = AIAnalysisService.analyze_ocr_text(
-                            ocr_result, 
-                            gemini_api_key
-                        )
-                        
-                        if analysis_result:
-                            self.process_analysis_result(analysis_result)
+                    self.process_document(image, gemini_api_key)
+
+    @staticmethod
+    def extraction_mode():
+        return st.session_state.get('extraction_mode', 'two_stage')
+
+    @staticmethod
+    def streaming_mode():
+        return st.session_state.get('streaming', False)
+
+    @staticmethod
+    def cache_key_for(image, mode):
+        return receipt_runner.cache_key(MAIN4_PROMPTS, image, mode)
+
+    def process_document(self, image, gemini_api_key):
+        """
+        Jalankan OCR dan analisis, memakai cache jika struk sudah pernah diproses
+        """
+        mode = self.extraction_mode()
+        cache = get_result_cache()
+        cache_key = self.cache_key_for(image, mode)
+        cached = cache.get(cache_key)
+        
+        if cached:
+            st.info("Struk ini sudah pernah diproses, memakai hasil dari cache.")
+            if cached['ocr_text']:
+                st.text_area("Hasil OCR", cached['ocr_text'], height=200)
+            # Baris hasil parsing ikut tersimpan di cache; tidak di-parse ulang
+            self.process_analysis_result(
+                cached['analysis_text'], receipt_runner.cached_frame(MAIN4_PROMPTS, cache, cache_key, cached)
+            )
+            return
+        
+        if self.streaming_mode():
+            self.process_document_streaming(image, gemini_api_key, mode, cache_key)
+            return
+        
+        if mode == 'one_shot':
+            # Satu panggilan: gambar langsung menjadi baris JSON
+            extraction_result = StructuredExtractionService.extract(image, gemini_api_key)
+            
+            if extraction_result:
+                st.text_area("Hasil Ekstraksi (JSON)", extraction_result, height=200)
+                df = self.process_analysis_result(extraction_result)
+                cache.set(cache_key, None, extraction_result, df)
+            return
+        
+        ocr_result = OCRService.perform_ocr(image, gemini_api_key)
+        
+        if ocr_result:
+            st.text_area("Hasil OCR", ocr_result, height=200)
+            
+            analysis_result = AIAnalysisService.analyze_ocr_text(
+                ocr_result, 
+                gemini_api_key
+            )
+            
+            if analysis_result:
+                df = self.process_analysis_result(analysis_result)
+                cache.set(cache_key, ocr_result, analysis_result, df)
+
+    def process_document_streaming(self, image, gemini_api_key, mode, cache_key):
+        """
+        Tampilkan keluaran model sambil di-stream; baris masuk tabel sementara setelah stream selesai
+        """
+        placeholders = {}
+
+        def show_text(stage, text):
+            if stage not in placeholders:
+                st.write(STREAM_LABELS[stage])
+                placeholders[stage] = (st.empty(), st.empty())
+            placeholders[stage][0].text(text)
+
+        def show_rows(stage, rows):
+            placeholders[stage][1].dataframe(rows.to_frame())
+
+        result = receipt_runner.stream_receipt(
+            MAIN4_PROMPTS, image, gemini_api_key, mode, show_text, show_rows, key=cache_key
+        )
+        if not result.ok:
+            st.error(f"Kesalahan Streaming: {result.error}")
+        elif result.rows.empty:
+            st.warning("Tidak ada data yang dapat diproses.")
+        else:
+            st.session_state.temp_table.append_frame(result.rows)
+            st.success(f"Berhasil menambahkan {len(result.rows)} item ke tabel sementara!")
+
+    def process_batch(self, uploaded_files, gemini_api_key, max_workers=4, ocr_limit=2, analysis_limit=2):
+        """
+        Proses banyak struk sekaligus di thread pool, lalu gabungkan hasilnya sekali
+        """
+        progress_bar = st.progress(0.0, text="Memproses dokumen...")
+        status_placeholder = st.empty()
+        statuses = {uploaded_file.name: "Menunggu" for uploaded_file in uploaded_files}
+        
+        def on_progress(done, total, result):
+            if result.ok:
+                statuses[result.name] = f"Selesai ({len(result.output)} item)"
+            else:
+                statuses[result.name] = f"Gagal di tahap {result.failed_stage}: {result.error}"
+            progress_bar.progress(done / total, text=f"{done}/{total} dokumen selesai")
+            status_placeholder.dataframe(
+                pd.DataFrame({'File': list(statuses), 'Status': list(statuses.values())})
+            )
+        
+        results = receipt_runner.run_batch(
+            MAIN4_PROMPTS, [(uploaded_file.name, uploaded_file) for uploaded_file in uploaded_files],
+            gemini_api_key, self.extraction_mode(), max_workers, ocr_limit, analysis_limit, on_progress
+        )
+        
+        # Tambahkan hasil per dokumen; tabel digabung sekali saat ditampilkan
+        frames = [result.output for result in results if result.ok and not result.output.empty]
+        if frames:
+            for frame in frames:
+                st.session_state.temp_table.append_frame(frame)
+            st.success(f"Berhasil menambahkan {sum(len(frame) for frame in frames)} item dari {len(frames)} dokumen!")
+        else:
+            st.warning("Tidak ada data yang dapat diproses.")
+
+    def process_batch_async(self, uploaded_files, gemini_api_key, concurrency=4):
+        """
+        Proses banyak struk dengan pipeline asyncio yang berjalan di thread latar
+        """
+        # Struk yang sudah ada di cache tidak dikirim ulang
+        batch = receipt_runner.AsyncReceiptBatch(
+            MAIN4_PROMPTS, [(uploaded_file.name, uploaded_file) for uploaded_file in uploaded_files],
+            gemini_api_key, self.extraction_mode(), concurrency
+        ).start()
+        run = batch.run
+        st.session_state.async_run = run
+        progress_bar = st.progress(0.0, text="Memproses dokumen...")
+        try:
+            while not run.wait(timeout=0.2):
+                if run.total:
+                    progress_bar.progress(run.completed / run.total, text=f"{run.completed}/{run.total} dokumen selesai")
+        finally:
+            # Script dihentikan (mis. pengguna berpindah halaman): batalkan sisa pekerjaan
+            run.cancel()
+            st.session_state.async_run = None
+        
+        if run.error:
+            st.error(f"Pipeline gagal: {run.error}")
+            return
+        
+        # Parse seluruh hasil sekaligus, lalu tambahkan sebagai satu potongan
+        df, failures = batch.finish()
+        for name, error in failures:
+            st.warning(f"{name}: {error}")
+        progress_bar.progress(1.0, text="Selesai")
+        
+        if not df.empty:
+            st.session_state.temp_table.append_frame(df)
+            st.success(f"Berhasil menambahkan {len(df)} item dari {batch.documents} dokumen!")
+        else:
+            st.warning("Tidak ada data yang dapat diproses.")
 
     def manual_input_mode(self):
         st.subheader("Input Manual Data Aset")
@@ -316,69 +451,54 @@ class AssetTrackingApp:
         # Tombol tambah ke tabel sementara
         if st.button("Tambah ke Tabel Sementara"):
             # Tambahkan data ke tabel sementara
-            new_data = pd.DataFrame([{
+            st.session_state.temp_table.append_row({
                 'Tanggal Beli': tanggal_beli.strftime('%Y-%m-%d'),
                 'Nama Item': nama_item,
                 'Quantity': quantity,
                 'Harga': harga,
                 'Total Harga': total_harga
-            }])
-
-            st.session_state.temp_table = pd.concat(
-                [st.session_state.temp_table, new_data],
-                ignore_index=True
-            )
+            })
 
             st.success("Data berhasil ditambahkan ke tabel sementara!")
 
-    def process_analysis_result(self, analysis_result):
+    @staticmethod
+    def parse_analysis_result(analysis_result):
+        """
+        Ubah teks hasil analisis (CSV atau JSON) menjadi DataFrame (tanpa menyentuh UI)
+        """
+        return AssetTrackingApp.parse_analysis_results([analysis_result])
+
+    @staticmethod
+    def parse_analysis_results(analysis_results):
+        """
+        Parse banyak hasil analisis sekaligus menjadi satu DataFrame
+        """
+        return services.parse_results(analysis_results, MAIN4_PROMPTS)
+
+    def process_analysis_result(self, analysis_result, df=None):
+        """
+        Tambahkan baris hasil analisis ke tabel sementara (di-parse jika `df`
+        belum ada); kembalikan DataFrame-nya, atau None jika gagal diproses
+        """
         try:
-            # Bersihkan hasil dari karakter ekstra
-            clean_result = analysis_result.strip().replace("'", "")
-            
-            # Split baris
-            lines = clean_result.split('\n')
-            
-            # Inisialisasi list untuk data
-            processed_data = []
+            if df is None:
+                df = self.parse_analysis_result(analysis_result)
             
-            for line in lines:
-                # Split dengan koma
-                parts = [part.strip() for part in line.split(',')]
-                
-                # Validasi panjang data
-                if len(parts) == 5:
-                    processed_data.append(parts)
-            
-            # Buat DataFrame
-            if processed_data:
-                df = pd.DataFrame(processed_data, columns=[
-                    'Tanggal Beli', 'Nama Item', 'Quantity', 'Harga', 'Total Harga'
-                ])
-                
-                # Konversi tipe data
-                df['Quantity'] = pd.to_numeric(df['Quantity'], errors='coerce')
-                df['Harga'] = pd.to_numeric(df['Harga'], errors='coerce')
-                df['Total Harga'] = pd.to_numeric(df['Total Harga'], errors='coerce')
-                
-                # Bersihkan data yang tidak valid
-                df = df.dropna()
-                
+            if not df.empty:
                 # Tambahkan ke tabel sementara
-                st.session_state.temp_table = pd.concat([
-                    st.session_state.temp_table, 
-                    df
-                ], ignore_index=True)
+                st.session_state.temp_table.append_frame(df)
                 
                 st.success(f"Berhasil menambahkan {len(df)} item ke tabel sementara!")
                 st.dataframe(df)
             else:
                 st.warning("Tidak ada data yang dapat diproses.")
+            return df
         
         except Exception as e:
             st.error(f"Kesalahan saat memproses hasil analisis: {e}")
             st.text("Hasil Analisis Asli:")
             st.text(analysis_result)
+            return None
 
 
 # Jalankan aplikasi
@@ -1,18 +1,31 @@
 import os
 import streamlit as st
-import pandas as pd
-import pytesseract
-import cv2
 import numpy as np
 from PIL import Image
-import google.generativeai as genai
 from dotenv import load_dotenv
-import easyocr
+from asset_ocr import services
+from asset_ocr.analysis_parser import parse_analysis_text
+from asset_ocr.asset_store import get_asset_store
+from asset_ocr.errors import OCRError, ServiceError
+from asset_ocr.image_preprocessing import DEFAULT_PREPROCESS_STEPS, ENGINE_PREPROCESS_STEPS, PREPROCESS_STAGES, ReceiptPreprocessor
+from asset_ocr.ocr_engines import selectable_engines
+from asset_ocr.ocr_router import DEFAULT_THRESHOLD, DEFAULT_TIERS, ROUTING_STATS
+from asset_ocr.prompts import MAIN_OCR_PROMPTS
+from asset_ocr.reader_pool import get_reader_pool
+from asset_ocr.request_scheduler import get_scheduler
+from asset_ocr.result_cache import cached_rows, get_result_cache, make_cache_key
+from asset_ocr.schema import COLUMNS_5
+from asset_ocr.table_builder import TableBuilder
+from asset_ocr.validation import validate_frame
 
 
 # Load environment variables
 load_dotenv()
 
+# Tabel aset permanen (SQLite) milik aplikasi ini dan jumlah baris per halaman
+ASSET_STORE_TABLE = 'main_ocr_assets'
+ASSET_PAGE_ROWS = 100
+
 class APIKeyManager:
     @staticmethod
     def get_gemini_api_key():
@@ -35,40 +48,56 @@ class APIKeyManager:
         
         return api_key
 
+@st.cache_resource(show_spinner="Memuat model EasyOCR...")
+def load_reader_pool(languages=('en', 'id')):
+    """
+    Muat pool reader EasyOCR sekali per proses server
+    """
+    pool = get_reader_pool(languages)
+    pool.warm()
+    return pool
+
 class OCRService:
     @staticmethod
-    def preprocess_image(image):
+    def preprocess_image(image, steps=None):
         """
         Pra-pemrosesan gambar untuk meningkatkan akurasi OCR
         """
-        # Konversi ke grayscale
-        gray = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2GRAY)
+        # Grayscale + Otsu (perilaku lama) bila langkah tidak ditentukan
+        if steps is None:
+            steps = {'downscale': False, 'crop': False, 'deskew': False, 'denoise': False, 'threshold': 'otsu'}
         
-        # Terapkan thresholding
-        gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
-        
-        return gray
-
+        processed, _ = ReceiptPreprocessor(steps).run(np.asarray(image))
+        return processed
 
-
-class OCRService:
     @staticmethod
-    def perform_ocr(image):
+    def perform_ocr(image, preprocess_steps=None, engine_name='easyocr', gemini_api_key=None,
+                    routing_threshold=DEFAULT_THRESHOLD):
         try:
-            # Inisialisasi reader (bisa tambahkan bahasa)
-            reader = easyocr.Reader(['en', 'id'])
-            
-            # Konversi PIL Image ke numpy array
-            img_array = np.array(image)
-            
-            # Lakukan OCR
-            results = reader.readtext(img_array)
+            options = {}
+            if engine_name in ('easyocr', 'cascade'):
+                # Pastikan pool reader sudah dimuat (model dimuat sekali per proses)
+                try:
+                    load_reader_pool()
+                except Exception as e:
+                    raise OCRError(f"Gagal memuat EasyOCR: {e}", e) from e
+            if engine_name in ENGINE_PREPROCESS_STEPS:
+                # Pra-pemrosesan langsung pada array (tanpa bolak-balik ke PIL)
+                options['preprocess_steps'] = preprocess_steps
+            elif engine_name == 'gemini':
+                options['api_key'] = gemini_api_key
+            elif engine_name == 'cascade':
+                # Engine lokal lebih dulu, Gemini hanya jika skor di bawah ambang;
+                # `preprocess_steps` berisi pengaturan per tingkat lokal
+                options['threshold'] = routing_threshold
+                options['engine_options'] = {
+                    tier: {'preprocess_steps': steps} for tier, steps in (preprocess_steps or {}).items()
+                }
+                options['engine_options']['gemini'] = {'api_key': gemini_api_key}
             
-            # Gabungkan semua teks
-            text = ' '.join([result[1] for result in results])
-            
-            return text
-        except Exception as e:
+            # Lakukan OCR dengan engine yang dipilih
+            return services.run_ocr(image, engine_name, **options).text
+        except ServiceError as e:
             st.error(f"Kesalahan OCR: {e}")
             return None
 
@@ -79,48 +108,21 @@ class AIAnalysisService:
         Analisis teks OCR menggunakan Gemini AI
         """
         try:
-            # Konfigurasi Gemini
-            genai.configure(api_key=gemini_api_key)
-            
-            # Buat model
-            model = genai.GenerativeModel('gemini-1.5-pro')
-            
-            # Prompt untuk ekstraksi data terstruktur
-            prompt = f"""
-            Ekstrak informasi dari teks berikut HANYA dalam format:
-            'Tanggal Beli','Nama Item','Quantity','Harga','Total Harga'
-
-            Contoh format keluaran:
-            '2023-10-15','Oreo Vanilla','38','2000','76000'
-
-            Aturan:
-            - Gunakan tanda kutip tunggal
-            - Pisahkan dengan koma
-            - Jika data tidak ada, gunakan 'N/A'
-            - Hanya kembalikan data, tanpa penjelasan tambahan
-
-            Teks untuk diekstrak:
-            {text}
-            """
-            
-            response = model.generate_content(prompt)
-            return response.text
-        except Exception as e:
+            return services.analyze_text(
+                text, gemini_api_key, MAIN_OCR_PROMPTS.analysis_template, MAIN_OCR_PROMPTS.model_name
+            )
+        except ServiceError as e:
             st.error(f"Kesalahan Analisis AI: {e}")
             return None
 
 class AssetTrackingApp:
     def __init__(self):
-        # Inisialisasi session state untuk tabel
-        if 'asset_table' not in st.session_state:
-            st.session_state.asset_table = pd.DataFrame(columns=[
-                'Tanggal Beli', 'Nama Item', 'Quantity', 'Harga', 'Total Harga'
-            ])
+        # Tabel permanen disimpan di SQLite dan tidak dimuat saat aplikasi dibuka
+        self.asset_store = get_asset_store(ASSET_STORE_TABLE, COLUMNS_5)
         
+        # Tabel sementara ditampung per kolom/potongan, DataFrame dibentuk saat ditampilkan
         if 'temp_table' not in st.session_state:
-            st.session_state.temp_table = pd.DataFrame(columns=[
-                'Tanggal Beli', 'Nama Item', 'Quantity', 'Harga', 'Total Harga'
-            ])
+            st.session_state.temp_table = TableBuilder(COLUMNS_5)
 
     def run(self):
         st.title("🧾 Pencatatan Aset Tetap")
@@ -128,6 +130,38 @@ class AssetTrackingApp:
         # Konfigurasi API Key
         gemini_api_key = APIKeyManager.get_gemini_api_key()
         
+        # Dashboard kuota Gemini untuk API key ini
+        if gemini_api_key:
+            with st.sidebar.expander("Kuota Gemini"):
+                quota = get_scheduler(gemini_api_key).stats()
+                col_ok, col_retry, col_fail = st.columns(3)
+                col_ok.metric("Berhasil", quota['succeeded'])
+                col_retry.metric("Retry", quota['retries'])
+                col_fail.metric("Gagal", quota['failed'])
+                st.json(quota)
+        
+        # Pilih engine OCR untuk sesi ini
+        engines = selectable_engines()
+        st.session_state.ocr_engine = st.sidebar.selectbox(
+            "Engine OCR", engines, index=engines.index('easyocr')
+        )
+        
+        # Ambang eskalasi dan laporan routing untuk mode bertingkat
+        if st.session_state.ocr_engine == 'cascade':
+            st.session_state.routing_threshold = st.sidebar.slider(
+                "Ambang eskalasi ke Gemini", 0.0, 1.0, DEFAULT_THRESHOLD, 0.05
+            )
+            with st.sidebar.expander("Laporan Routing OCR"):
+                st.json(ROUTING_STATS.report())
+        
+        # Statistik pool reader EasyOCR
+        if st.session_state.ocr_engine in ('easyocr', 'cascade'):
+            with st.sidebar.expander("Statistik Reader EasyOCR"):
+                st.json(get_reader_pool().stats())
+        
+        # Pengaturan pra-pemrosesan untuk engine lokal
+        self.preprocess_settings(st.session_state.ocr_engine)
+        
         # Pilih mode
         mode = st.selectbox("Pilih Mode", ["Upload Gambar", "Gunakan Kamera"])
         
@@ -139,29 +173,92 @@ class AssetTrackingApp:
         # Tabel Temporary
         st.subheader("Tabel Data Sementara")
         edited_table = st.data_editor(
-            st.session_state.temp_table, 
+            st.session_state.temp_table.to_frame(), 
             num_rows="dynamic", 
             key="temp_table_editor"
         )
         
         # Tombol untuk menyimpan data
         if st.button("Simpan Data ke Tabel Permanen"):
-            # Gabungkan tabel permanen dengan data yang diedit
-            st.session_state.asset_table = pd.concat([
-                st.session_state.asset_table, 
-                edited_table
-            ], ignore_index=True)
+            # Tambahkan data yang diedit sebagai satu batch ke tabel permanen
+            self.asset_store.append(edited_table)
             
             # Kosongkan tabel sementara
-            st.session_state.temp_table = pd.DataFrame(columns=[
-                'Tanggal Beli', 'Nama Item', 'Quantity', 'Harga', 'Total Harga'
-            ])
+            st.session_state.temp_table.clear()
             
             st.success("Data berhasil disimpan ke tabel permanen!")
         
-        # Tampilkan tabel permanen
+        # Tampilkan tabel permanen per halaman, bukan seluruh tabel
         st.subheader("Tabel Aset Permanen")
-        st.dataframe(st.session_state.asset_table)
+        self.asset_table_page("permanent_table")
+
+    def asset_table_page(self, key):
+        """
+        Tampilkan satu halaman tabel permanen dengan pencarian dan urutan yang
+        dijalankan di SQLite
+        """
+        col_search, col_sort, col_order = st.columns([3, 2, 1])
+        search = col_search.text_input("Cari", key=f"{key}_search")
+        sort = col_sort.selectbox("Urutkan", ["Urutan simpan"] + list(COLUMNS_5), key=f"{key}_sort")
+        descending = col_order.checkbox("Menurun", value=True, key=f"{key}_descending")
+
+        matched = self.asset_store.count(search=search)
+        pages = max(1, -(-matched // ASSET_PAGE_ROWS))
+        # Pencarian baru bisa memperkecil jumlah halaman; jangan biarkan nomor halaman di luar batas
+        if st.session_state.get(f"{key}_page", 1) > pages:
+            st.session_state[f"{key}_page"] = pages
+        page_number = st.number_input("Halaman", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+        st.caption(f"{matched} baris cocok, halaman {page_number} dari {pages} ({ASSET_PAGE_ROWS} baris per halaman).")
+
+        st.dataframe(self.asset_store.page(
+            offset=(page_number - 1) * ASSET_PAGE_ROWS,
+            limit=ASSET_PAGE_ROWS,
+            search=search,
+            sort=None if sort == "Urutan simpan" else sort,
+            descending=descending
+        ))
+
+    def preprocess_settings(self, engine_name):
+        """
+        Atur tahapan pra-pemrosesan engine lokal dari sidebar
+        """
+        if engine_name == 'cascade':
+            # Setiap tingkat lokal pada mode bertingkat memakai pengaturannya sendiri
+            st.session_state.preprocess_steps = {
+                tier: self.preprocess_steps_for(tier)
+                for tier in DEFAULT_TIERS if tier in ENGINE_PREPROCESS_STEPS
+            }
+        elif engine_name in ENGINE_PREPROCESS_STEPS:
+            st.session_state.preprocess_steps = self.preprocess_steps_for(engine_name)
+        else:
+            st.session_state.preprocess_steps = None
+
+    @staticmethod
+    def preprocess_steps_for(engine_name):
+        """
+        Pengaturan pra-pemrosesan satu engine lokal (None jika dinonaktifkan)
+        """
+        defaults = ENGINE_PREPROCESS_STEPS.get(engine_name, DEFAULT_PREPROCESS_STEPS)
+        thresholds = ["Tidak", "adaptive", "otsu"]
+        
+        with st.sidebar.expander(f"Pra-pemrosesan {engine_name}"):
+            enabled = st.checkbox("Aktifkan pra-pemrosesan", value=True, key=f"preprocess_{engine_name}")
+            steps = {}
+            for stage in PREPROCESS_STAGES:
+                if stage == 'threshold':
+                    choice = st.selectbox(
+                        "Threshold", thresholds,
+                        index=thresholds.index(defaults[stage] or "Tidak"),
+                        key=f"preprocess_{engine_name}_{stage}"
+                    )
+                    steps[stage] = False if choice == "Tidak" else choice
+                else:
+                    steps[stage] = st.checkbox(
+                        stage.capitalize(), value=defaults[stage],
+                        key=f"preprocess_{engine_name}_{stage}"
+                    )
+        
+        return steps if enabled else None
 
     def upload_mode(self, gemini_api_key):
         """
@@ -179,22 +276,7 @@ class AssetTrackingApp:
             
             if st.button("Proses Dokumen"):
                 with st.spinner("Memproses Dokumen..."):
-                    # Lakukan OCR
-                    ocr_result = OCRService.perform_ocr(image)
-                    
-                    if ocr_result:
-                        # Tampilkan hasil OCR
-                        st.text_area("Hasil OCR", ocr_result, height=200)
-                        
-                        # Analisis dengan Gemini
-                        analysis_result = AIAnalysisService.analyze_ocr_text(
-                            ocr_result, 
-                            gemini_api_key
-                        )
-                        
-                        if analysis_result:
-                            # Proses dan tampilkan hasil
-                            self.process_analysis_result(analysis_result)
+                    self.process_document(image, gemini_api_key)
 
     def camera_mode(self, gemini_api_key):
         picture = st.camera_input("Ambil Gambar Struk")
@@ -205,85 +287,94 @@ class AssetTrackingApp:
             
             if st.button("Proses Dokumen"):
                 with st.spinner("Memproses Dokumen..."):
-                    # Lakukan OCR
-                    ocr_result = OCRService.perform_ocr(image)
-                    
-                    if ocr_result:
-                        # Tampilkan hasil OCR
-                        st.text_area("Hasil OCR", ocr_result, height=200)
-                        
-                        # Analisis dengan Gemini
-                        analysis_result = AIAnalysisService.analyze_ocr_text(
-                            ocr_result, 
-                            gemini_api_key
-                        )
-                        
-                        if analysis_result:
-                            # Proses dan tampilkan hasil
-                            self.process_analysis_result(analysis_result)
+                    self.process_document(image, gemini_api_key)
                             
-    def process_analysis_result(self, analysis_result):
+    @staticmethod
+    def preprocess_signature(steps):
+        return ReceiptPreprocessor(steps).signature() if steps else 'raw'
+
+    def process_document(self, image, gemini_api_key):
         """
-        Memproses hasil analisis dan menambahkannya ke tabel sementara
+        Jalankan OCR dan analisis, memakai cache jika struk sudah pernah diproses
         """
-        try:
-            # Membersihkan dan memproses hasil analisis
-            # Pisahkan baris-baris hasil
-            lines = analysis_result.strip().split('\n')
+        engine_name = st.session_state.get('ocr_engine', 'easyocr')
+        preprocess_steps = st.session_state.get('preprocess_steps')
+        if engine_name == 'cascade':
+            preprocess_signature = ','.join(
+                [f"threshold={st.session_state.get('routing_threshold', DEFAULT_THRESHOLD)}"]
+                + [f"{tier}={self.preprocess_signature(steps)}" for tier, steps in (preprocess_steps or {}).items()]
+            )
+        else:
+            preprocess_signature = self.preprocess_signature(preprocess_steps)
+        
+        cache = get_result_cache()
+        cache_key = make_cache_key(
+            image, f"{engine_name}[{preprocess_signature}]+{MAIN_OCR_PROMPTS.model_name}", MAIN_OCR_PROMPTS.version
+        )
+        cached = cache.get(cache_key)
+        
+        if cached:
+            st.info("Struk ini sudah pernah diproses, memakai hasil dari cache.")
+            st.text_area("Hasil OCR", cached['ocr_text'], height=200)
+            # Baris hasil parsing ikut tersimpan di cache; entri lama di-parse dari teksnya
+            rows = cached_rows(cached, COLUMNS_5)
+            df = self.process_analysis_result(cached['analysis_text'], rows)
+            if rows is None and df is not None:
+                cache.set(cache_key, cached['ocr_text'], cached['analysis_text'], df)
+            return
+        
+        ocr_result = OCRService.perform_ocr(
+            image, preprocess_steps, engine_name, gemini_api_key,
+            st.session_state.get('routing_threshold', DEFAULT_THRESHOLD)
+        )
+        
+        if ocr_result:
+            st.text_area("Hasil OCR", ocr_result, height=200)
             
-            # Inisialisasi list untuk menyimpan data
-            processed_data = []
+            analysis_result = AIAnalysisService.analyze_ocr_text(
+                ocr_result, 
+                gemini_api_key
+            )
             
-            # Iterasi setiap baris
-            for line in lines:
-                # Hapus tanda kutip jika ada
-                line = line.strip("'")
-                
-                # Split dengan koma atau tab
-                parts = [part.strip("'") for part in line.split(',')]
-                
-                # Pastikan memiliki 5 kolom
-                if len(parts) == 5:
-                    processed_data.append(parts)
-                elif len(parts) > 5:
-                    # Jika lebih dari 5, gabungkan bagian nama item
-                    modified_parts = [
-                        parts[0],  # Tanggal
-                        ' '.join(parts[1:-3]),  # Nama Item
-                        parts[-3],  # Quantity
-                        parts[-2],  # Harga
-                        parts[-1]   # Total Harga
-                    ]
-                    processed_data.append(modified_parts)
+            if analysis_result:
+                df = self.process_analysis_result(analysis_result)
+                cache.set(cache_key, ocr_result, analysis_result, df)
+
+    def process_analysis_result(self, analysis_result, df=None):
+        """
+        Memproses hasil analisis dan menambahkannya ke tabel sementara (di-parse
+        jika `df` belum ada); kembalikan DataFrame-nya, atau None jika gagal
+        """
+        try:
+            # Parse CSV berkutip (nama dengan apostrof/koma tetap utuh) dan angka format Indonesia;
+            # seperti sebelumnya hanya baris tanpa nama yang dibuang, angka yang tidak
+            # terbaca menjadi NaN dan ditandai validasi
+            if df is None:
+                df = parse_analysis_text(analysis_result, COLUMNS_5, require_numbers=False)
             
-            # Buat DataFrame
-            if processed_data:
-                df = pd.DataFrame(processed_data, columns=[
-                    'Tanggal Beli', 'Nama Item', 'Quantity', 'Harga', 'Total Harga'
-                ])
-                
-                # Bersihkan data yang mungkin kosong atau 'N/A'
-                df = df[df['Nama Item'] != 'N/A']
-                
+            if not df.empty:
                 # Tambahkan ke tabel sementara
-                st.session_state.temp_table = pd.concat([
-                    st.session_state.temp_table, 
-                    df
-                ], ignore_index=True)
+                st.session_state.temp_table.append_frame(df)
                 
                 # Tampilkan pesan sukses
                 st.success(f"Berhasil menambahkan {len(df)} item ke tabel sementara!")
                 
+                flagged = int((validate_frame(df) != '').sum())
+                if flagged:
+                    st.warning(f"{flagged} dari {len(df)} baris tidak lolos validasi (mis. angka tidak terbaca); periksa tabel sementara.")
+                
                 # Tampilkan data yang ditambahkan
                 st.dataframe(df)
             else:
                 st.warning("Tidak ada data yang dapat diproses dari hasil analisis.")
+            return df
         
         except Exception as e:
             st.error(f"Kesalahan saat memproses hasil analisis: {e}")
             # Tampilkan hasil asli untuk debugging
             st.text("Hasil Analisis Asli:")
             st.text(analysis_result)
+            return None
 
 def main():
     # Konfigurasi halaman Streamlit
@@ -1,54 +1,75 @@
 import os
 import streamlit as st
 import pandas as pd
-import base64
-import io
-import re
 from PIL import Image
-import google.generativeai as genai
 from dotenv import load_dotenv
-import datetime
+from asset_ocr import receipt_runner, services
+from asset_ocr.asset_store import get_asset_store
+from asset_ocr.editor_delta import editor_delta
+from asset_ocr.errors import EditConflictError, ServiceError
+from asset_ocr.export import EXPORT_FORMATS, ExportJob, available_formats
+from asset_ocr.prompts import (
+    ANALYSIS_PROMPT_TEMPLATE, MAIN_OCR2_PROMPTS, OCR_PROMPT,
+    STRUCTURED_FIELD_COLUMNS, STRUCTURED_PROMPT, STRUCTURED_RESPONSE_SCHEMA,
+)
+from asset_ocr.request_scheduler import get_scheduler
+from asset_ocr.result_cache import get_result_cache
+from asset_ocr.schema import COLUMNS_7, editable_frame
+from asset_ocr.table_builder import TableBuilder
+from asset_ocr.unit_conversion import convert_quantities, normalize_units
+from asset_ocr.validation import ERROR_MESSAGES, error_flags, error_messages, validate_frame
 
 # Muat variabel lingkungan
 load_dotenv()
 
+# Tabel aset permanen (SQLite) milik aplikasi ini dan jumlah baris per halaman
+ASSET_STORE_TABLE = 'main_ocr2_assets'
+ASSET_PAGE_ROWS = 100
+
+# Metode ekstraksi dokumen yang bisa dipilih pengguna
+EXTRACTION_MODES = {
+    "Dua Tahap (OCR → Analisis)": 'two_stage',
+    "Satu Tahap (JSON terstruktur)": 'one_shot',
+}
+
+# Judul keluaran per tahap pada mode streaming
+STREAM_LABELS = {
+    'ocr': "**Hasil OCR**",
+    'analysis': "**Hasil Analisis**",
+    'extraction': "**Hasil Ekstraksi (JSON)**",
+}
+
 class SatuanConverter:
+    @staticmethod
+    def convert_series(values):
+        """
+        Konversi satu kolom quantity (angka, "2,5", "3/4", "1 1/2") sekaligus
+
+        Mengembalikan (nilai float, mask error); tidak ada peringatan per sel.
+        """
+        return convert_quantities(values)
+
+    @staticmethod
+    def normalize_units(quantities, units, prices=None):
+        """
+        Satukan satuan sejenis (gram -> kg, cm -> meter, lusin -> pcs)
+        """
+        return normalize_units(quantities, units, prices)
+
     @staticmethod
     def convert_fractions(value):
         """
-        Konversi pecahan menjadi float
+        Konversi satu nilai pecahan menjadi float (0.0 jika tidak terbaca)
         """
-        try:
-            # Tangani pecahan campuran
-            if isinstance(value, str):
-                # Pecahan campuran seperti "1 1/2"
-                if ' ' in value:
-                    whole, frac = value.split(' ')
-                    return float(whole) + SatuanConverter.fraction_to_float(frac)
-                
-                # Pecahan sederhana seperti "1/2"
-                if '/' in value:
-                    return SatuanConverter.fraction_to_float(value)
-                
-                # Konversi string ke float
-                return float(value)
-            
-            return float(value)
-        except Exception as e:
-            st.warning(f"Kesalahan konversi: {e}")
-            return 0.0
+        values, errors = convert_quantities([value])
+        return 0.0 if errors[0] or pd.isna(values[0]) else float(values[0])
 
     @staticmethod
     def fraction_to_float(fraction):
         """
-        Konversi pecahan menjadi float
+        Konversi pecahan "a/b" menjadi float (0.0 jika tidak terbaca)
         """
-        try:
-            num, denom = map(int, fraction.split('/'))
-            return num / denom
-        except Exception as e:
-            st.warning(f"Kesalahan konversi pecahan: {e}")
-            return 0.0
+        return SatuanConverter.convert_fractions(fraction)
 
 class DataValidator:
     @staticmethod
@@ -56,232 +77,127 @@ class DataValidator:
         """
         Validasi data input
         """
-        errors = []
-        
-        # Validasi Nama Item
-        if not data['Nama Item'] or len(data['Nama Item']) < 2:
-            errors.append("Nama Item minimal 2 karakter")
-        
-        # Validasi Quantity
-        if data['Quantity'] <= 0:
-            errors.append("Quantity harus lebih dari 0")
-        
-        # Validasi Harga
-        if data['Harga'] < 0:
-            errors.append("Harga tidak boleh negatif")
-        
-        # Validasi Vendor
-        if not data['Vendor'] or len(data['Vendor']) < 2:
-            errors.append("Nama Vendor minimal 2 karakter")
-        
-        return errors
+        # Aturan yang sama dengan validasi tabel, diterapkan pada satu baris
+        flags = error_flags(pd.DataFrame([data]))
+        return error_messages(flags.iloc[0])
+
+    @staticmethod
+    def validate_frame(dataframe):
+        """
+        Validasi seluruh tabel sekaligus; kembalikan kode error per baris ('' jika valid)
+        """
+        return validate_frame(dataframe)
 
 class OCRService:
+    # Prompt untuk ekstraksi teks dari gambar
+    PROMPT = OCR_PROMPT
+
     @staticmethod
-    def image_to_base64(image):
+    def image_payload(image, settings=None):
         """
-        Konversi gambar ke base64
+        Siapkan bagian gambar untuk Gemini: orientasi EXIF, batas resolusi, JPEG/WebP
         """
-        buffered = io.BytesIO()
-        image.save(buffered, format="PNG")
-        return base64.b64encode(buffered.getvalue()).decode('utf-8')
+        return services.image_payload(image, settings)
 
     @staticmethod
-    def perform_ocr(image, gemini_api_key):
+    def perform_ocr(image, gemini_api_key, upload_settings=None):
         """
         Melakukan OCR menggunakan Gemini 1.5 Flash
         """
         try:
-            # Konfigurasi Gemini
-            genai.configure(api_key=gemini_api_key)
-            
-            # Konversi gambar ke base64
-            base64_image = OCRService.image_to_base64(image)
-            
-            # Buat model
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            
-            # Prompt untuk ekstraksi teks dari gambar
-            prompt = """
-            Ekstrak informasi detail dari struk/dokumen dengan presisi tinggi:
-
-            Panduan Ekstraksi:
-            1. Identifikasi dengan jelas setiap komponen
-            2. Fokus pada informasi penting
-            3. Perhatikan format angka dan tanggal
-            4. Konversi pecahan menjadi desimal
-
-            Informasi yang WAJIB diekstrak:
-            - Tanggal Transaksi (format YYYY-MM-DD)
-            - Nama Produk/Item (nama lengkap)
-            - Harga Satuan (dalam angka)
-            - Jumlah/Quantity (angka atau pecahan)
-            - Jenis Satuan (contoh: pcs, kg, meter, lembar, pack)
-            - Total Harga 
-            - Vendor (Nama toko/tempat)
-
-            Aturan Jenis Satuan:
-            - Gunakan satuan umum yang ada di struk
-            - Jika tidak ada, tuliskan N/A
-            - Pastikan satuan sesuai dengan jenis produk
-
-            Catatan Penting:
-            - Gunakan format numerik yang bersih
-            - Konversi pecahan (mis. 1/2 → 0.5)
-            - Hilangkan simbol mata uang
-            - Prioritaskan keakuratan data
-            - Jika yang lain tidak ada, tuliskan N/A
-            """
-            
-            # Proses gambar
-            response = model.generate_content([prompt, {'mime_type': 'image/png', 'data': base64_image}])
-            
-            return response.text
-        except Exception as e:
+            return services.run_ocr(
+                image, 'gemini',
+                api_key=gemini_api_key,
+                prompt=OCRService.PROMPT,
+                upload_settings=upload_settings
+            ).text
+        except ServiceError as e:
             st.error(f"Kesalahan OCR: {e}")
             return None
-        
+
 class AIAnalysisService:
+    # Prompt untuk ekstraksi data terstruktur
+    PROMPT_TEMPLATE = ANALYSIS_PROMPT_TEMPLATE
+
     @staticmethod
     def analyze_ocr_text(text, gemini_api_key):
         try:
-            # Konfigurasi Gemini
-            genai.configure(api_key=gemini_api_key)
-            
-            # Buat model
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            
-            # Prompt untuk ekstraksi data terstruktur
-            prompt = f"""
-            Instruksi Ekstraksi Data Terperinci:
-
-            Sumber Teks:
-            {text}
-
-            Panduan Ekstraksi:
-            1. Ekstrak data dengan format CSV yang ketat
-            2. Setiap kolom memiliki kriteria spesifik
-            3. Konversi pecahan ke desimal
-
-            Format Keluaran PASTI:
-            'Tanggal Beli','Nama Item','Quantity','Jenis Satuan','Harga','Total Harga','Vendor'
-
-            Aturan Ketat:
-            - Gunakan tanda kutip tunggal
-            - Pisahkan dengan koma TEPAT
-            - Tanggal: format YYYY-MM-DD
-            - Nama Item: nama lengkap, hilangkan karakter khusus 
-            - Quantity: bilangan desimal (konversi pecahan)
-            - Jenis Satuan: satuan yang sesuai dengan produk (pcs, kg, meter, dll)
-            - Harga: bilangan bulat, tanpa simbol mata uang
-            - Total Harga: hasil perkalian Quantity * Harga
-            - Vendor: Nama toko pada struk
-
-            Contoh Valid:
-            '2023-10-15','Semen Tiga Roda','1.5','kg','50000','75000','Toko Bangunan'
-
-            Instruksi Akhir:
-            - Kembalikan HANYA data dalam format CSV
-            - Jangan tambahkan penjelasan atau komentar
-            - Prioritaskan presisi dan konsistensi
-            """
-            
-            response = model.generate_content(prompt)
-            return response.text
-        except Exception as e:
+            return services.analyze_text(text, gemini_api_key, AIAnalysisService.PROMPT_TEMPLATE)
+        except ServiceError as e:
             st.error(f"Kesalahan Analisis: {e}")
             return None
 
-class ExportService:
+class StructuredExtractionService:
+    # Prompt ekstraksi satu tahap; struktur keluaran diatur RESPONSE_SCHEMA
+    PROMPT = STRUCTURED_PROMPT
+
+    # Pemetaan field JSON ke kolom tabel
+    FIELD_COLUMNS = STRUCTURED_FIELD_COLUMNS
+
+    RESPONSE_SCHEMA = STRUCTURED_RESPONSE_SCHEMA
+
     @staticmethod
-    def export_to_csv(dataframe, filename='asset_data.csv'):
+    def extract(image, gemini_api_key):
         """
-        Ekspor DataFrame ke CSV
+        Ekstraksi satu tahap: gambar langsung menjadi JSON sesuai skema tabel
         """
         try:
-            # Simpan ke file CSV
-            dataframe.to_csv(filename, index=False)
-            return filename
-        except Exception as e:
-            st.error(f"Gagal mengekspor data: {e}")
+            return services.extract_structured(
+                image, gemini_api_key,
+                StructuredExtractionService.PROMPT, StructuredExtractionService.RESPONSE_SCHEMA
+            )
+        except ServiceError as e:
+            st.error(f"Kesalahan Ekstraksi: {e}")
             return None
 
+class ExportService:
+    @staticmethod
+    def format_label(fmt):
+        return EXPORT_FORMATS[fmt][0]
+
     @staticmethod
-    def export_to_excel(dataframe, filename='asset_data.xlsx'):
+    def start_export(store, fmt):
         """
-        Ekspor DataFrame ke Excel
+        Mulai ekspor tabel permanen di background ke buffer milik sesi ini
         """
         try:
-            # Simpan ke file Excel
-            dataframe.to_excel(filename, index=False)
-            return filename
-        except Exception as e:
+            return ExportJob(store, fmt).start()
+        except ServiceError as e:
             st.error(f"Gagal mengekspor data: {e}")
             return None
 
 class ReportGenerator:
     @staticmethod
-    def generate_summary(dataframe):
+    def generate_summary(aggregates):
         """
-        Buat ringkasan dari data aset
+        Buat ringkasan dari agregat berjalan tabel aset (AssetStore.aggregates),
+        O(jumlah grup) dan bukan O(jumlah baris)
         """
         try:
-            # Total nilai aset
-            total_aset = dataframe['Total Harga'].sum()
-            
-            # Ringkasan per vendor
-            vendor_summary = dataframe.groupby('Vendor')['Total Harga'].sum()
-            
-            # Ringkasan per jenis satuan
-            satuan_summary = dataframe.groupby('Jenis Satuan')['Quantity'].sum()
-            
-            return {
-                'Total Aset': total_aset,
-                'Ringkasan Vendor': vendor_summary,
-                'Ringkasan Satuan': satuan_summary
-            }
-        except Exception as e:
-            st.error(f"Gagal membuat ringkasan: {e}")
+            return services.summarize_report(aggregates)
+        except ServiceError as e:
+            st.error(str(e))
             return None
 
     @staticmethod
     def visualize_summary(summary):
         """
-        Visualisasi ringkasan data
+        Visualisasi ringkasan vendor sebagai PNG (di-cache per isi ringkasan)
         """
-        import matplotlib.pyplot as plt
-        import io
-
         try:
-            # Visualisasi ringkasan vendor
-            plt.figure(figsize=(10, 5))
-            summary['Ringkasan Vendor'].plot(kind='bar')
-            plt.title('Total Aset per Vendor')
-            plt.xlabel('Vendor')
-            plt.ylabel('Total Harga')
-            plt.tight_layout()
-            
-            # Simpan plot ke buffer
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format='png')
-            buffer.seek(0)
-            
-            return buffer
-        except Exception as e:
-            st.error(f"Gagal membuat visualisasi: {e}")
+            return services.vendor_chart_png(summary)
+        except ServiceError as e:
+            st.error(str(e))
             return None
+
 class AssetTrackingApp:
     def __init__(self):
-        # Inisialisasi session state untuk tabel
-        if 'asset_table' not in st.session_state:
-            st.session_state.asset_table = pd.DataFrame(columns=[
-                'Tanggal Beli', 'Nama Item', 'Quantity', 'Jenis Satuan', 'Harga', 'Total Harga', 'Vendor'
-            ])
+        # Tabel permanen disimpan di SQLite dan tidak dimuat saat aplikasi dibuka
+        self.asset_store = get_asset_store(ASSET_STORE_TABLE, COLUMNS_7)
         
+        # Tabel sementara ditampung per kolom/potongan, DataFrame dibentuk saat ditampilkan
         if 'temp_table' not in st.session_state:
-            st.session_state.temp_table = pd.DataFrame(columns=[
-                'Tanggal Beli', 'Nama Item', 'Quantity', 'Jenis Satuan', 'Harga', 'Total Harga', 'Vendor'
-            ])
+            st.session_state.temp_table = TableBuilder(COLUMNS_7)
 
     def run(self):
         st.title("🧾 Pencatatan Aset Tetap")
@@ -289,6 +205,16 @@ class AssetTrackingApp:
         # Input API Key
         gemini_api_key = os.getenv('GEMINI_API_KEY')
 
+        # Dashboard kuota Gemini untuk API key ini
+        if gemini_api_key:
+            with st.sidebar.expander("Kuota Gemini"):
+                quota = get_scheduler(gemini_api_key).stats()
+                col_ok, col_retry, col_fail = st.columns(3)
+                col_ok.metric("Berhasil", quota['succeeded'])
+                col_retry.metric("Retry", quota['retries'])
+                col_fail.metric("Gagal", quota['failed'])
+                st.json(quota)
+
         # Tab navigasi
         tab1, tab2, tab3 = st.tabs(["Input Data", "Tabel Aset", "Laporan"])
 
@@ -298,6 +224,22 @@ class AssetTrackingApp:
                 ["Upload Gambar", "Input Manual", "Scan Kamera"]
             )
 
+            # Batalkan pipeline async yang masih berjalan jika pengguna berpindah mode
+            if mode != "Upload Gambar" and st.session_state.get('async_run'):
+                st.session_state.async_run.cancel()
+                st.session_state.async_run = None
+
+            # Pilih metode ekstraksi dokumen
+            if mode in ("Upload Gambar", "Scan Kamera"):
+                extraction_label = st.radio(
+                    "Metode Ekstraksi", list(EXTRACTION_MODES), horizontal=True
+                )
+                st.session_state.extraction_mode = EXTRACTION_MODES[extraction_label]
+                st.session_state.streaming = st.checkbox(
+                    "Mode streaming", value=False,
+                    help="Tampilkan hasil sambil diterima dan tambahkan baris begitu lengkap"
+                )
+
             # Proses berdasarkan mode
             if mode == "Upload Gambar" and gemini_api_key:
                 self.upload_image_mode(gemini_api_key)
@@ -313,29 +255,36 @@ class AssetTrackingApp:
             self.generate_reports()
 
     def upload_image_mode(self, gemini_api_key):
-        uploaded_file = st.file_uploader(
+        uploaded_files = st.file_uploader(
             "Upload Gambar Struk/Dokumen", 
-            type=['png', 'jpg', 'jpeg']
+            type=['png', 'jpg', 'jpeg'],
+            accept_multiple_files=True
         )
         
-        if uploaded_file is not None:
-            image = Image.open(uploaded_file)
+        if len(uploaded_files) == 1:
+            image = Image.open(uploaded_files[0])
             st.image(image, caption="Gambar Terunggah", width=300)
             
             if st.button("Proses Dokumen"):
                 with st.spinner("Memproses Dokumen..."):
-                    ocr_result = OCRService.perform_ocr(image, gemini_api_key)
-                    
-                    if ocr_result:
-                        st.text_area("Hasil OCR", ocr_result, height=200)
-                        
-                        analysis_result = AIAnalysisService.analyze_ocr_text(
-                            ocr_result, 
-                            gemini_api_key
-                        )
-                        
-                        if analysis_result:
-                            self.process_analysis_result(analysis_result)
+                    self.process_document(image, gemini_api_key)
+        elif len(uploaded_files) > 1:
+            st.write(f"**{len(uploaded_files)} gambar siap diproses.**")
+            
+            with st.expander("Pengaturan Batch"):
+                max_workers = st.number_input("Jumlah worker", min_value=1, max_value=16, value=4)
+                ocr_limit = st.number_input("Maksimal OCR bersamaan", min_value=1, max_value=16, value=2)
+                analysis_limit = st.number_input("Maksimal analisis bersamaan", min_value=1, max_value=16, value=2)
+                use_async = st.checkbox("Gunakan pipeline asyncio", value=False)
+            
+            if st.button("Proses Semua Dokumen"):
+                if use_async:
+                    self.process_batch_async(uploaded_files, gemini_api_key, max_workers)
+                else:
+                    self.process_batch(
+                        uploaded_files, gemini_api_key,
+                        max_workers, ocr_limit, analysis_limit
+                    )
 
     def camera_scan_mode(self, gemini_api_key):
         picture = st.camera_input("Ambil Gambar Struk")
@@ -346,18 +295,161 @@ class AssetTrackingApp:
             
             if st.button("Proses Dokumen"):
                 with st.spinner("Memproses Dokumen..."):
-                    ocr_result = OCRService.perform_ocr(image, gemini_api_key)
-                    
-                    if ocr_result:
-                        st.text_area("Hasil OCR", ocr_result, height=200)
-                        
-                        analysis_result = AIAnalysisService.analyze_ocr_text(
-                            ocr_result, 
-                            gemini_api_key
-                        )
-                        
-                        if analysis_result:
-                            self.process_analysis_result(analysis_result)
+                    self.process_document(image, gemini_api_key)
+
+    @staticmethod
+    def extraction_mode():
+        return st.session_state.get('extraction_mode', 'two_stage')
+
+    @staticmethod
+    def streaming_mode():
+        return st.session_state.get('streaming', False)
+
+    @staticmethod
+    def cache_key_for(image, mode):
+        return receipt_runner.cache_key(MAIN_OCR2_PROMPTS, image, mode)
+
+    def process_document(self, image, gemini_api_key):
+        """
+        Jalankan OCR dan analisis, memakai cache jika struk sudah pernah diproses
+        """
+        mode = self.extraction_mode()
+        cache = get_result_cache()
+        cache_key = self.cache_key_for(image, mode)
+        cached = cache.get(cache_key)
+        
+        if cached:
+            st.info("Struk ini sudah pernah diproses, memakai hasil dari cache.")
+            if cached['ocr_text']:
+                st.text_area("Hasil OCR", cached['ocr_text'], height=200)
+            # Baris hasil parsing ikut tersimpan di cache; tidak di-parse ulang
+            self.process_analysis_result(
+                cached['analysis_text'], receipt_runner.cached_frame(MAIN_OCR2_PROMPTS, cache, cache_key, cached)
+            )
+            return
+        
+        if self.streaming_mode():
+            self.process_document_streaming(image, gemini_api_key, mode, cache_key)
+            return
+        
+        if mode == 'one_shot':
+            # Satu panggilan: gambar langsung menjadi baris JSON
+            extraction_result = StructuredExtractionService.extract(image, gemini_api_key)
+            
+            if extraction_result:
+                st.text_area("Hasil Ekstraksi (JSON)", extraction_result, height=200)
+                df = self.process_analysis_result(extraction_result)
+                cache.set(cache_key, None, extraction_result, df)
+            return
+        
+        ocr_result = OCRService.perform_ocr(image, gemini_api_key)
+        
+        if ocr_result:
+            st.text_area("Hasil OCR", ocr_result, height=200)
+            
+            analysis_result = AIAnalysisService.analyze_ocr_text(
+                ocr_result, 
+                gemini_api_key
+            )
+            
+            if analysis_result:
+                df = self.process_analysis_result(analysis_result)
+                cache.set(cache_key, ocr_result, analysis_result, df)
+
+    def process_document_streaming(self, image, gemini_api_key, mode, cache_key):
+        """
+        Tampilkan keluaran model sambil di-stream; baris masuk tabel sementara setelah stream selesai
+        """
+        placeholders = {}
+
+        def show_text(stage, text):
+            if stage not in placeholders:
+                st.write(STREAM_LABELS[stage])
+                placeholders[stage] = (st.empty(), st.empty())
+            placeholders[stage][0].text(text)
+
+        def show_rows(stage, rows):
+            placeholders[stage][1].dataframe(rows.to_frame())
+
+        result = receipt_runner.stream_receipt(
+            MAIN_OCR2_PROMPTS, image, gemini_api_key, mode, show_text, show_rows, key=cache_key
+        )
+        if not result.ok:
+            st.error(f"Kesalahan Streaming: {result.error}")
+        elif result.rows.empty:
+            st.warning("Tidak ada data yang dapat diproses.")
+        else:
+            st.session_state.temp_table.append_frame(result.rows)
+            st.success(f"Berhasil menambahkan {len(result.rows)} item ke tabel sementara!")
+
+    def process_batch(self, uploaded_files, gemini_api_key, max_workers=4, ocr_limit=2, analysis_limit=2):
+        """
+        Proses banyak struk sekaligus di thread pool, lalu gabungkan hasilnya sekali
+        """
+        progress_bar = st.progress(0.0, text="Memproses dokumen...")
+        status_placeholder = st.empty()
+        statuses = {uploaded_file.name: "Menunggu" for uploaded_file in uploaded_files}
+        
+        def on_progress(done, total, result):
+            if result.ok:
+                statuses[result.name] = f"Selesai ({len(result.output)} item)"
+            else:
+                statuses[result.name] = f"Gagal di tahap {result.failed_stage}: {result.error}"
+            progress_bar.progress(done / total, text=f"{done}/{total} dokumen selesai")
+            status_placeholder.dataframe(
+                pd.DataFrame({'File': list(statuses), 'Status': list(statuses.values())})
+            )
+        
+        results = receipt_runner.run_batch(
+            MAIN_OCR2_PROMPTS, [(uploaded_file.name, uploaded_file) for uploaded_file in uploaded_files],
+            gemini_api_key, self.extraction_mode(), max_workers, ocr_limit, analysis_limit, on_progress
+        )
+        
+        # Tambahkan hasil per dokumen; tabel digabung sekali saat ditampilkan
+        frames = [result.output for result in results if result.ok and not result.output.empty]
+        if frames:
+            for frame in frames:
+                st.session_state.temp_table.append_frame(frame)
+            st.success(f"Berhasil menambahkan {sum(len(frame) for frame in frames)} item dari {len(frames)} dokumen!")
+        else:
+            st.warning("Tidak ada data yang dapat diproses.")
+
+    def process_batch_async(self, uploaded_files, gemini_api_key, concurrency=4):
+        """
+        Proses banyak struk dengan pipeline asyncio yang berjalan di thread latar
+        """
+        # Struk yang sudah ada di cache tidak dikirim ulang
+        batch = receipt_runner.AsyncReceiptBatch(
+            MAIN_OCR2_PROMPTS, [(uploaded_file.name, uploaded_file) for uploaded_file in uploaded_files],
+            gemini_api_key, self.extraction_mode(), concurrency
+        ).start()
+        run = batch.run
+        st.session_state.async_run = run
+        progress_bar = st.progress(0.0, text="Memproses dokumen...")
+        try:
+            while not run.wait(timeout=0.2):
+                if run.total:
+                    progress_bar.progress(run.completed / run.total, text=f"{run.completed}/{run.total} dokumen selesai")
+        finally:
+            # Script dihentikan (mis. pengguna berpindah halaman): batalkan sisa pekerjaan
+            run.cancel()
+            st.session_state.async_run = None
+        
+        if run.error:
+            st.error(f"Pipeline gagal: {run.error}")
+            return
+        
+        # Parse seluruh hasil sekaligus, lalu tambahkan sebagai satu potongan
+        df, failures = batch.finish()
+        for name, error in failures:
+            st.warning(f"{name}: {error}")
+        progress_bar.progress(1.0, text="Selesai")
+        
+        if not df.empty:
+            st.session_state.temp_table.append_frame(df)
+            st.success(f"Berhasil menambahkan {len(df)} item dari {batch.documents} dokumen!")
+        else:
+            st.warning("Tidak ada data yang dapat diproses.")
 
     def manual_input_mode(self):
         st.subheader("Input Manual Data Aset")
@@ -396,7 +488,7 @@ class AssetTrackingApp:
             # Cek validasi
             if not validation_errors:
                 # Tambahkan data ke tabel sementara
-                new_data = pd.DataFrame([{
+                st.session_state.temp_table.append_row({
                     'Tanggal Beli': tanggal_beli.strftime('%Y-%m-%d'),
                     'Nama Item': nama_item,
                     'Quantity': quantity,
@@ -404,12 +496,7 @@ class AssetTrackingApp:
                     'Harga': harga,
                     'Total Harga': total_harga,
                     'Vendor': nama_vendor
-                }])
-
-                st.session_state.temp_table = pd.concat(
-                    [st.session_state.temp_table, new_data],
-                    ignore_index=True
-                )
+                })
 
                 st.success("Data berhasil ditambahkan ke tabel sementara!")
             else:
@@ -417,52 +504,44 @@ class AssetTrackingApp:
                 for error in validation_errors:
                     st.error(error)
 
-    def process_analysis_result(self, analysis_result):
+    @staticmethod
+    def parse_analysis_result(analysis_result):
+        """
+        Ubah teks hasil analisis (CSV atau JSON) menjadi DataFrame (tanpa menyentuh UI)
+        """
+        return AssetTrackingApp.parse_analysis_results([analysis_result])
+
+    @staticmethod
+    def parse_analysis_results(analysis_results):
+        """
+        Parse banyak hasil analisis sekaligus menjadi satu DataFrame
+        """
+        return services.parse_results(analysis_results, MAIN_OCR2_PROMPTS)
+
+    def process_analysis_result(self, analysis_result, df=None):
+        """
+        Tambahkan baris hasil analisis ke tabel sementara (di-parse jika `df`
+        belum ada); kembalikan DataFrame-nya, atau None jika gagal diproses
+        """
         try:
-            # Bersihkan hasil dari karakter ekstra
-            clean_result = analysis_result.strip().replace("'", "")
-            
-            # Split baris
-            lines = clean_result.split('\n')
-            
-            # Inisialisasi list untuk data
-            processed_data = []
-            
-            for line in lines:
-                # Split dengan koma
-                parts = [part.strip() for part in line.split(',')]
-                
-                # Validasi panjang data
-                if len(parts) == 7:  # Memastikan ada 7 kolom
-                    processed_data.append(parts)
+            if df is None:
+                df = self.parse_analysis_result(analysis_result)
             
-            # Buat DataFrame
-            if processed_data:
-                df = pd.DataFrame(processed_data, columns=[
-                    'Tanggal Beli', 'Nama Item', 'Quantity', 'Jenis Satuan', 'Harga', 'Total Harga', 'Vendor'
-                ])
+            if not df.empty:
+                st.session_state.temp_table.append_frame(df)
                 
-                # Konversi tipe data dengan error='coerce'
-                df['Quantity'] = pd.to_numeric(df['Quantity'], errors='coerce')
-                df['Harga'] = pd.to_numeric(df['Harga'], errors='coerce')
-                df['Total Harga'] = pd.to_numeric(df['Total Harga'], errors='coerce')
+                st.success("Hasil analisis berhasil ditambahkan ke tabel sementara!")
                 
-                # Bersihkan data yang tidak valid
-                df = df.dropna()
-                
-                # Cek apakah dataframe tidak kosong sebelum concat
-                if not df.empty:
-                    # Gunakan method copy untuk menghindari warning
-                    temp_table = st.session_state.temp_table.copy()
-                    st.session_state.temp_table = pd.concat([temp_table, df], ignore_index=True)
-                    
-                    st.success("Hasil analisis berhasil ditambahkan ke tabel sementara!")
-                else:
-                    st.warning("Tidak ada data yang valid untuk ditambahkan.")
+                # Baris hasil OCR ikut divalidasi, bukan hanya dropna
+                flagged = int((DataValidator.validate_frame(df) != '').sum())
+                if flagged:
+                    st.warning(f"{flagged} dari {len(df)} baris tidak lolos validasi; periksa kolom Validasi di tabel sementara.")
             else:
-                st.warning("Tidak ada data yang dapat diproses.")
+                st.warning("Tidak ada data yang valid untuk ditambahkan.")
+            return df
         except Exception as e:
             st.error(f"Gagal memproses hasil analisis: {e}")
+            return None
 
     def manage_asset_table(self):
         st.subheader("Manajemen Tabel Aset")
@@ -475,40 +554,56 @@ class AssetTrackingApp:
             if st.session_state.temp_table.empty:
                 st.warning("Tabel sementara kosong.")
             else:
-                # Tampilkan dan edit tabel sementara
-                temp_table = st.data_editor(
-                    st.session_state.temp_table, 
+                # Tandai baris yang tidak lolos validasi
+                temp_frame = st.session_state.temp_table.to_frame()
+                validation = DataValidator.validate_frame(temp_frame)
+                flagged = int((validation != '').sum())
+                if flagged:
+                    st.warning(f"{flagged} baris perlu diperiksa, lihat kolom Validasi.")
+                
+                # Tampilkan dan edit tabel sementara; kunci editor ikut versi tabel
+                # sehingga change set yang sudah diterapkan tidak terbawa
+                temp_page = editable_frame(temp_frame).assign(Validasi=validation)
+                editor_key = f"temp_table_editor_{st.session_state.temp_table.version}"
+                st.data_editor(
+                    temp_page, 
                     num_rows="dynamic",
-                    key="temp_table_editor"
+                    column_config={
+                        'Validasi': st.column_config.TextColumn(
+                            "Validasi",
+                            help=" | ".join(f"{code}: {message}" for code, message in ERROR_MESSAGES.items()),
+                            disabled=True
+                        )
+                    },
+                    key=editor_key
                 )
                 
-                # Update tabel sementara di session state
-                st.session_state.temp_table = temp_table
+                # Terapkan hanya baris yang diubah/ditambah/dihapus (tanpa kolom validasi)
+                updated, added, deleted = editor_delta(temp_page, st.session_state.get(editor_key), COLUMNS_7)
+                if st.session_state.temp_table.apply_edits(updated, added, deleted):
+                    st.rerun()
+                
+                # Tombol batalkan edit terakhir di tabel sementara
+                if st.button("↩️ Batalkan Edit", key="undo_temp_edit", disabled=not st.session_state.temp_table.can_undo):
+                    st.session_state.temp_table.undo()
+                    st.rerun()
                 
                 # Tombol hapus tabel sementara
                 if st.button("🗑️ Hapus Tabel Sementara", key="delete_temp_table"):
                     # Konfirmasi sebelum menghapus
                     if st.checkbox("Saya yakin ingin menghapus tabel sementara", key="confirm_delete_temp"):
                         # Reset tabel sementara
-                        st.session_state.temp_table = pd.DataFrame(columns=[
-                            'Tanggal Beli', 'Nama Item', 'Quantity', 'Jenis Satuan', 'Harga', 'Total Harga', 'Vendor'
-                        ])
+                        st.session_state.temp_table.clear()
                         st.success("Tabel sementara berhasil dihapus!")
                 
                 # Tombol untuk menyimpan data ke tabel utama
                 if st.button("💾 Simpan ke Tabel Permanen"):
                     if not st.session_state.temp_table.empty:
-                        # Gunakan method copy untuk menghindari warning
-                        asset_table = st.session_state.asset_table.copy()
-                        st.session_state.asset_table = pd.concat(
-                            [asset_table, st.session_state.temp_table],
-                            ignore_index=True
-                        )
+                        # Tambahkan sebagai satu batch, tanpa menyalin tabel permanen
+                        self.asset_store.append(st.session_state.temp_table.to_frame())
                         
                         # Reset tabel sementara
-                        st.session_state.temp_table = pd.DataFrame(columns=[
-                            'Tanggal Beli', 'Nama Item', 'Quantity', 'Jenis Satuan', 'Harga', 'Total Harga', 'Vendor'
-                        ])
+                        st.session_state.temp_table.clear()
                         
                         st.success("Data berhasil disimpan ke tabel permanen!")
                     else:
@@ -516,62 +611,152 @@ class AssetTrackingApp:
         
         with col2:
             st.subheader("Tabel Permanen")
-            if st.session_state.asset_table.empty:
+            total_rows = self.asset_store.count()
+            if not total_rows:
                 st.warning("Tabel permanen kosong.")
             else:
-                # Tampilkan dan edit tabel permanen
-                asset_table = st.data_editor(
-                    st.session_state.asset_table, 
-                    num_rows="dynamic",
-                    key="permanent_table_editor"
-                )
-                
-                # Update tabel permanen di session state
-                st.session_state.asset_table = asset_table
+                # Hanya satu halaman hasil filter/urutan SQLite yang dikirim ke editor
+                self.asset_table_page("permanent_table", editable=True)
                 
                 # Tombol hapus tabel permanen
                 if st.button("🗑️ Hapus Tabel Permanen", key="delete_permanent_table"):
                     # Konfirmasi sebelum menghapus
                     if st.checkbox("Saya yakin ingin menghapus tabel permanen", key="confirm_delete_permanent"):
                         # Reset tabel permanen
-                        st.session_state.asset_table = pd.DataFrame(columns=[
-                            'Tanggal Beli', 'Nama Item', 'Quantity', 'Jenis Satuan', 'Harga', 'Total Harga', 'Vendor'
-                        ])
+                        self.asset_store.clear()
+                        # Edit sebelum pengosongan tidak bisa dibatalkan lagi
+                        st.session_state["permanent_table_edit_ids"] = []
                         st.success("Tabel permanen berhasil dihapus!")
                 
-                # Tombol ekspor data
-                col_export1, col_export2 = st.columns(2)
-                
-                with col_export1:
-                    # Ekspor ke CSV
-                    if st.button("📄 Ekspor CSV"):
-                        filename = ExportService.export_to_csv(st.session_state.asset_table)
-                        if filename:
-                            st.success(f"Data berhasil diekspor ke {filename}")
-                
-                with col_export2:
-                    # Ekspor ke Excel
-                    if st.button("📊 Ekspor Excel"):
-                        filename = ExportService.export_to_excel(st.session_state.asset_table)
-                        if filename:
-                            st.success(f"Data berhasil diekspor ke {filename}")
+                # Ekspor ke buffer per sesi, dikirim lewat tombol unduh
+                self.export_panel()
+
+    def export_panel(self):
+        """
+        Siapkan ekspor tabel permanen di background lalu tampilkan tombol unduh;
+        script tidak menunggu ekspor selesai
+        """
+        col_format, col_start = st.columns([3, 1])
+        fmt = col_format.selectbox(
+            "Format ekspor", available_formats(),
+            format_func=ExportService.format_label, key="export_format"
+        )
+        job = st.session_state.get('export_job')
+        running = job is not None and not job.done()
+        if col_start.button("📦 Siapkan Ekspor", disabled=running):
+            if job is not None:
+                job.close()
+            st.session_state.export_job = job = ExportService.start_export(self.asset_store, fmt)
+
+        if job is None:
+            return
+        if not job.done():
+            st.progress(job.progress, text=f"Mengekspor {job.rows_written}/{job.total_rows} baris...")
+            st.button("🔄 Perbarui Status Ekspor")
+        elif job.error:
+            st.error(f"Gagal mengekspor data: {job.error}")
+        else:
+            st.download_button(
+                f"⬇️ Unduh {ExportService.format_label(job.fmt)} ({job.size / 1024 / 1024:.1f} MB)",
+                data=job.data(), file_name=job.filename, mime=job.mime, key="export_download"
+            )
+
+    def asset_table_page(self, key, editable=False):
+        """
+        Tampilkan satu halaman tabel permanen dengan pencarian, filter vendor,
+        dan urutan yang dijalankan di SQLite
+        """
+        col_search, col_vendor, col_sort, col_order = st.columns([3, 2, 2, 1])
+        search = col_search.text_input("Cari", key=f"{key}_search")
+        vendor = col_vendor.selectbox(
+            "Vendor", ["Semua"] + self.asset_store.distinct('Vendor'), key=f"{key}_vendor"
+        )
+        sort = col_sort.selectbox("Urutkan", ["Urutan simpan"] + list(COLUMNS_7), key=f"{key}_sort")
+        descending = col_order.checkbox("Menurun", value=True, key=f"{key}_descending")
+
+        filters = {} if vendor == "Semua" else {'Vendor': vendor}
+        matched = self.asset_store.count(search=search, filters=filters)
+        pages = max(1, -(-matched // ASSET_PAGE_ROWS))
+        # Filter baru bisa memperkecil jumlah halaman; jangan biarkan nomor halaman di luar batas
+        if st.session_state.get(f"{key}_page", 1) > pages:
+            st.session_state[f"{key}_page"] = pages
+        page_number = st.number_input("Halaman", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+        st.caption(f"{matched} baris cocok, halaman {page_number} dari {pages} ({ASSET_PAGE_ROWS} baris per halaman).")
+
+        # Index halaman = id baris di store
+        page = editable_frame(self.asset_store.page(
+            offset=(page_number - 1) * ASSET_PAGE_ROWS,
+            limit=ASSET_PAGE_ROWS,
+            search=search,
+            filters=filters,
+            sort=None if sort == "Urutan simpan" else sort,
+            descending=descending
+        ))
+        if not editable:
+            st.dataframe(page)
+            return
+
+        # Posisi di change set hanya berlaku untuk halaman ini: kunci editor ikut
+        # berganti saat halaman, filter, atau isi store berubah
+        query = (self.asset_store.version, page_number, search, vendor, sort, descending)
+        editor_key = f"{key}_editor_{abs(hash(query))}"
+        st.data_editor(page, num_rows="dynamic", key=editor_key)
+        
+        # Terapkan hanya baris halaman ini yang disentuh editor (change set) sebagai
+        # satu kelompok edit yang tercatat di log dan bisa dibatalkan
+        updated, added, deleted = editor_delta(page, st.session_state.get(editor_key), COLUMNS_7)
+        # Store dipakai bersama semua sesi: simpan edit_id milik sesi ini saja untuk undo
+        # (edit yang sudah dibatalkan atau mendahului pengosongan tabel dibuang)
+        edit_ids = self.asset_store.undoable(st.session_state.get(f"{key}_edit_ids", []))
+        st.session_state[f"{key}_edit_ids"] = edit_ids
+        edit_id = self.asset_store.apply_edits(updated, added, deleted)
+        if edit_id:
+            edit_ids.append(edit_id)
+            st.rerun()
+
+        col_undo, col_log = st.columns([1, 3])
+        if col_undo.button("↩️ Batalkan Edit Terakhir", key=f"{key}_undo", disabled=not edit_ids):
+            try:
+                # Keluarkan dari daftar hanya jika undo berhasil
+                self.asset_store.undo(edit_ids[-1])
+                edit_ids.pop()
+                st.rerun()
+            except EditConflictError as e:
+                st.warning(str(e))
+        with col_log.expander("Riwayat Edit"):
+            st.dataframe(self.asset_store.edit_log())
 
     def generate_reports(self):
         st.subheader("Laporan Aset")
         
-        if st.session_state.asset_table.empty:
+        if not self.asset_store.count():
             st.warning("Tabel aset kosong. Tambahkan data terlebih dahulu.")
         else:
-            summary = ReportGenerator.generate_summary(st.session_state.asset_table)
+            # Agregat berjalan di store, tidak membaca seluruh tabel setiap rerun
+            summary = ReportGenerator.generate_summary(self.asset_store.aggregates())
+            if summary is None:
+                # Kesalahan sudah ditampilkan oleh ReportGenerator
+                return
             st.write("**Total Aset:**", summary['Total Aset'])
             st.write("**Ringkasan Vendor:**")
             st.dataframe(summary['Ringkasan Vendor'])
             st.write("**Ringkasan Satuan:**")
             st.dataframe(summary['Ringkasan Satuan'])
+            st.write("**Ringkasan Bulanan:**")
+            st.dataframe(summary['Ringkasan Bulanan'])
 
-            # Visualisasi
-            buffer = ReportGenerator.visualize_summary(summary)
-            st.image(buffer, caption="Visualisasi Total Aset per Vendor")
+            # Visualisasi: grafik native tidak dirasterisasi sama sekali,
+            # gambar matplotlib hanya digambar ulang jika ringkasan berubah
+            chart_mode = st.radio(
+                "Grafik", ["Native", "Gambar (matplotlib)"], horizontal=True, key="report_chart_mode"
+            )
+            if chart_mode == "Native":
+                st.caption("Total Aset per Vendor")
+                st.bar_chart(summary['Ringkasan Vendor'])
+            else:
+                png = ReportGenerator.visualize_summary(summary)
+                if png:
+                    st.image(png, caption="Visualisasi Total Aset per Vendor")
 
 # Menjalankan aplikasi
 if __name__ == "__main__":